@@ -1,105 +1,115 @@
 # agents/build_agents.py
 
-from langchain.chat_models import ChatOpenAI
-from langchain.agents import initialize_agent, AgentType
-from langchain.tools import Tool
+from collections.abc import Mapping
 from dotenv import load_dotenv
+import importlib
+import threading
+import time
 import os
 
 # Load environment variables
 load_dotenv()
 
-# Initialize LLM
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-
 # ------------------------------------------------
-# Import all 10 tool functions from /tools folder
+# Shared LLM, created when the first agent is built
 # ------------------------------------------------
-from tools.search_hotels_by_city import search_hotels_by_city
-from tools.search_available_rooms_by_dates import search_available_rooms_by_dates
-from tools.get_room_types_and_prices import get_room_types_and_prices
-from tools.search_hotels_by_rating import search_hotels_by_rating
-from tools.search_hotels_by_price_range import search_hotels_by_price_range
-from tools.get_booking_details import get_booking_details
-from tools.get_available_rooms import get_available_rooms
-from tools.search_hotel_by_name import search_hotel_by_name
-from tools.get_hotel_details import get_hotel_details
-from tools.check_room_availability_by_dates import check_room_availability_by_dates
+_llm = None
+_llm_lock = threading.Lock()
+
+def get_llm():
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                from langchain.chat_models import ChatOpenAI
+                _llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    return _llm
 
 # ------------------------------------------------
-# Agents map initialization
+# Agent specs: tool name -> description
+# Each tool lives in tools/<name>.py as a function called <name>
 # ------------------------------------------------
-agents_map = {}
+AGENT_SPECS = {
+    "search_hotels_by_city": "Use this when user asks to find hotels in a specific city.",
+    "search_available_rooms_by_dates": "Use this when user wants available rooms between given dates.",
+    "get_room_types_and_prices": "Use this to get different room types and their prices.",
+    "search_hotels_by_rating": "Use this to search hotels by a specific rating or higher.",
+    "search_hotels_by_price_range": "Use this to find hotels within a specific price range.",
+    "get_booking_details": "Use this to get details of a booking by its ID.",
+    "get_available_rooms": "Use this to see rooms free in a hotel tonight or between given dates.",
+    "search_hotel_by_name": "Use this to get details of a specific hotel by its name.",
+    "get_hotel_details": "Use this to show all hotel information such as location, rating, and facilities.",
+    "check_room_availability_by_dates": "Use this to check if rooms are available for specific dates.",
+    "get_free_rooms_for_stay": "Use this to list rooms free for a whole stay in one or more hotels or cities.",
+    "more_results": "Use this with a 'more:...' token to show the next page of a previous list of results.",
+    "search_hotels_near": "Use this to find hotels near a hotel, city or coordinates, optionally filtered by stars and price.",
+    "search_hotels_by_amenities": "Use this to find hotels offering specific amenities such as pool, spa or gym.",
+    "search_hotels": "Use this when the user combines several criteria such as city, stars, price, dates, room type, guests or amenities.",
+    "create_booking": "Use this to book a room for a guest between two dates.",
+    "cancel_booking": "Use this to cancel a booking by its ID and the guest email or phone number it was made with.",
+}
 
 # Helper function to create an agent for each tool
+# (LangChain's agent machinery is imported here so importing this module stays cheap)
 def make_agent(tool_func, tool_name, description):
+    from langchain.agents import initialize_agent, AgentType
+    from langchain.tools import Tool
     tool_obj = Tool(name=tool_name, func=tool_func, description=description)
     return initialize_agent(
         tools=[tool_obj],
-        llm=llm,
+        llm=get_llm(),
         agent_type=AgentType.OPENAI_FUNCTIONS,
         verbose=False
     )
 
 # ------------------------------------------------
-# Define agents for each tool
+# Lazy agent registry
 # ------------------------------------------------
-agents_map["search_hotels_by_city"] = make_agent(
-    search_hotels_by_city,
-    "search_hotels_by_city",
-    "Use this when user asks to find hotels in a specific city."
-)
-
-agents_map["search_available_rooms_by_dates"] = make_agent(
-    search_available_rooms_by_dates,
-    "search_available_rooms_by_dates",
-    "Use this when user wants available rooms between given dates."
-)
-
-agents_map["get_room_types_and_prices"] = make_agent(
-    get_room_types_and_prices,
-    "get_room_types_and_prices",
-    "Use this to get different room types and their prices."
-)
-
-agents_map["search_hotels_by_rating"] = make_agent(
-    search_hotels_by_rating,
-    "search_hotels_by_rating",
-    "Use this to search hotels by a specific rating or higher."
-)
-
-agents_map["search_hotels_by_price_range"] = make_agent(
-    search_hotels_by_price_range,
-    "search_hotels_by_price_range",
-    "Use this to find hotels within a specific price range."
-)
-
-agents_map["get_booking_details"] = make_agent(
-    get_booking_details,
-    "get_booking_details",
-    "Use this to get details of a booking by its ID."
-)
-
-agents_map["get_available_rooms"] = make_agent(
-    get_available_rooms,
-    "get_available_rooms",
-    "Use this to see available rooms in a hotel."
-)
-
-agents_map["search_hotel_by_name"] = make_agent(
-    search_hotel_by_name,
-    "search_hotel_by_name",
-    "Use this to get details of a specific hotel by its name."
-)
-
-agents_map["get_hotel_details"] = make_agent(
-    get_hotel_details,
-    "get_hotel_details",
-    "Use this to show all hotel information such as location, rating, and facilities."
-)
-
-agents_map["check_room_availability_by_dates"] = make_agent(
-    check_room_availability_by_dates,
-    "check_room_availability_by_dates",
-    "Use this to check if rooms are available for specific dates."
-)
\ No newline at end of file
+class AgentRegistry(Mapping):
+    """
+    Read-only mapping of tool name -> agent, like the old eager agents_map dict,
+    except each agent (and its tool module) is only built on first access.
+    """
+
+    def __init__(self, specs):
+        self._specs = specs
+        self._agents = {}
+        self._lock = threading.Lock()
+        self.build_times = {}
+
+    def __getitem__(self, name):
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        if name not in self._specs:
+            raise KeyError(name)
+        with self._lock:
+            agent = self._agents.get(name)
+            if agent is None:
+                start = time.perf_counter()
+                tool_func = getattr(importlib.import_module(f"tools.{name}"), name)
+                agent = make_agent(tool_func, name, self._specs[name])
+                self.build_times[name] = time.perf_counter() - start
+                self._agents[name] = agent
+        return agent
+
+    def __iter__(self):
+        return iter(self._specs)
+
+    def __len__(self):
+        return len(self._specs)
+
+    def warm(self, names=None):
+        """Build the given agents (all when None) ahead of the first request."""
+        for name in names or self._specs:
+            self[name]
+
+    def built(self):
+        return list(self._agents)
+
+agents_map = AgentRegistry(AGENT_SPECS)
+
+# Selective warm-up at boot, e.g. AGENTS_WARM="search_hotels_by_city,get_booking_details" or "all"
+_warm = os.getenv("AGENTS_WARM", "").strip()
+if _warm:
+    agents_map.warm(None if _warm == "all" else [n.strip() for n in _warm.split(",") if n.strip()])
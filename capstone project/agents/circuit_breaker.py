@@ -0,0 +1,142 @@
+# agents/circuit_breaker.py
+#
+# Failure-rate circuit breaker for remote calls (Nova on Bedrock).
+#   closed    - calls go through; outcomes are kept for the last `window` seconds
+#   open      - failure rate over the window reached `failure_rate` (with at least
+#               `min_calls` samples): calls fail fast with CircuitOpenError
+#   half_open - after `open_seconds`, up to `half_open_calls` trial calls are let
+#               through; a success closes the circuit, a failure re-opens it
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the remote service while the circuit is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, name, window=60.0, min_calls=5, failure_rate=0.5, open_seconds=30.0, half_open_calls=1):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._outcomes = deque()   # (monotonic time, ok)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0, "closed": 0}
+
+    # -------------------------
+    # State
+    # -------------------------
+    def _transition(self, state):
+        # Caller holds the lock
+        if state == self._state:
+            return
+        logger.warning("circuit %s: %s -> %s", self.name, self._state, state)
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            self._stats["opened"] += 1
+        elif state == CLOSED:
+            self._outcomes.clear()
+            self._stats["closed"] += 1
+        self._trials = 0
+
+    def _trim(self, now):
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                self._transition(HALF_OPEN)
+            return self._state
+
+    @property
+    def is_open(self):
+        """True while calls would be rejected (open, or half-open with its trial calls in flight)."""
+        state = self.state
+        with self._lock:
+            return state == OPEN or (state == HALF_OPEN and self._trials >= self.half_open_calls)
+
+    # -------------------------
+    # Calls
+    # -------------------------
+    def before_call(self):
+        """Reserve a call slot or raise CircuitOpenError."""
+        state = self.state
+        with self._lock:
+            if state == OPEN or (state == HALF_OPEN and self._trials >= self.half_open_calls):
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            if state == HALF_OPEN:
+                self._trials += 1
+            self._stats["calls"] += 1
+
+    def record_success(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+            self._outcomes.append((now, True))
+            self._trim(now)
+
+    def record_failure(self, error=None):
+        now = time.monotonic()
+        with self._lock:
+            self._stats["failures"] += 1
+            if error is not None:
+                logger.info("circuit %s: call failed: %s", self.name, error)
+            if self._state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            self._outcomes.append((now, False))
+            self._trim(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._transition(OPEN)
+
+    def call(self, fn, *args, **kwargs):
+        self.before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    def stats(self):
+        state = self.state
+        with self._lock:
+            self._trim(time.monotonic())
+            total = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return dict(self._stats, state=state, window_calls=total,
+                        window_failure_rate=round(failures / total, 3) if total else 0.0)
+
+
+def breaker_from_env(name, prefix):
+    """Breaker configured from <prefix>_BREAKER_* environment variables."""
+    env = lambda key, default: os.getenv(f"{prefix}_BREAKER_{key}", default)
+    return CircuitBreaker(
+        name,
+        window=float(env("WINDOW", "60")),
+        min_calls=int(env("MIN_CALLS", "5")),
+        failure_rate=float(env("FAILURE_RATE", "0.5")),
+        open_seconds=float(env("OPEN_SECONDS", "30")),
+        half_open_calls=int(env("HALF_OPEN_CALLS", "1")),
+    )
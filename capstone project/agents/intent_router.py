@@ -0,0 +1,250 @@
+# agents/intent_router.py
+#
+# Deterministic pre-agent routing. High-frequency query shapes ("hotels in Lahore",
+# "booking 42", "rated above 4", "Lahore between 20 and 100", "rooms in Pearl Continental")
+# are recognized with compiled patterns plus the cached city / hotel-name vocabulary
+# and dispatched straight to the tool function. Anything else returns None so the
+# caller falls back to the Nova agent.
+
+import os
+import re
+import asyncio
+import threading
+from collections import Counter, namedtuple
+from difflib import SequenceMatcher
+from database.inventory_cache import inventory_cache
+from database.async_db_connection import run_async
+from tools.search_hotels_by_city import search_hotels_by_city
+from tools.search_hotels_by_rating import search_hotels_by_rating
+from tools.search_hotels_by_price_range import search_hotels_by_price_range
+from tools.get_booking_details import get_booking_details
+from tools.get_hotel_details import get_hotel_details
+from tools.get_available_rooms import get_available_rooms
+from tools.get_room_types_and_prices import get_room_types_and_prices
+from tools.get_free_rooms_for_stay import get_free_rooms_for_stay
+from tools.more_results import more_results
+from tools.search_hotels_near import search_hotels_near, parse_near_query
+from tools.search_hotels_by_amenities import search_hotels_by_amenities, parse_amenity_query
+from tools.search_hotels import search_hotels, parse_search_criteria, criteria_count
+from tools.paging import TOKEN_PATTERN
+
+# A route must score strictly above this; at 0.75 one unexplained content word
+# (1.0 - 0.25) is already enough to hand the query to the agent
+ROUTER_MIN_CONFIDENCE = float(os.getenv("ROUTER_MIN_CONFIDENCE", "0.75"))
+
+Route = namedtuple("Route", "tool args confidence")
+RouteResult = namedtuple("RouteResult", "tool answer confidence")
+
+# -------------------------
+# Grammar
+# -------------------------
+DATE_RE = re.compile(r"\b\d{4}-\d{2}-\d{2}\b")
+MORE_RE = re.compile(TOKEN_PATTERN)
+AMENITY_RE = re.compile(r"\b(?:with|having|offering|that\s+ha(?:s|ve))\b")
+NEAR_RE = re.compile(r"\b(?:near|nearby|nearest|closest|around|within\s+\d+(?:\.\d+)?\s*(?:km|kms|m|mi|miles?|kilomet\w*|met\w*))\b")
+# Requests that write (book / cancel) always go to the agent, which collects and confirms
+# the details; read-only routes like "booking 42" must never answer them
+WRITE_QUERY_RE = re.compile(r"\b(book|reserve|cancel)\b|\bmake an? (booking|reservation)\b", re.IGNORECASE)
+BOOKING_RE = re.compile(r"\bbooking\s*(?:#|id|no\.?|number)?\s*#?\s*(\d+)\b")
+RATING_RE = re.compile(
+    r"\b(?:rated|rating|stars?)\s*(?:of\s*)?(?:above|over|at\s*least|>=|>|of)?\s*(\d(?:\.\d+)?)\b"
+    r"|\b(\d(?:\.\d+)?)\s*[- ]?stars?\b(?:\s*(?:and|or)\s*(?:above|up|more|higher))?"
+)
+RANGE_RE = re.compile(r"\b(?:between|from)?\s*(\d+(?:\.\d+)?)\s*(?:and|to|-)\s*(\d+(?:\.\d+)?)\b")
+UNDER_RE = re.compile(r"\b(?:under|below|less\s*than|cheaper\s*than|upto|up\s*to|max(?:imum)?)\s*(\d+(?:\.\d+)?)\b")
+ROOMS_RE = re.compile(r"\b(?:available|free|vacant|rooms?)\b")
+PRICES_RE = re.compile(r"\b(?:prices?|rates?|cost|tariffs?|room\s*types?)\b")
+DETAILS_RE = re.compile(r"\b(?:details?|info(?:rmation)?|address|contact|phone|about)\b")
+
+FILLER = {
+    "show", "me", "find", "list", "search", "get", "give", "any", "all", "the", "a", "an",
+    "hotel", "hotels", "in", "at", "for", "of", "please", "what", "which", "are", "is", "there",
+    "with", "some", "good", "best", "i", "want", "need", "looking", "near", "city", "and",
+    "rated", "rating", "above", "over", "least", "stars", "star", "or", "more", "up", "higher",
+    "between", "from", "to", "under", "below", "less", "than", "price", "prices", "range",
+    "booking", "id", "number", "no", "details", "detail", "rooms", "room", "available",
+    "free", "vacant", "stay", "nights", "tell", "know", "can", "you", "do", "have",
+}
+
+_WORD_RE = re.compile(r"[a-z']+")
+
+
+class IntentRouter:
+    def __init__(self, min_confidence=ROUTER_MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self._city_re = None
+        self._city_snapshot = None
+        self._lock = threading.Lock()
+        self._stats = Counter()
+
+    # -------------------------
+    # Vocabulary
+    # -------------------------
+    def _cities(self):
+        """Compiled alternation of known city names, rebuilt when the inventory reloads."""
+        snap = inventory_cache.snapshot()
+        if snap is not self._city_snapshot:
+            with self._lock:
+                names = sorted(snap.by_city, key=len, reverse=True)
+                self._city_re = re.compile(r"\b(" + "|".join(map(re.escape, names)) + r")\b") if names else None
+                self._city_snapshot = snap
+        return self._city_re
+
+    @staticmethod
+    def _leftover(text, *spans):
+        """Content words not explained by any recognized entity."""
+        for span in spans:
+            if span:
+                text = text.replace(span, " ")
+        return [w for w in _WORD_RE.findall(text) if w not in FILLER]
+
+    @staticmethod
+    def _confidence(leftover):
+        return max(0.0, 1.0 - 0.25 * len(leftover))
+
+    def _name_confidence(self, words, hotel, score):
+        """Trigram `score` of a hotel-name match, discounted for words that (even roughly) aren't in the name."""
+        name_words = _WORD_RE.findall(hotel.name.lower())
+        unmatched = [w for w in words
+                     if not any(w == n or SequenceMatcher(None, w, n).ratio() >= 0.8 for n in name_words)]
+        return score * self._confidence(unmatched)
+
+    # -------------------------
+    # Classification
+    # -------------------------
+    def classify(self, query: str):
+        """Best Route for `query`, or None when no known shape matches (or it asks to write)."""
+        q = " ".join(query.lower().split())
+        if WRITE_QUERY_RE.search(q):
+            return None
+        city_re = self._cities()
+        city_m = city_re.search(q) if city_re else None
+        city = city_m.group(1) if city_m else None
+
+        more_m = MORE_RE.search(q)
+        if more_m:
+            return Route(more_results, {"token": more_m.group(0)}, 1.0)
+
+        # Geo questions, when the parser resolves a place or coordinates
+        if NEAR_RE.search(q) and isinstance(parse_near_query(query), dict):
+            return Route(search_hotels_near, {"query": query}, 0.9)
+
+        booking_m = BOOKING_RE.search(q)
+        if not booking_m:
+            # Three or more filters at once (city, stars, price, stay, room type, guests,
+            # amenities) are one search_hotels call instead of a chain of single-filter tools
+            criteria = parse_search_criteria(query)
+            if not isinstance(criteria, str) and criteria_count(criteria) >= 3:
+                return Route(search_hotels, {"query": query}, 0.9)
+        if booking_m:
+            return Route(get_booking_details, {"booking_id": int(booking_m.group(1))},
+                         self._confidence(self._leftover(q, booking_m.group(0))))
+
+        dates = DATE_RE.findall(q)
+        if len(dates) >= 2:
+            # Stay questions go to the availability matrix; dates must not be read as prices
+            stay = f"from {dates[0]} to {dates[1]}"
+            if city:
+                return Route(get_free_rooms_for_stay, {"query": f"{city.title()} {stay}"},
+                             self._confidence(self._leftover(DATE_RE.sub(" ", q), city)))
+            name_words = self._leftover(DATE_RE.sub(" ", q))
+            matches = inventory_cache.match_hotels(" ".join(name_words), limit=1) if name_words else []
+            if matches:
+                hotel, score = matches[0]
+                return Route(get_free_rooms_for_stay, {"query": f"{hotel.name} {stay}"},
+                             self._name_confidence(name_words, hotel, score))
+            return None
+        if dates:
+            return None
+
+        # "with pool and spa": only when every named amenity is in the cached vocabulary
+        if AMENITY_RE.search(q):
+            parsed = parse_amenity_query(query)
+            if not isinstance(parsed, str) and not inventory_cache.amenity_mask(parsed[0])[1]:
+                return Route(search_hotels_by_amenities, {"query": query}, 0.9)
+
+        range_m = RANGE_RE.search(q)
+        under_m = UNDER_RE.search(q)
+        if city and (range_m or under_m):
+            if range_m:
+                lo, hi, span = range_m.group(1), range_m.group(2), range_m.group(0)
+            else:
+                lo, hi, span = "0", under_m.group(1), under_m.group(0)
+            return Route(search_hotels_by_price_range, {"query": f"{city.title()} between {lo} and {hi}"},
+                         self._confidence(self._leftover(q, city, span)))
+
+        rating_m = RATING_RE.search(q)
+        if rating_m and not city:
+            value = float(rating_m.group(1) or rating_m.group(2))
+            return Route(search_hotels_by_rating, {"min_rating": value},
+                         self._confidence(self._leftover(q, rating_m.group(0))))
+
+        if city and not rating_m:
+            leftover = self._leftover(q, city)
+            if not ROOMS_RE.search(q) and not PRICES_RE.search(q):
+                return Route(search_hotels_by_city, {"city": city.title()}, self._confidence(leftover))
+
+        # Hotel name: whatever content words remain are matched against the name index
+        name_words = self._leftover(PRICES_RE.sub(" ", DETAILS_RE.sub(" ", q)))
+        if name_words:
+            matches = inventory_cache.match_hotels(" ".join(name_words), limit=1)
+            if matches:
+                hotel, score = matches[0]
+                if PRICES_RE.search(q):
+                    tool_fn = get_room_types_and_prices
+                elif ROOMS_RE.search(q):
+                    tool_fn = get_available_rooms
+                elif DETAILS_RE.search(q):
+                    tool_fn = get_hotel_details
+                else:
+                    # Bare hotel name: give the full overview, fetched concurrently
+                    tool_fn = (get_hotel_details, get_room_types_and_prices, get_available_rooms)
+                return Route(tool_fn, {"hotel_name": hotel.name}, self._name_confidence(name_words, hotel, score))
+        return None
+
+    # -------------------------
+    # Dispatch
+    # -------------------------
+    def route(self, query: str, min_confidence=None):
+        """Run the matching tool directly; None means "ask the agent"."""
+        if min_confidence is None:
+            min_confidence = self.min_confidence
+        try:
+            route = self.classify(query)
+        except Exception:
+            route = None
+        if route is None or route.confidence <= min_confidence:
+            self._stats["agent"] += 1
+            return None
+        if isinstance(route.tool, tuple):
+            name = "hotel_overview"
+            answer = "\n\n".join(run_tools_concurrently([(t, route.args) for t in route.tool]))
+        else:
+            name = route.tool.name
+            answer = route.tool.run(route.args)
+        self._stats[f"router:{name}"] += 1
+        return RouteResult(name, answer, route.confidence)
+
+    def stats(self):
+        routed = sum(v for k, v in self._stats.items() if k.startswith("router:"))
+        total = routed + self._stats["agent"]
+        return {
+            "paths": dict(self._stats),
+            "llm_calls_saved": routed,
+            "router_ratio": round(routed / total, 3) if total else 0.0,
+        }
+
+
+async def _arun_tools(calls):
+    return await asyncio.gather(*(tool_obj.arun(args) for tool_obj, args in calls))
+
+
+def run_tools_concurrently(calls):
+    """Run [(tool, args)] in parallel on the async tool variants; results keep call order."""
+    return run_async(_arun_tools(calls))
+
+
+# -------------------------
+# Process-wide router
+# -------------------------
+intent_router = IntentRouter()
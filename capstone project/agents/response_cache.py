@@ -0,0 +1,125 @@
+# agents/response_cache.py
+#
+# LRU + TTL cache for LLM responses, with an optional SQLite store so entries
+# survive restarts. Two process-wide instances are used by hotel_chatbort.py:
+#   prompt_cache - exact nova_chat prompt -> completion
+#   answer_cache - normalized user query + DB data version -> final answer
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR")  # unset = memory only
+
+
+def normalize_prompt(text: str) -> str:
+    return " ".join(text.split())
+
+
+def normalize_query(text: str) -> str:
+    return re.sub(r"[\s?!.]+$", "", " ".join(text.lower().split()))
+
+
+class ResponseCache:
+    def __init__(self, name, max_entries=1000, ttl=3600.0, path=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (value, created_at, cost_seconds)
+        self._lock = threading.Lock()
+        self._db = None
+        self._stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "saved_seconds": 0.0}
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, cost REAL NOT NULL
+                )
+            """)
+            self._db.execute("DELETE FROM responses WHERE created_at < ?", (time.time() - ttl,))
+            self._db.commit()
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        return hashlib.sha256("\x1f".join(map(str, parts)).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] >= self.ttl:
+                del self._entries[key]
+                entry = None
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at, cost FROM responses WHERE key = ? AND created_at > ?",
+                    (key, now - self.ttl)).fetchone()
+                if row is not None:
+                    entry = tuple(row)
+                    self._stats["disk_hits"] += 1
+                    self._store(key, entry)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            self._stats["saved_seconds"] += entry[2]
+            return entry[0]
+
+    def put(self, key, value, cost_seconds=0.0):
+        entry = (value, time.time(), cost_seconds)
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key,) + entry)
+                self._db.commit()
+
+    def _store(self, key, entry):
+        # Caller holds the lock
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return dict(self._stats, entries=len(self._entries),
+                        saved_seconds=round(self._stats["saved_seconds"], 3),
+                        hit_ratio=round(self._stats["hits"] / lookups, 3) if lookups else 0.0)
+
+
+def _cache_path(name):
+    if not CACHE_DIR:
+        return None
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, f"{name}.sqlite")
+
+
+# -------------------------
+# Process-wide caches
+# -------------------------
+prompt_cache = ResponseCache(
+    "prompt_cache",
+    max_entries=int(os.getenv("PROMPT_CACHE_SIZE", "2000")),
+    ttl=float(os.getenv("PROMPT_CACHE_TTL", "86400")),
+    path=_cache_path("prompt_cache"),
+)
+answer_cache = ResponseCache(
+    "answer_cache",
+    max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "1000")),
+    ttl=float(os.getenv("ANSWER_CACHE_TTL", "900")),
+    path=_cache_path("answer_cache"),
+)
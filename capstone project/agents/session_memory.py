@@ -0,0 +1,85 @@
+# agents/session_memory.py
+#
+# Per-session conversation memory. Each Streamlit session gets its own token-budgeted
+# window of recent turns plus a rolling summary of older ones, and the number of
+# resident sessions is capped (least recently used are evicted), so memory per
+# process and prompt size per turn both stay bounded.
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from langchain.memory import ConversationSummaryBufferMemory
+
+MEMORY_MAX_TOKENS = int(os.getenv("MEMORY_MAX_TOKENS", "800"))
+MEMORY_SUMMARY_MAX_CHARS = int(os.getenv("MEMORY_SUMMARY_MAX_CHARS", "2000"))
+MEMORY_MAX_SESSIONS = int(os.getenv("MEMORY_MAX_SESSIONS", "200"))
+MEMORY_SESSION_TTL = float(os.getenv("MEMORY_SESSION_TTL", "3600"))
+
+
+class BoundedSummaryBufferMemory(ConversationSummaryBufferMemory):
+    """Summary-buffer memory whose summary is also capped, and which survives summarizer failures."""
+
+    def prune(self):
+        try:
+            super().prune()
+        except Exception:
+            # Summarizer unavailable: drop the overflow instead of failing the turn
+            buffer = self.chat_memory.messages
+            while buffer and self.llm.get_num_tokens_from_messages(buffer) > self.max_token_limit:
+                buffer.pop(0)
+        if len(self.moving_summary_buffer) > MEMORY_SUMMARY_MAX_CHARS:
+            self.moving_summary_buffer = self.moving_summary_buffer[-MEMORY_SUMMARY_MAX_CHARS:]
+
+
+class SessionStore:
+    """
+    LRU of session_id -> (memory, agent). `make_memory()` builds a fresh memory,
+    `make_agent(memory)` the agent bound to it; both run once per session.
+    """
+
+    def __init__(self, make_memory, make_agent, max_sessions=MEMORY_MAX_SESSIONS, ttl=MEMORY_SESSION_TTL):
+        self._make_memory = make_memory
+        self._make_agent = make_agent
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()   # session_id -> [memory, agent, last_used]
+        self._lock = threading.Lock()
+        self._stats = {"created": 0, "evicted": 0, "expired": 0}
+
+    def _entry(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                memory = self._make_memory()
+                entry = [memory, self._make_agent(memory), now]
+                self._sessions[session_id] = entry
+                self._stats["created"] += 1
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self._stats["evicted"] += 1
+            entry[2] = now
+            self._sessions.move_to_end(session_id)
+            return entry
+
+    def _expire(self, now):
+        # Caller holds the lock; least recently used sessions sit at the front
+        while self._sessions:
+            session_id, entry = next(iter(self._sessions.items()))
+            if now - entry[2] < self.ttl:
+                break
+            del self._sessions[session_id]
+            self._stats["expired"] += 1
+
+    def memory(self, session_id):
+        return self._entry(session_id)[0]
+
+    def agent(self, session_id):
+        return self._entry(session_id)[1]
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, sessions=len(self._sessions), max_sessions=self.max_sessions,
+                        max_tokens_per_session=MEMORY_MAX_TOKENS)
@@ -0,0 +1,93 @@
+# agents/streaming.py
+#
+# Callback handler that pushes Nova tokens and tool progress to the UI as they
+# happen, and records time-to-first-token (TTFT) per request.
+
+import re
+import time
+import logging
+import threading
+from collections import deque
+from langchain.callbacks.base import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+_ttft_lock = threading.Lock()
+_ttft_samples = deque(maxlen=500)   # (path, seconds)
+
+# Where the user-facing answer starts in a ReAct completion: "AI:" for the conversational
+# agent, "Final Answer:" for the zero-shot one; everything before is Thought / Action lines
+ANSWER_RE = re.compile(r"(?:^|\n)[ \t]*(?:Final Answer|AI)[ \t]*:[ \t]*")
+
+
+def record_ttft(path: str, seconds: float):
+    with _ttft_lock:
+        _ttft_samples.append((path, seconds))
+    logger.info("ttft path=%s seconds=%.3f", path, seconds)
+
+
+def ttft_stats():
+    """Recent TTFT percentiles, overall and per answer path."""
+    with _ttft_lock:
+        samples = list(_ttft_samples)
+
+    def summary(values):
+        values = sorted(values)
+        pick = lambda q: round(values[min(len(values) - 1, int(q * len(values)))], 3)
+        return {"count": len(values), "p50": pick(0.5), "p95": pick(0.95), "max": round(values[-1], 3)}
+
+    if not samples:
+        return {"count": 0}
+    stats = summary([s for _, s in samples])
+    for path in sorted({p for p, _ in samples}):
+        stats[path] = summary([s for p, s in samples if p == path])
+    return stats
+
+
+class StreamingUIHandler(BaseCallbackHandler):
+    """
+    on_text(text)   - called with the answer text streamed so far by the current LLM call;
+                      tokens are held back until the answer marker, so Thought / Action /
+                      Action Input scaffolding never reaches the page
+    on_status(line) - called with one progress line per tool call
+    ttft            - seconds until the first answer token was shown
+    """
+
+    def __init__(self, on_text, on_status):
+        self.on_text = on_text
+        self.on_status = on_status
+        self.started_at = time.perf_counter()
+        self.first_token_at = None
+        self._text = ""
+        self._answer_at = None      # offset of the answer in _text, once its marker arrived
+
+    @property
+    def ttft(self):
+        return None if self.first_token_at is None else self.first_token_at - self.started_at
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self._text = ""
+        self._answer_at = None
+
+    def on_llm_new_token(self, token: str, **kwargs):
+        self._text += token
+        if self._answer_at is None:
+            m = ANSWER_RE.search(self._text)
+            if m is None:
+                return
+            self._answer_at = m.end()
+        answer = self._text[self._answer_at:]
+        if not answer:
+            return
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.on_text(answer)
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.on_status(f"🔧 Calling **{serialized.get('name', 'tool')}** with `{input_str}`")
+
+    def on_tool_end(self, output, **kwargs):
+        self.on_status(f"✅ Tool returned {len(str(output).splitlines())} line(s)")
+
+    def on_tool_error(self, error, **kwargs):
+        self.on_status(f"⚠️ Tool failed: {error}")
@@ -1,12 +1,24 @@
 # app_nova
 import os
+import time
 import streamlit as st
-import speech_recognition as sr
 from dotenv import load_dotenv
-from hotel_chatbort import agent, memory
-from database.db_connection import get_connection
+from agents.intent_router import intent_router
+from agents.response_cache import prompt_cache, answer_cache
+from agents.streaming import StreamingUIHandler, record_ttft, ttft_stats
+from database.db_connection import get_pool, pool_stats
+from database.inventory_cache import inventory_cache
+from database.statements import statement_stats
+from monitoring.health import HealthProbe, check_database, nova_check
+from monitoring.tracing import span, start_metrics_server
+from tools.paging import continuations
+from tools.tripadvisor_fallback import tripadvisor_fallback_any_sentence, fallback_cache_stats
+from voice.capture import MicrophoneSource
+from voice.pipeline import VoiceSession, voice_stats
+from voice.transcriber import load_model
 from boto3 import client as boto3_client
 import json
+import uuid
 
 # -------------------------
 # Load env variables
@@ -21,20 +33,81 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 # -------------------------
 st.set_page_config(page_title="🏨 Hotel Booking Assistant (Nova)", page_icon="🤖", layout="centered")
 
+# -------------------------
+# Process-level resources (built once, shared by every rerun and session)
+# -------------------------
+@st.cache_resource
+def load_chatbot():
+    # Imports the Nova runtime client, tools and agent factory
+    import hotel_chatbort
+    return hotel_chatbort
+
+@st.cache_resource
+def load_bedrock_client():
+    # Control-plane client, only used by the health probe
+    return boto3_client("bedrock", region_name=AWS_REGION,
+                        aws_access_key_id=AWS_ACCESS_KEY_ID, aws_secret_access_key=AWS_SECRET_ACCESS_KEY)
+
+@st.cache_resource
+def load_db_pool():
+    return get_pool()
+
+@st.cache_resource
+def load_speech_model():
+    # Offline Vosk model, loaded on the first 🎤 press
+    return load_model()
+
+@st.cache_resource
+def load_metrics_server():
+    # /metrics on METRICS_HOST:METRICS_PORT; no-op unless TRACING_ENABLED=1
+    return start_metrics_server()
+
+@st.cache_resource
+def load_health_probe():
+    return HealthProbe({
+        "database": check_database,
+        "nova": nova_check(load_bedrock_client(), chatbot.NOVA_MODEL_ID),
+    }).start()
+
+chatbot = load_chatbot()
+load_db_pool()
+health = load_health_probe()
+load_metrics_server()
+
+# -------------------------
+# Per-session conversation id (memory is kept per browser session)
+# -------------------------
+if "session_id" not in st.session_state: st.session_state["session_id"] = uuid.uuid4().hex
+session_id = st.session_state["session_id"]
+
 # -------------------------
 # Sidebar: DB status
 # -------------------------
 with st.sidebar:
     st.title("Ditail Hotels 🏨")
-    try:
-        conn = get_connection()
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT version();")
-            version = cursor.fetchone()
-        st.success(f"✅ Connected to PostgreSQL\n{version[0]}")
-        conn.close()
-    except Exception as e:
-        st.error(f"❌ Database Connection Failed\n{e}")
+    health_status = health.status()
+    db = health_status["database"]
+    if db["ok"] is None:
+        st.info("⏳ Checking PostgreSQL connection...")
+    elif db["ok"]:
+        st.success(f"✅ Connected to PostgreSQL\n{db['detail']}")
+    else:
+        st.error(f"❌ Database Connection Failed\n{db['detail']}")
+    nova = health_status["nova"]
+    if nova["ok"] is False:
+        st.warning(f"⚠️ Nova unreachable, answers may use the fallback\n{nova['detail']}")
+    elif nova["ok"]:
+        st.caption(f"🤖 Nova: {nova['detail']}")
+    if chatbot.nova_breaker.is_open:
+        st.warning("⚡ Nova circuit open: answering from local tools or the fallback")
+    with st.expander("📊 DB pool & cache stats"):
+        st.json({"pool": pool_stats(), "inventory_cache": inventory_cache.stats(),
+                 "router": intent_router.stats(),
+                 "prompt_cache": prompt_cache.stats(), "answer_cache": answer_cache.stats(),
+                 "ttft": ttft_stats(), "sessions": chatbot.sessions.stats(),
+                 "continuations": continuations.stats(), "statements": statement_stats(),
+                 "nova_breaker": chatbot.nova_breaker.stats(),
+                 "voice": voice_stats(), "tripadvisor": fallback_cache_stats(), "health": health_status})
 
 # -------------------------
 # Page header
@@ -50,85 +123,134 @@ _Example queries:_
 st.divider()
 
 # -------------------------
-# Speech recognizer
+# Voice input: captured and transcribed on a background thread (voice/pipeline.py);
+# this script only polls it, so the page stays live while the user speaks
 # -------------------------
-recognizer = sr.Recognizer()
+VOICE_POLL_SECONDS = float(os.getenv("VOICE_POLL_SECONDS", "0.3"))
 if "voice_text" not in st.session_state: st.session_state["voice_text"] = ""
 if "typed_query" not in st.session_state: st.session_state["typed_query"] = ""
 
-def listen_and_recognize(recognizer, timeout=5, phrase_time_limit=10):
-    """Use Nova 2 Sonic for voice-to-text (pseudo-code)"""
+def start_voice_session():
     try:
-        with sr.Microphone() as source:
-            recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            audio_data = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
-    except sr.WaitTimeoutError:
-        return "", "listening_timeout"
+        with st.spinner("🧠 Loading the speech model..."):
+            load_speech_model()
     except Exception as e:
-        return "", f"microphone_error: {e}"
+        st.session_state["voice_error"] = f"speech model unavailable: {e}"
+        return
+    st.session_state.pop("voice_error", None)
+    st.session_state["voice_session"] = VoiceSession(MicrophoneSource()).start()
+    st.rerun()      # redraw with the ⏹️ Stop button and the live transcript
 
-    try:
-        # Replace with actual Nova 2 Sonic integration
-        text = agent.run(f"[Voice Input] Convert speech to text: {audio_data}")
-        return text, None
-    except Exception as e:
-        return "", f"recognition_error: {e}"
+@st.fragment(run_every=VOICE_POLL_SECONDS)
+def voice_progress():
+    """Partial transcript while listening; the final text is handed to the query box."""
+    session = st.session_state.get("voice_session")
+    if session is None:
+        return
+    snap = session.snapshot()
+    if snap["state"] in ("starting", "listening"):
+        st.info(f"🎧 Listening… {snap['seconds']:.0f}s\n\n🗣️ {snap['text'] or '…'}")
+        return
+    del st.session_state["voice_session"]
+    if snap["state"] in ("done", "stopped") and snap["text"]:
+        st.session_state["voice_text"] = snap["text"]
+    elif snap["state"] == "timeout":
+        st.session_state["voice_error"] = "no speech heard"
+    else:
+        st.session_state["voice_error"] = snap["error"] or "couldn't make out any words"
+    st.rerun()
 
 # -------------------------
 # User input
 # -------------------------
-initial_value = st.session_state.get("voice_text") or st.session_state.get("typed_query", "")
+# A finished transcript replaces the box's text; widget state can only be set before the
+# widget is created, so voice_progress leaves it in voice_text for this run to move over
+if st.session_state["voice_text"]:
+    st.session_state["typed_query"] = st.session_state["voice_text"]
+    st.session_state["voice_text"] = ""
 user_query = st.text_input("💭 Type your query:", placeholder="e.g., Lahore between 20 and 100",
-                           key="typed_query", value=initial_value,
+                           key="typed_query",
                            help="Type or press 🎤 to speak. Recognized voice text will appear here.")
 
 col1, col2 = st.columns([4,1])
 with col2:
-    if st.button("🎤 Speak"):
-        with st.spinner("🎧 Listening..."):
-            voice_text, err = listen_and_recognize(recognizer)
-            if err is None and voice_text:
-                st.session_state["voice_text"] = voice_text
-                st.success(f"🗣️ You said: {voice_text}")
-                st.rerun()
-            else:
-                st.error(f"⚠️ Voice recognition failed: {err}")
+    if "voice_session" in st.session_state:
+        if st.button("⏹️ Stop"):
+            st.session_state["voice_session"].stop()
+    elif st.button("🎤 Speak"):
+        start_voice_session()
+with col1:
+    if "voice_session" in st.session_state:
+        voice_progress()
+    elif st.session_state.get("voice_error"):
+        st.error(f"⚠️ Voice recognition failed: {st.session_state.pop('voice_error')}")
 
 # -------------------------
 # Final query
 # -------------------------
-query = (user_query or "").strip() or st.session_state.get("voice_text", "").strip()
+query = (user_query or "").strip()
 
 # -------------------------
 # Run agent for query
 # -------------------------
-from tools.tripadvisor_fallback import tripadvisor_fallback_any_sentence
+# Streamlit reruns this script on every click (🎤 / ⏹️, voice polling, st.rerun), so a
+# query is answered once and its response replayed afterwards; running it again would
+# repeat bookings / cancellations and add the turn to memory twice.
+if "last_answer" not in st.session_state: st.session_state["last_answer"] = None  # (query, response, caption)
+
+def show_response(response, caption=None):
+    with span("ui.render", response_chars=len(response)):
+        st.markdown("### ✅ Response:")
+        st.markdown("---")
+        st.write(response)
+        if caption:
+            st.caption(caption)
 
-if query:
-    with st.spinner("🔍 Fetching results..."):
+last_answer = st.session_state["last_answer"]
+if not query:
+    st.session_state["last_answer"] = None
+elif last_answer is not None and last_answer[0] == query:
+    show_response(*last_answer[1:])
+else:
+    # One trace per request: query -> tools / nova.chat / db.* -> ui.render
+    with span("ui.request", session=session_id):
+        status = st.status("🔍 Fetching results...", expanded=False)
+        live_answer = st.empty()
+        handler = StreamingUIHandler(on_text=lambda text: live_answer.markdown(text + "▌"),
+                                     on_status=status.write)
         try:
-            # Try Nova agent first
-            result = agent.run(query)
+            # Router for common shapes, Nova agent otherwise (tokens stream into live_answer)
+            result, path = chatbot.answer_query(query, session_id=session_id, callbacks=[handler])
             if not result.strip():
                 raise Exception("Nova empty response")
-            st.markdown("### ✅ Response:")
-            st.markdown("---")
-            st.write(result)
+            ttft = handler.ttft if handler.ttft is not None else time.perf_counter() - handler.started_at
+            record_ttft(path, ttft)
+            status.update(label=f"✅ Done via {path}", state="complete")
+            live_answer.empty()
+            caption = f"⚡ Answered via {path} · first token after {ttft:.2f}s"
+            show_response(result, caption)
+            st.session_state["last_answer"] = (query, result, caption)
 
-        except Exception:
-            # Nova fail → fallback silently
-            fallback_result = tripadvisor_fallback_any_sentence(query)
-            st.markdown("### ✅ Response:")
-            st.markdown("---")
-            st.write(fallback_result)
+        except Exception as e:
+            reason = "Nova circuit open" if isinstance(e, chatbot.CircuitOpenError) else "Nova unavailable"
+            status.update(label=f"⚠️ {reason}, using fallback", state="error")
+            live_answer.empty()
+            with st.spinner("🔍 Fetching results..."):
+                # Nova fail → fallback silently
+                fallback_result = tripadvisor_fallback_any_sentence(query)
+                show_response(fallback_result)
+                st.session_state["last_answer"] = (query, fallback_result, None)
 
 # -------------------------
 # Show conversation history
 # -------------------------
 try:
+    memory = chatbot.get_session_memory(session_id)
     messages_list = getattr(memory.chat_memory, "messages", [])
-    if messages_list:
+    if messages_list or memory.moving_summary_buffer:
         with st.expander("💬 View Conversation History"):
+            if memory.moving_summary_buffer:
+                st.markdown(f"_Earlier conversation (summarized):_ {memory.moving_summary_buffer}")
             for msg in messages_list:
                 role = "🧑‍💻 You" if getattr(msg,"role","user") in ("user","human") else "🤖 Bot"
                 content = getattr(msg,"content",str(msg))
@@ -0,0 +1,151 @@
+# benchmarks/bench_booking_contention.py
+#
+# Load test for create_booking: many clients hammer the same few rooms of one hotel
+# with random overlapping stays for a fixed time. Reports attempts, confirmed bookings,
+# conflicts (rejected by the exclusion constraint), errors, transaction retries,
+# latency percentiles and throughput, then checks that no two confirmed bookings of
+# those rooms overlap and deletes the bookings it made (unless --keep).
+#
+#   python -m benchmarks.bench_booking_contention --clients 64 --rooms 5 --duration 20
+#
+# The connection pool is sized to --clients unless DB_POOL_MAX is set.
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from datetime import date, timedelta
+
+OVERLAP_CHECK_SQL = """
+    SELECT count(*)
+    FROM bookings a
+    JOIN bookings b ON a.room_id = b.room_id AND a.id < b.id
+    WHERE a.room_id = ANY(%s) AND a.status = 'confirmed' AND b.status = 'confirmed'
+      AND daterange(a.check_in, a.check_out) && daterange(b.check_in, b.check_out);
+"""
+
+
+def pick_rooms(get_connection, hotel, count):
+    """(hotel name, [room ids]) for the named hotel, or the one with the most rooms."""
+    with get_connection() as conn, conn.cursor() as cur:
+        if hotel:
+            cur.execute("SELECT id, name FROM hotels WHERE lower(name) = lower(%s) LIMIT 1", (hotel,))
+        else:
+            cur.execute("""
+                SELECT h.id, h.name FROM hotels h JOIN hotel_rooms hr ON hr.hotel_id = h.id
+                WHERE h.is_active GROUP BY h.id ORDER BY count(*) DESC LIMIT 1
+            """)
+        row = cur.fetchone()
+        if row is None:
+            sys.exit(f"No hotel found{f' named {hotel!r}' if hotel else ''}.")
+        cur.execute("SELECT id FROM hotel_rooms WHERE hotel_id = %s ORDER BY id LIMIT %s", (row[0], count))
+        return row[1], [r[0] for r in cur.fetchall()]
+
+
+def client(book_room, BookingConflict, rooms, args, seed, tag, deadline, results):
+    rng = random.Random(seed)
+    first_day = date.today() + timedelta(days=args.start_offset)
+    counts = {"booked": 0, "conflict": 0, "error": 0}
+    samples, nights = [], 0
+    while time.monotonic() < deadline:
+        ci = first_day + timedelta(days=rng.randrange(args.window_days))
+        co = ci + timedelta(days=rng.randint(1, args.max_nights))
+        start = time.perf_counter()
+        try:
+            book_room(rng.choice(rooms), tag, None, None, ci, co)
+            counts["booked"] += 1
+            nights += (co - ci).days
+        except BookingConflict:
+            counts["conflict"] += 1
+        except Exception:
+            counts["error"] += 1
+        samples.append(time.perf_counter() - start)
+    results.append((counts, samples, nights))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent create_booking load test on one hotel.")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent booking clients (threads)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--hotel", help="hotel name (default: the hotel with the most rooms)")
+    parser.add_argument("--rooms", type=int, default=5, help="how many of its rooms to contend for")
+    parser.add_argument("--start-offset", type=int, default=365, help="days from today of the first bookable night")
+    parser.add_argument("--window-days", type=int, default=30, help="check-in dates are spread over this many days")
+    parser.add_argument("--max-nights", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="keep the bookings made by the run")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    # Pool size is read at import time
+    os.environ.setdefault("DB_POOL_MAX", str(args.clients + 1))
+    from database.db_connection import get_connection, transaction_stats
+    from tools.create_booking import book_room, BookingConflict
+    from benchmarks.bench_tools import summarize
+
+    hotel, rooms = pick_rooms(get_connection, args.hotel, args.rooms)
+    tag = f"bench-{uuid.uuid4().hex[:8]}"   # guest_name of every booking made by this run
+    print(f"{args.clients} clients, {len(rooms)} rooms of {hotel}, {args.duration:g}s, tag {tag}", file=sys.stderr)
+
+    tx_before = transaction_stats()
+    results = []
+    deadline = time.monotonic() + args.duration
+    threads = [threading.Thread(target=client, args=(book_room, BookingConflict, rooms, args,
+                                                     args.seed + i, tag, deadline, results))
+               for i in range(args.clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    tx_after = transaction_stats()
+
+    counts = {"booked": 0, "conflict": 0, "error": 0}
+    samples, nights = [], 0
+    for c, s, n in results:
+        for key in counts:
+            counts[key] += c[key]
+        samples += s
+        nights += n
+
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute(OVERLAP_CHECK_SQL, (rooms,))
+        overlaps = cur.fetchone()[0]
+        if not args.keep:
+            cur.execute("DELETE FROM bookings WHERE guest_name = %s AND room_id = ANY(%s)", (tag, rooms))
+
+    capacity = len(rooms) * (args.window_days + args.max_nights)
+    report = {
+        "meta": {"hotel": hotel, "rooms": rooms, "clients": args.clients, "duration": args.duration,
+                 "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "tag": tag},
+        "attempts": summarize(samples, wall, counts["error"]),
+        **counts,
+        "bookings_per_s": round(counts["booked"] / wall, 2),
+        "retries": tx_after["retries"] - tx_before["retries"],
+        "gave_up": tx_after["gave_up"] - tx_before["gave_up"],
+        "nights_booked": nights,
+        "occupancy": round(nights / capacity, 3) if capacity else 0.0,
+        "overlapping_bookings": overlaps,
+    }
+
+    a = report["attempts"]
+    print(f"attempts {a['count']} ({a['throughput_per_s']}/s), booked {counts['booked']} "
+          f"({report['bookings_per_s']}/s), conflicts {counts['conflict']}, errors {counts['error']}, "
+          f"retries {report['retries']}")
+    print(f"latency ms: p50 {a['p50_ms']}  p95 {a['p95_ms']}  p99 {a['p99_ms']}  max {a['max_ms']}")
+    print(f"occupancy of the contended window: {report['occupancy']:.1%}")
+    print(f"overlapping confirmed bookings: {overlaps}" + ("" if overlaps == 0 else "  <-- DOUBLE BOOKING"))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if overlaps:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
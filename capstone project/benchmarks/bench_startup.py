@@ -0,0 +1,66 @@
+# benchmarks/bench_startup.py
+#
+# Startup cost of the agent registry: import time of agents.build_agents in a fresh
+# interpreter, then per-agent construction time on first use and a full warm-up.
+# Run from the project folder:  python -m benchmarks.bench_startup [--runs 5] [--json]
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import agents.build_agents; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_import(runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], capture_output=True,
+                             text=True, check=True, env=os.environ.copy())
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def measure_builds():
+    from agents.build_agents import agents_map
+    first = {}
+    for name in agents_map:
+        agents_map[name]
+        first[name] = agents_map.build_times[name]
+    return first
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print a JSON report")
+    args = parser.parse_args()
+
+    # Agent construction only needs a key to be present; nothing is sent to the API
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-placeholder")
+    os.environ.pop("AGENTS_WARM", None)
+
+    imports = measure_import(args.runs)
+    builds = measure_builds()
+    report = {
+        "import_seconds": {"median": statistics.median(imports), "min": min(imports), "max": max(imports)},
+        "agent_build_seconds": builds,
+        "warm_all_seconds": sum(builds.values()),
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"import agents.build_agents: median {report['import_seconds']['median'] * 1000:.1f} ms "
+          f"over {args.runs} runs")
+    for name, seconds in sorted(builds.items(), key=lambda kv: -kv[1]):
+        print(f"  build {name:<36} {seconds * 1000:8.1f} ms")
+    print(f"warm all {len(builds)} agents: {report['warm_all_seconds'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
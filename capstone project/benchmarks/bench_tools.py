@@ -0,0 +1,265 @@
+# benchmarks/bench_tools.py
+#
+# Latency percentiles and throughput for every tool in tools/ and for the Nova agent
+# with a stubbed model (no Bedrock calls), against whatever database .env points at
+# (see benchmarks/generate_dataset.py for a large one). Inputs are sampled from the
+# data so lookups hit real rows. Reports are JSON so runs can be compared:
+#
+#   python -m benchmarks.bench_tools --iterations 200 --out before.json
+#   python -m benchmarks.bench_tools --iterations 200 --out after.json --compare before.json
+
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from database.db_connection import get_connection
+from database.statements import statement_stats
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def summarize(samples, wall_seconds, errors):
+    values = sorted(samples)
+    ms = lambda v: round(v * 1000, 3)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "mean_ms": ms(sum(values) / len(values)) if values else 0.0,
+        "p50_ms": ms(percentile(values, 0.50)),
+        "p90_ms": ms(percentile(values, 0.90)),
+        "p95_ms": ms(percentile(values, 0.95)),
+        "p99_ms": ms(percentile(values, 0.99)),
+        "max_ms": ms(values[-1]) if values else 0.0,
+        "throughput_per_s": round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+    }
+
+
+def run_case(fn, make_args, iterations, concurrency, warmup):
+    for _ in range(warmup):
+        fn(*make_args())
+
+    def one(_):
+        """(seconds, succeeded); nothing shared is mutated, so pool threads need no lock."""
+        args = make_args()
+        start = time.perf_counter()
+        try:
+            fn(*args)
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, range(iterations)))
+    else:
+        results = [one(i) for i in range(iterations)]
+    wall = time.perf_counter() - start
+    # Failed calls often return early; keeping them would drag the percentiles down
+    samples = [seconds for seconds, ok in results if ok]
+    return summarize(samples, wall, len(results) - len(samples))
+
+
+# -------------------------
+# Inputs sampled from the database
+# -------------------------
+def sample_inputs(rng, limit=500):
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT name, city FROM hotels TABLESAMPLE SYSTEM (10) LIMIT %s", (limit,))
+        hotels = cur.fetchall()
+        if not hotels:
+            cur.execute("SELECT name, city FROM hotels LIMIT %s", (limit,))
+            hotels = cur.fetchall()
+        cur.execute("SELECT id FROM hotel_rooms TABLESAMPLE SYSTEM (1) LIMIT %s", (limit,))
+        rooms = [r[0] for r in cur.fetchall()] or [1]
+        cur.execute("SELECT id FROM bookings TABLESAMPLE SYSTEM (1) LIMIT %s", (limit,))
+        bookings = [r[0] for r in cur.fetchall()] or [1]
+        cur.execute("SELECT count(*) FROM hotels")
+        counts = {"hotels": cur.fetchone()[0]}
+        cur.execute("SELECT reltuples::bigint FROM pg_class WHERE relname IN ('hotel_rooms', 'bookings') ORDER BY relname")
+        counts["bookings_estimate"], counts["rooms_estimate"] = [r[0] for r in cur.fetchall()]
+    names = [h[0] for h in hotels]
+    cities = sorted({h[1] for h in hotels})
+
+    def stay():
+        start = date.today() + timedelta(days=rng.randint(0, 120))
+        return start.isoformat(), (start + timedelta(days=rng.randint(1, 7))).isoformat()
+
+    return names, cities, rooms, bookings, stay, counts
+
+
+def tool_cases(rng):
+    from tools.search_hotels_by_city import search_hotels_by_city
+    from tools.search_hotels_by_rating import search_hotels_by_rating
+    from tools.search_hotels_by_price_range import search_hotels_by_price_range
+    from tools.search_hotel_by_name import search_hotel_by_name
+    from tools.get_hotel_details import get_hotel_details
+    from tools.get_room_types_and_prices import get_room_types_and_prices
+    from tools.get_available_rooms import get_available_rooms
+    from tools.get_booking_details import get_booking_details
+    from tools.check_room_availability_by_dates import check_room_availability_by_dates
+    from tools.search_available_rooms_by_dates import search_available_rooms_by_dates
+    from tools.get_free_rooms_for_stay import get_free_rooms_for_stay
+    from tools.search_hotels_near import search_hotels_near
+    from tools.search_hotels_by_amenities import search_hotels_by_amenities
+    from tools.search_hotels import search_hotels
+
+    names, cities, rooms, bookings, stay, counts = sample_inputs(rng)
+    pick = rng.choice
+
+    def room_stay():
+        return (pick(rooms),) + stay()
+
+    def price_query():
+        low = rng.randint(20, 300)
+        return (f"{pick(cities)} between {low} and {low + rng.randint(20, 400)}",)
+
+    def free_rooms_query():
+        ci, co = stay()
+        return (f"{pick(names)} from {ci} to {co}",)
+
+    def near_query():
+        return (rng.choice([f"closest 10 to {pick(names)}", f"hotels within {rng.randint(1, 20)} km of {pick(names)}",
+                            f"hotels near {pick(cities)} with {rng.randint(3, 5)} stars under {rng.randint(50, 400)}"]),)
+
+    def amenity_query():
+        wanted = rng.sample(["pool", "spa", "gym", "wifi", "restaurant", "parking", "mini bar", "balcony"], rng.randint(1, 3))
+        return (f"hotels in {pick(cities)} with {rng.choice([' and ', ' or ']).join(wanted)}",)
+
+    def multi_query():
+        ci, co = stay()
+        return (f"{rng.randint(3, 5)}-star hotels in {pick(cities)} under {rng.randint(80, 400)} "
+                f"for {rng.randint(1, 4)} guests from {ci} to {co}",)
+
+    cases = {
+        "search_hotels_by_city": (search_hotels_by_city.func, lambda: (pick(cities),)),
+        "search_hotels_by_rating": (search_hotels_by_rating.func, lambda: (float(rng.randint(1, 5)),)),
+        "search_hotels_by_price_range": (search_hotels_by_price_range.func, price_query),
+        "search_hotel_by_name": (search_hotel_by_name.func, lambda: (pick(names),)),
+        "get_hotel_details": (get_hotel_details.func, lambda: (pick(names),)),
+        "get_room_types_and_prices": (get_room_types_and_prices.func, lambda: (pick(names),)),
+        "get_available_rooms": (get_available_rooms.func, lambda: (pick(names),) + stay()),
+        "get_booking_details": (get_booking_details.func, lambda: (pick(bookings),)),
+        "check_room_availability_by_dates": (check_room_availability_by_dates.func, room_stay),
+        "search_available_rooms_by_dates": (search_available_rooms_by_dates.func, room_stay),
+        "get_free_rooms_for_stay": (get_free_rooms_for_stay.func, free_rooms_query),
+        "search_hotels_near": (search_hotels_near.func, near_query),
+        "search_hotels_by_amenities": (search_hotels_by_amenities.func, amenity_query),
+        "search_hotels": (search_hotels.func, multi_query),
+    }
+    return cases, cities, counts
+
+
+# -------------------------
+# Agent with a stubbed Nova
+# -------------------------
+def agent_case(cities, rng, nova_latency):
+    """
+    Full agent loop (prompting, output parsing, tool call, memory) with Nova replaced by a
+    script: first turn calls the city tool, second turn answers. Measures everything but Bedrock.
+    """
+    import hotel_chatbort
+
+    def fake_nova(prompt):
+        if nova_latency:
+            time.sleep(nova_latency)
+        if "Observation:" in prompt.rsplit("Question:", 1)[-1]:
+            return "Thought: I now know the final answer\nFinal Answer: Here are the hotels."
+        return f"Thought: look up hotels\nAction: Search Hotels by City\nAction Input: {rng.choice(cities)}"
+
+    hotel_chatbort._invoke_nova = fake_nova
+    hotel_chatbort.prompt_cache.max_entries = 0   # every prompt goes to the stub
+    hotel_chatbort.prompt_cache.clear()
+    agent = hotel_chatbort.get_session_agent("benchmark")
+    return agent.run, lambda: (f"Show hotels in {rng.choice(cities)}",)
+
+
+# -------------------------
+# Reports
+# -------------------------
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_report(report, baseline=None):
+    base = (baseline or {}).get("results", {})
+    header = f"{'case':<34} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>9} {'err':>4}"
+    if base:
+        header += f" {'Δp50':>8} {'Δp95':>8} {'Δops/s':>8}"
+    print(header)
+    delta = lambda new, old: f"{(new - old) / old * 100:+7.1f}%" if old else f"{'n/a':>8}"
+    for name, r in report["results"].items():
+        line = (f"{name:<34} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+                f"{r['throughput_per_s']:>9.1f} {r['errors']:>4}")
+        if name in base:
+            b = base[name]
+            line += (f" {delta(r['p50_ms'], b['p50_ms'])} {delta(r['p95_ms'], b['p95_ms'])} "
+                     f"{delta(r['throughput_per_s'], b['throughput_per_s'])}")
+        print(line)
+    if baseline:
+        print(f"\nbaseline: {baseline['meta'].get('commit')} at {baseline['meta'].get('started_at')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hotel tools and the stubbed agent.")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1, help="worker threads per case")
+    parser.add_argument("--only", nargs="*", help="case names to run (default: all)")
+    parser.add_argument("--no-agent", action="store_true", help="skip the stubbed-agent case")
+    parser.add_argument("--nova-latency", type=float, default=0.0, help="seconds the Nova stub sleeps per call")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to diff against")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases, cities, counts = tool_cases(rng)
+    if not args.no_agent:
+        cases["agent (stubbed nova)"] = agent_case(cities, rng, args.nova_latency)
+    if args.only:
+        cases = {name: case for name, case in cases.items() if name in args.only}
+
+    report = {
+        "meta": {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "dataset": counts,
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "nova_latency": args.nova_latency,
+        },
+        "results": {},
+    }
+    for name, (fn, make_args) in cases.items():
+        print(f"running {name}...", file=sys.stderr)
+        report["results"][name] = run_case(fn, make_args, args.iterations, args.concurrency, args.warmup)
+    report["statements"] = statement_stats()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# benchmarks/check_plans.py
+#
+# Plan check for every statement in the registry (database/statements.py): each one
+# is PREPAREd and EXPLAINed with parameters sampled from the database, once as a
+# custom plan and once as the generic plan a prepared statement settles on after a
+# few executions. A plan fails when it sequentially scans a table larger than
+# --min-rows, so run this against the benchmark dataset (benchmarks/generate_dataset.py),
+# where a missing index actually shows:
+#
+#   python -m benchmarks.check_plans --out plans.json
+#
+# search_hotels assembles its SQL per call from optional clauses, so it isn't in the
+# registry; a few representative criteria shapes are compiled and EXPLAINed as well
+# (planned per call, so only the custom plan applies). A registered statement without
+# sample parameters fails the check instead of being skipped, so new SQL can't go unchecked.
+#
+# Nothing is executed (plain EXPLAIN), so the write statements are safe to check.
+# Exits with status 1 when any plan fails.
+
+import os
+import sys
+import json
+import argparse
+import importlib
+from datetime import date, timedelta
+
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+PLAN_MODES = ("force_custom_plan", "force_generic_plan")
+
+
+def load_statements():
+    """Import every tool module so its statements register themselves."""
+    for filename in sorted(os.listdir(TOOLS_DIR)):
+        if filename.endswith(".py"):
+            importlib.import_module(f"tools.{filename[:-3]}")
+    from database.statements import statements
+    return list(statements)
+
+
+def sample_params(cur):
+    """Parameters per statement name, built from a real hotel, room and booking."""
+    cur.execute("""
+        SELECT h.name, h.city, h.latitude, h.longitude, hr.id
+        FROM hotels h JOIN hotel_rooms hr ON hr.hotel_id = h.id
+        WHERE h.latitude IS NOT NULL
+        LIMIT 1
+    """)
+    row = cur.fetchone()
+    if row is None:
+        sys.exit("No hotels with rooms; load a dataset first (benchmarks/generate_dataset.py).")
+    name, city, lat, lon, room_id = row
+    cur.execute("SELECT id, coalesce(guest_email, '') FROM bookings ORDER BY id DESC LIMIT 1")
+    booking_id, email = cur.fetchone() or (1, "")
+    ci = date.today() + timedelta(days=30)
+    co = ci + timedelta(days=3)
+    lat, lon = float(lat), float(lon)
+    from tools.paging import TOOL_PAGE_SIZE
+    return {
+        "_search": (city, ci, co),             # inputs for search_shapes(), not a statement
+        "room_overlap": (room_id, ci, co),
+        "rooms_with_bookings": ([city.lower()], [name.lower()], ci, co),
+        "booking_details": (booking_id,),
+        "booking_status": (booking_id,),
+        "cancel_booking": (booking_id, email, None),
+        "create_booking": (room_id, "plan check", None, None, ci, co, co, ci),
+        "name_match_threshold": ("0.5",),
+        "available_rooms": (name, name, ci, co, None, None, None, None, TOOL_PAGE_SIZE + 1),
+        "price_range": (" ".join(city.split()).lower(), 50, 200, 20),
+        "hotels_near": (lat, lon, 0, False, 0, 10 ** 12, 5000.0, lat, lon, 5000.0, lat, lon, 10),
+    }
+
+
+def search_shapes(city, ci, co):
+    """name -> (SQL, params) of representative search_hotels queries, first page."""
+    from tools.search_hotels import NO_CRITERIA, compile_search
+    from tools.paging import TOOL_PAGE_SIZE
+    from database.inventory_cache import inventory_cache
+    city = " ".join(city.split()).lower()
+    criteria = {
+        "search_hotels[city]": NO_CRITERIA._replace(city=city),
+        "search_hotels[city,stars,price]": NO_CRITERIA._replace(city=city, min_stars=3.0, min_price=50.0, max_price=200.0),
+        "search_hotels[stars,stay,type,guests]": NO_CRITERIA._replace(min_stars=4.0, check_in=ci, check_out=co,
+                                                                      room_type="double", guests=2),
+    }
+    amenities = tuple(inventory_cache.amenity_names()[:2])
+    if amenities:
+        criteria["search_hotels[city,amenities]"] = NO_CRITERIA._replace(city=city, amenities=amenities)
+        criteria["search_hotels[any amenity]"] = NO_CRITERIA._replace(amenities=amenities, any_of=True)
+    shapes = {}
+    for name, c in criteria.items():
+        sql, params = compile_search(c)
+        shapes[name] = (sql, params + [None] * 5 + [TOOL_PAGE_SIZE + 1])
+    return shapes
+
+
+def table_sizes(cur):
+    cur.execute("""
+        SELECT relname, reltuples::bigint FROM pg_class
+        WHERE relkind IN ('r', 'p') AND relnamespace = 'public'::regnamespace
+    """)
+    return dict(cur.fetchall())
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+def check_plan(plan, sizes, min_rows):
+    """(problems, index names used) of one EXPLAIN (FORMAT JSON) plan."""
+    problems, indexes = [], set()
+    for node in plan_nodes(plan["Plan"]):
+        if "Index Name" in node:
+            indexes.add(node["Index Name"])
+        relation = node.get("Relation Name")
+        if node["Node Type"] == "Seq Scan" and sizes.get(relation, 0) >= min_rows:
+            problems.append(f"Seq Scan on {relation} (~{sizes[relation]:,} rows)")
+    return problems, sorted(indexes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN every registered statement and flag sequential scans.")
+    parser.add_argument("--min-rows", type=int, default=10_000,
+                        help="sequential scans of tables at least this large fail the check")
+    parser.add_argument("--only", nargs="*", help="statement names to check (default: all)")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    from database.db_connection import get_connection
+    from database.statements import statements
+    registered = load_statements()
+    if args.only:
+        registered = [s for s in registered if s.name in args.only]
+
+    def explain(cur, sql, params):
+        cur.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cur.fetchone()[0][0]
+        problems, indexes = check_plan(plan, sizes, args.min_rows)
+        return {"indexes": indexes, "problems": problems, "total_cost": plan["Plan"]["Total Cost"]}
+
+    def record(name, result, shown_mode):
+        nonlocal failed
+        if any(r["problems"] for r in result["plans"].values()):
+            result["status"] = "fail"
+        failed += result["status"] == "fail"
+        report[name] = result
+        problems = sorted({p for r in result["plans"].values() for p in r["problems"]})
+        print(f"{result['status'].upper():<5} {name:<38} "
+              f"{', '.join(result['plans'][shown_mode]['indexes']) or '(no index)'}"
+              + (f"  <-- {'; '.join(problems)}" if problems else ""))
+
+    report, failed = {}, 0
+    with get_connection() as conn, conn.cursor() as cur:
+        samples = sample_params(cur)
+        sizes = table_sizes(cur)
+        for statement in registered:
+            params = samples.get(statement.name)
+            if params is None:
+                report[statement.name] = {"status": "fail", "reason": "no sample parameters"}
+                failed += 1
+                print(f"FAIL  {statement.name:<38} no sample parameters (add them to sample_params)")
+                continue
+            statements.prepare(cur, statement)
+            result = {"status": "ok", "plans": {}}
+            for mode in PLAN_MODES:
+                cur.execute("SET LOCAL plan_cache_mode = %s", (mode,))
+                result["plans"][mode] = explain(cur, statement.execute_sql, params)
+            record(statement.name, result, "force_generic_plan")
+        if not args.only:
+            cur.execute("RESET plan_cache_mode")
+            for shape, (sql, params) in search_shapes(*samples["_search"]).items():
+                record(shape, {"status": "ok", "plans": {"per_call": explain(cur, sql, params)}}, "per_call")
+        conn.rollback()
+
+    print(f"\n{len(report)} statements, {failed} failing (seq scans of tables >= {args.min_rows:,} rows, "
+          f"or no sample parameters)")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"min_rows": args.min_rows, "tables": sizes, "statements": report}, f, indent=2, default=str)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
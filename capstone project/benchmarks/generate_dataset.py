@@ -0,0 +1,307 @@
+# benchmarks/generate_dataset.py
+#
+# Synthetic hotels / hotel_rooms / bookings at production scale, loaded with COPY
+# into the schema from hotel_setup.sql (run that first on an empty database).
+# Bookings of one room never overlap, so the exclusion constraint accepts them;
+# stays are mostly short, with gaps between them, and end up spread around --today
+# (past stays are 'completed', a few are 'cancelled', the rest 'confirmed').
+#
+# Run from the project folder, e.g.
+#   python -m benchmarks.generate_dataset --hotels 100000 --rooms 5000000 --bookings 50000000 --truncate
+#   python -m benchmarks.generate_dataset --hotels 1000 --csv-dir /tmp/hotels_csv   # no database needed
+
+import os
+import io
+import sys
+import time
+import argparse
+from datetime import date, timedelta
+import numpy as np
+
+CITIES = ["Lahore", "Karachi", "Islamabad", "Rawalpindi", "Faisalabad", "Multan", "Peshawar",
+          "Quetta", "Sialkot", "Gujranwala", "Hyderabad", "Murree", "Abbottabad", "Bahawalpur",
+          "Sukkur", "Gilgit", "Skardu", "Swat", "Gwadar", "Muzaffarabad"]
+# (lat, lon) per city, hotels are scattered around it
+CITY_CENTERS = [(31.55, 74.34), (24.86, 67.00), (33.68, 73.05), (33.60, 73.04), (31.42, 73.08),
+                (30.16, 71.52), (34.01, 71.58), (30.18, 66.97), (32.49, 74.53), (32.16, 74.19),
+                (25.40, 68.37), (33.91, 73.39), (34.17, 73.22), (29.40, 71.68), (27.71, 68.86),
+                (35.92, 74.31), (35.30, 75.63), (35.22, 72.43), (25.12, 62.33), (34.37, 73.47)]
+NAME_PREFIXES = ["Pearl", "Royal", "Grand", "Crown", "Garden", "Heritage", "Shalimar", "Indus",
+                 "Margalla", "Ravi", "Regent", "Avari", "Serena", "Palm", "Park", "Orchid", "Cedar",
+                 "Golden", "Silver", "Emerald", "Lotus", "Falcon", "Summit", "Harbour", "Citadel"]
+NAME_SUFFIXES = ["Hotel", "Inn", "Residency", "Suites", "Lodge", "Towers", "Continental", "Resort",
+                 "Palace", "Guest House"]
+HOTEL_AMENITIES = ["WiFi", "Pool", "Gym", "Spa", "Restaurant", "Parking", "Airport Shuttle",
+                   "Conference Rooms", "Room Service", "Sea View", "Nature Walks", "Bar"]
+ROOM_AMENITIES = ["WiFi", "TV", "Mini Bar", "Air Conditioning", "Safe", "Balcony", "Kettle", "Bathtub"]
+ROOM_TYPES = np.array(["single", "double", "suite", "family", "deluxe"])
+ROOM_TYPE_WEIGHTS = [0.35, 0.35, 0.08, 0.12, 0.10]
+ROOM_TYPE_PRICE = np.array([1.0, 1.4, 3.0, 2.0, 2.2])
+STAR_WEIGHTS = [0.05, 0.15, 0.35, 0.30, 0.15]
+# Stay length in nights (1..14): mostly weekend / short business trips
+STAY_WEIGHTS = np.array([30, 25, 15, 9, 6, 4, 5, 1.5, 1, 1, 0.7, 0.5, 0.3, 2], dtype=float)
+STAY_WEIGHTS /= STAY_WEIGHTS.sum()
+OCCUPANCY = 0.65
+CHUNK = 100_000
+
+HOTEL_COLUMNS = ("id, name, city, address, stars, description, phone_number, email, "
+                 "latitude, longitude, amenities, is_active")
+ROOM_COLUMNS = "id, hotel_id, room_number, capacity, price_per_night, room_type, is_available, image_urls, amenities"
+BOOKING_COLUMNS = ("id, room_id, guest_name, guest_email, guest_phone, check_in, check_out, "
+                   "total_amount, status")
+
+
+def pg_array(items):
+    return "{" + ",".join(f'"{i}"' for i in items) + "}"
+
+
+def csv_text(value):
+    return '"' + value.replace('"', '""') + '"'
+
+
+def split_counts(total, parts, rng):
+    """`total` items spread over `parts` owners, Poisson-ish but summing exactly to `total`."""
+    if parts == 0:
+        return np.zeros(0, dtype=np.int64)
+    weights = rng.gamma(2.0, 1.0, parts)
+    counts = np.floor(weights / weights.sum() * total).astype(np.int64)
+    short = total - counts.sum()
+    if short:
+        np.add.at(counts, rng.choice(parts, short), 1)
+    return counts
+
+
+# -------------------------
+# Row generators (CSV lines, chunked)
+# -------------------------
+def hotel_rows(first_id, cities, stars, rng):
+    for start in range(0, len(stars), CHUNK):
+        n = min(CHUNK, len(stars) - start)
+        prefixes = rng.integers(0, len(NAME_PREFIXES), n)
+        suffixes = rng.integers(0, len(NAME_SUFFIXES), n)
+        jitter = rng.normal(0, 0.05, (n, 2))
+        amenity_mask = rng.random((n, len(HOTEL_AMENITIES))) < (0.2 + stars[start:start + n, None] * 0.1)
+        active = rng.random(n) > 0.02
+        lines = []
+        for i in range(n):
+            hid, city_idx, star = first_id + start + i, cities[start + i], stars[start + i]
+            city = CITIES[city_idx]
+            name = f"{NAME_PREFIXES[prefixes[i]]} {NAME_SUFFIXES[suffixes[i]]} {city} {hid}"
+            lat, lon = CITY_CENTERS[city_idx]
+            amenities = [a for a, keep in zip(HOTEL_AMENITIES, amenity_mask[i]) if keep] or ["WiFi"]
+            lines.append(",".join((
+                str(hid), csv_text(name), city, csv_text(f"Block {hid % 97}, {city}"), str(star),
+                csv_text(f"{star}-star stay in {city}"), f"+92-{hid % 90 + 10}-{hid:07d}",
+                f"hotel{hid}@example.com", f"{lat + jitter[i, 0]:.6f}", f"{lon + jitter[i, 1]:.6f}",
+                csv_text(pg_array(amenities)), "t" if active[i] else "f",
+            )))
+        yield "\n".join(lines) + "\n"
+
+
+def room_rows(first_id, owners, types, prices, rng):
+    numbers = np.arange(len(owners)) - np.searchsorted(owners, owners) + 1   # owners are sorted
+    for start in range(0, len(owners), CHUNK):
+        n = min(CHUNK, len(owners) - start)
+        kinds = ROOM_TYPES[types[start:start + n]]
+        capacity = np.where(kinds == "family", rng.integers(3, 7, n),
+                            np.where(kinds == "single", 1, rng.integers(2, 4, n)))
+        amenity_mask = rng.random((n, len(ROOM_AMENITIES))) < 0.5
+        available = rng.random(n) > 0.1
+        lines = []
+        for i in range(n):
+            room_id, j = first_id + start + i, start + i
+            amenities = [a for a, keep in zip(ROOM_AMENITIES, amenity_mask[i]) if keep] or ["WiFi"]
+            lines.append(",".join((
+                str(room_id), str(owners[j]), f"R{numbers[j]}", str(capacity[i]), f"{prices[j]:.2f}",
+                kinds[i], "t" if available[i] else "f",
+                csv_text(pg_array([f"https://example.com/rooms/{room_id}.jpg"])),
+                csv_text(pg_array(amenities)),
+            )))
+        yield "\n".join(lines) + "\n"
+
+
+def booking_rows(first_id, room_ids, room_prices, bookings_per_room, today, rng):
+    """
+    Per room: a sequence of stays separated by exponential gaps sized for ~OCCUPANCY,
+    shifted so ~70% of the room's timeline is before `today`. Never overlapping.
+    """
+    mean_stay = float((np.arange(1, 15) * STAY_WEIGHTS).sum())
+    mean_gap = mean_stay * (1 - OCCUPANCY) / OCCUPANCY
+    booking_id = first_id
+    step = max(1, CHUNK // 10)
+    for start in range(0, len(room_ids), step):
+        counts = bookings_per_room[start:start + step]
+        n = int(counts.sum())
+        if n == 0:
+            continue
+        owners = np.repeat(room_ids[start:start + step], counts)
+        prices = np.repeat(room_prices[start:start + step], counts)
+        stays = rng.choice(14, n, p=STAY_WEIGHTS) + 1
+        gaps = np.ceil(rng.exponential(mean_gap, n)).astype(np.int64)
+        # Each stay is (gap, stay); offsets restart at 0 for every room
+        ends = np.concatenate([[0], np.cumsum(stays + gaps)])
+        firsts = np.cumsum(counts) - counts
+        room_start = np.repeat(ends[firsts], counts)
+        room_length = np.repeat(ends[firsts + counts] - ends[firsts], counts)
+        check_out_offset = ends[1:] - room_start - np.round(room_length * 0.7).astype(np.int64)
+        check_in_offset = check_out_offset - stays
+        status = np.where(check_out_offset <= 0, "completed", "confirmed").astype(object)
+        status[rng.random(n) < 0.04] = "cancelled"
+        totals = np.round(prices * stays, 2)
+        guests = rng.integers(0, 9_999_999, n)
+        lines = []
+        for i in range(n):
+            ci = today + timedelta(days=int(check_in_offset[i]))
+            lines.append(",".join((
+                str(booking_id), str(owners[i]), f"Guest {guests[i]}", f"guest{guests[i]}@example.com",
+                f"+92-3{guests[i]:07d}", ci.isoformat(), (ci + timedelta(days=int(stays[i]))).isoformat(),
+                f"{totals[i]:.2f}", status[i],
+            )))
+            booking_id += 1
+        yield "\n".join(lines) + "\n"
+
+
+class ChunkReader(io.TextIOBase):
+    """File-like view over a generator of text chunks, for copy_expert()."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = ""
+        self.rows = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self.rows += chunk.count("\n")
+            self._buffer += chunk
+        if size < 0:
+            size = len(self._buffer)
+        out, self._buffer = self._buffer[:size], self._buffer[size:]
+        return out
+
+
+# -------------------------
+# Sinks: COPY into Postgres, or CSV files
+# -------------------------
+class CopySink:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def first_id(self, table):
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT coalesce(max(id), 0) + 1 FROM {table}")
+            return cur.fetchone()[0]
+
+    def load(self, table, columns, chunks):
+        reader = ChunkReader(chunks)
+        with self.conn.cursor() as cur:
+            cur.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", reader)
+            cur.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT coalesce(max(id), 1) FROM {table}))")
+        self.conn.commit()
+        return reader.rows
+
+    def finish(self):
+        old = self.conn.autocommit
+        self.conn.autocommit = True
+        with self.conn.cursor() as cur:
+            cur.execute("ANALYZE hotels, hotel_rooms, bookings")
+        self.conn.autocommit = old
+
+
+class CsvSink:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def first_id(self, table):
+        return 1
+
+    def load(self, table, columns, chunks):
+        rows = 0
+        with open(os.path.join(self.directory, f"{table}.csv"), "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                rows += chunk.count("\n")
+                f.write(chunk)
+        return rows
+
+    def finish(self):
+        pass
+
+
+def generate(sink, hotels, rooms, bookings, today, seed):
+    rng = np.random.default_rng(seed)
+    report = {}
+
+    # Attributes later tables depend on are drawn up front; the rest per chunk
+    city_weights = 1.0 / np.arange(1, len(CITIES) + 1)   # Zipf: a few big cities hold most hotels
+    city_weights /= city_weights.sum()
+    cities = rng.choice(len(CITIES), hotels, p=city_weights)
+    stars = rng.choice(5, hotels, p=STAR_WEIGHTS) + 1
+    first_hotel = sink.first_id("hotels")
+    start = time.perf_counter()
+    report["hotels"] = sink.load("hotels", HOTEL_COLUMNS, hotel_rows(first_hotel, cities, stars, rng))
+    report["hotels_seconds"] = time.perf_counter() - start
+
+    rooms_per_hotel = split_counts(rooms, hotels, rng)
+    owners = np.repeat(np.arange(first_hotel, first_hotel + hotels), rooms_per_hotel)
+    types = rng.choice(len(ROOM_TYPES), rooms, p=ROOM_TYPE_WEIGHTS)
+    base = 25.0 * np.repeat(stars, rooms_per_hotel) ** 1.3
+    prices = np.round(base * ROOM_TYPE_PRICE[types] * rng.lognormal(0, 0.25, rooms), 2).clip(10, 5000)
+    first_room = sink.first_id("hotel_rooms")
+    start = time.perf_counter()
+    report["rooms"] = sink.load("hotel_rooms", ROOM_COLUMNS, room_rows(first_room, owners, types, prices, rng))
+    report["rooms_seconds"] = time.perf_counter() - start
+
+    bookings_per_room = split_counts(bookings, rooms, rng)
+    room_ids = np.arange(first_room, first_room + rooms)
+    start = time.perf_counter()
+    report["bookings"] = sink.load("bookings", BOOKING_COLUMNS,
+                                   booking_rows(sink.first_id("bookings"), room_ids, prices,
+                                                bookings_per_room, today, rng))
+    report["bookings_seconds"] = time.perf_counter() - start
+    sink.finish()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and load a synthetic hotel dataset.")
+    parser.add_argument("--hotels", type=int, default=1000)
+    parser.add_argument("--rooms", type=int, default=None, help="total rooms (default 50 per hotel)")
+    parser.add_argument("--bookings", type=int, default=None, help="total bookings (default 10 per room)")
+    parser.add_argument("--today", type=date.fromisoformat, default=date.today(),
+                        help="date the booking timelines are centred on (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--truncate", action="store_true", help="empty the three tables first")
+    parser.add_argument("--csv-dir", help="write hotels.csv / hotel_rooms.csv / bookings.csv instead of loading")
+    args = parser.parse_args()
+    rooms = args.rooms if args.rooms is not None else args.hotels * 50
+    bookings = args.bookings if args.bookings is not None else rooms * 10
+
+    if args.csv_dir:
+        sink = CsvSink(args.csv_dir)
+    else:
+        from database.db_connection import connect_unpooled
+        conn = connect_unpooled()
+        if args.truncate:
+            with conn.cursor() as cur:
+                cur.execute("TRUNCATE bookings, hotel_rooms, hotels RESTART IDENTITY CASCADE")
+            conn.commit()
+        sink = CopySink(conn)
+
+    start = time.perf_counter()
+    report = generate(sink, args.hotels, rooms, bookings, args.today, args.seed)
+    for table in ("hotels", "rooms", "bookings"):
+        seconds = report[f"{table}_seconds"]
+        print(f"{table:<9} {report[table]:>12,} rows  {seconds:8.1f} s  "
+              f"{report[table] / seconds if seconds else 0:>12,.0f} rows/s")
+    print(f"total {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
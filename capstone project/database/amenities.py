@@ -0,0 +1,98 @@
+# database/amenities.py
+#
+# Interned amenity vocabulary for the inventory cache. Every distinct amenity of
+# hotels.amenities / hotel_rooms.amenities gets one bit; each hotel and room then
+# carries an int bitmask, so an AND filter is `mask & want == want` and an OR filter
+# is `mask & want != 0` per candidate. Keys are canonicalized like amenity_keys() in
+# hotel_setup.sql (lower-cased, non-alphanumerics dropped: "Wi-Fi" -> "wifi"), so the
+# cached path and the GIN-indexed SQL path agree on what matches.
+
+import re
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+# User words -> canonical key of the amenity they mean
+SYNONYMS = {
+    "wireless": "wifi", "internet": "wifi", "wlan": "wifi",
+    "swimmingpool": "pool", "swimming": "pool",
+    "fitness": "gym", "fitnesscenter": "gym", "fitnesscentre": "gym", "gymnasium": "gym",
+    "carpark": "parking", "freeparking": "parking",
+    "ac": "airconditioning", "aircon": "airconditioning", "airconditioner": "airconditioning",
+    "television": "tv",
+    "minibars": "minibar", "fridge": "minibar",
+    "shuttle": "airportshuttle", "airporttransfer": "airportshuttle",
+    "meetingrooms": "conferencerooms", "conferenceroom": "conferencerooms",
+    "bath": "bathtub", "tub": "bathtub",
+    "seaviews": "seaview", "oceanview": "seaview",
+}
+
+
+def amenity_key(name: str) -> str:
+    return _NON_ALNUM_RE.sub("", name.lower())
+
+
+class AmenityVocabulary:
+    """Canonical amenity key <-> bit position, plus the display name first seen for each key."""
+
+    def __init__(self):
+        self._bits = {}
+        self._names = []
+        self.hotel_keys = 0     # bits of amenities that appear on some hotel
+        self.room_keys = 0      # bits of amenities that appear on some room
+
+    @classmethod
+    def of(cls, names):
+        """Vocabulary of `names` with bits assigned in key order, so every load numbers them alike."""
+        vocab = cls()
+        for name in sorted((n for n in names if n and n.strip()), key=lambda n: (amenity_key(n), n.strip())):
+            vocab.intern(name)
+        return vocab
+
+    def __len__(self):
+        return len(self._names)
+
+    def intern(self, name: str) -> int:
+        key = amenity_key(name)
+        bit = self._bits.get(key)
+        if bit is None:
+            bit = self._bits[key] = len(self._names)
+            self._names.append(name.strip())
+        return bit
+
+    def mask_of(self, names, room=False) -> int:
+        """Bitmask of `names`, interning new ones (used while building a snapshot)."""
+        mask = 0
+        for name in names:
+            if name and name.strip():
+                mask |= 1 << self.intern(name)
+        if room:
+            self.room_keys |= mask
+        else:
+            self.hotel_keys |= mask
+        return mask
+
+    def resolve(self, term: str):
+        """Bit of the known amenity a user's `term` refers to, or None."""
+        key = amenity_key(term)
+        for candidate in (key, SYNONYMS.get(key), key[:-1] if key.endswith("s") else None, key + "s"):
+            if candidate and candidate in self._bits:
+                return self._bits[candidate]
+        return None
+
+    def key(self, bit: int) -> str:
+        return amenity_key(self._names[bit])
+
+    def names(self, mask: int):
+        """Display names of the bits set in `mask`, in vocabulary order."""
+        return [name for bit, name in enumerate(self._names) if mask >> bit & 1]
+
+    def split(self, mask: int):
+        """(hotel-level bits, room-only bits) of `mask`; amenities hotels list count as hotel-level."""
+        return mask & self.hotel_keys, mask & ~self.hotel_keys
+
+
+def matches(mask: int, want: int, any_of=False) -> bool:
+    """AND (all bits of `want`) or OR (any bit of `want`) test; an empty `want` always matches."""
+    if not want:
+        return True
+    return mask & want != 0 if any_of else mask & want == want
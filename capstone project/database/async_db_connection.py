@@ -0,0 +1,80 @@
+# database/async_db_connection.py
+#
+# asyncpg counterpart of db_connection.py for the async tool variants.
+# Pools are bound to the event loop that created them, so one pool is kept per loop.
+# Synchronous callers (Streamlit, the intent router) go through run_async(), which
+# submits to a single long-lived background loop and therefore reuses one pool.
+
+import os
+import re
+import asyncio
+import threading
+import weakref
+from functools import lru_cache
+import asyncpg
+from dotenv import load_dotenv
+from database.db_connection import POOL_MIN_SIZE, POOL_MAX_SIZE
+
+load_dotenv()
+
+_pools = weakref.WeakKeyDictionary()       # event loop -> asyncpg pool
+_pool_locks = weakref.WeakKeyDictionary()  # event loop -> asyncio.Lock
+
+
+async def get_async_pool():
+    """Return the asyncpg pool for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is not None:
+        return pool
+    lock = _pool_locks.setdefault(loop, asyncio.Lock())
+    async with lock:
+        pool = _pools.get(loop)
+        if pool is None:
+            pool = await asyncpg.create_pool(
+                database=os.getenv("DB_NAME", "program"),
+                user=os.getenv("DB_USER", "postgres"),
+                password=os.getenv("DB_PASS", "112233"),
+                host=os.getenv("DB_HOST", "localhost"),
+                port=int(os.getenv("DB_PORT", "5432")),
+                min_size=POOL_MIN_SIZE,
+                max_size=POOL_MAX_SIZE,
+            )
+            _pools[loop] = pool
+    return pool
+
+
+@lru_cache(maxsize=None)
+def asyncpg_sql(sql: str) -> str:
+    """Translate psycopg2 placeholders (%s, %%) to asyncpg ones ($1, %) so tools keep one SQL text."""
+    counter = iter(range(1, 10_000))
+    return re.sub(r"%%|%s", lambda m: "%" if m.group(0) == "%%" else f"${next(counter)}", sql)
+
+
+async def fetch_async(sql: str, *params):
+    pool = await get_async_pool()
+    return await pool.fetch(asyncpg_sql(sql), *params)
+
+
+async def fetchrow_async(sql: str, *params):
+    pool = await get_async_pool()
+    return await pool.fetchrow(asyncpg_sql(sql), *params)
+
+
+# -------------------------
+# Sync -> async bridge
+# -------------------------
+_bridge_loop = None
+_bridge_lock = threading.Lock()
+
+
+def run_async(coro):
+    """Run `coro` on the shared background loop and block until it finishes."""
+    global _bridge_loop
+    if _bridge_loop is None:
+        with _bridge_lock:
+            if _bridge_loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="async-bridge", daemon=True).start()
+                _bridge_loop = loop
+    return asyncio.run_coroutine_threadsafe(coro, _bridge_loop).result()
@@ -0,0 +1,13 @@
+# database/data_version.py
+
+from database.inventory_cache import inventory_cache
+
+
+def data_version():
+    """
+    Stamp that changes whenever hotels, hotel_rooms or bookings are written, or None
+    when it can't be trusted. Advanced by the inventory cache's LISTEN thread on each
+    inventory_changed event (see hotel_setup.sql), so reading it is free: nothing is
+    written on the booking path and no connection is checked out per query.
+    """
+    return inventory_cache.data_version()
@@ -1,15 +1,30 @@
 # database/db_connection.py
 
 import os
+import time
+import uuid
+import random
+import threading
 import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
 from dotenv import load_dotenv
+from monitoring.tracing import TRACING_ENABLED, span, start_span, metrics
 
 load_dotenv()
 
-def get_connection():
-    """
-    Returns a connection to the PostgreSQL database using .env credentials.
-    """
+# -------------------------
+# Pool settings (.env overridable)
+# -------------------------
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX", "10"))
+POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))        # seconds before an idle conn is reaped
+POOL_CHECK_AFTER = float(os.getenv("DB_POOL_CHECK_AFTER", "30"))    # ping conns idle longer than this
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))            # max wait for a free conn
+
+
+def connect_unpooled():
+    """Open a dedicated (unpooled) psycopg2 connection using .env credentials."""
     return psycopg2.connect(
         dbname=os.getenv("DB_NAME", "program"),
         user=os.getenv("DB_USER", "postgres"),
@@ -17,3 +32,304 @@ def get_connection():
         host=os.getenv("DB_HOST", "localhost"),
         port=os.getenv("DB_PORT", "5432"),
     )
+
+
+class PoolExhausted(Exception):
+    """Raised when no connection frees up within the checkout timeout."""
+
+
+class PooledConnection:
+    """
+    Proxy around a pooled psycopg2 connection.
+    close() (or leaving a `with` block) hands the connection back to the pool
+    instead of closing the socket, so existing tool code keeps working.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if self._raw is not None:
+            self._pool.putconn(self._raw)
+            self._raw = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Same transaction semantics as psycopg2's own `with conn:` block
+        if self._raw is not None and not self._raw.closed:
+            if exc_type is None:
+                self._raw.commit()
+            else:
+                self._raw.rollback()
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Thread-safe PostgreSQL connection pool.
+    - keeps between min_size and max_size connections
+    - pings connections that sat idle before handing them out
+    - reaps connections idle longer than max_idle (down to min_size)
+    """
+
+    def __init__(self, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE, max_idle=POOL_MAX_IDLE,
+                 check_after=POOL_CHECK_AFTER, timeout=POOL_TIMEOUT, connect=connect_unpooled):
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.timeout = timeout
+        self._connect = connect
+        self._idle = []          # [(raw_conn, returned_at)], most recently used last
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._stats = {"checkouts": 0, "created": 0, "closed": 0, "reaped": 0,
+                       "failed_checks": 0, "waits": 0, "timeouts": 0}
+
+    # -------------------------
+    # Checkout / return
+    # -------------------------
+    def getconn(self):
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            self._reap_idle()
+            while True:
+                if self._idle:
+                    raw, returned_at = self._idle.pop()
+                    self._in_use += 1
+                    break
+                if self._in_use + len(self._idle) < self.max_size:
+                    raw, returned_at = None, None
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolExhausted(f"No free database connection after {self.timeout}s")
+                self._stats["waits"] += 1
+                self._cond.wait(remaining)
+
+        # Connect / health-check outside the lock
+        try:
+            if raw is not None and not self._is_healthy(raw, returned_at):
+                self._count("failed_checks")
+                self._discard(raw)
+                raw = None
+            if raw is None:
+                raw = self._connect()
+                self._count("created")
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        self._count("checkouts")
+        return raw
+
+    def putconn(self, raw):
+        reusable = not raw.closed
+        if reusable and raw.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                raw.rollback()
+            except Exception:
+                reusable = False
+        if not reusable:
+            self._discard(raw)
+        with self._cond:
+            self._in_use -= 1
+            if reusable:
+                self._idle.append((raw, time.monotonic()))
+            self._cond.notify()
+
+    def connection(self):
+        """Checkout wrapped in a proxy; use as `with pool.connection() as conn:`."""
+        return PooledConnection(self, self.getconn())
+
+    # -------------------------
+    # Maintenance
+    # -------------------------
+    def _is_healthy(self, raw, returned_at):
+        if raw.closed:
+            return False
+        if time.monotonic() - returned_at < self.check_after:
+            return True
+        try:
+            with raw.cursor() as cur:
+                cur.execute("SELECT 1;")
+            raw.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _reap_idle(self):
+        # Caller holds the lock; oldest idle connections sit at the front.
+        now = time.monotonic()
+        while self._idle and len(self._idle) + self._in_use > self.min_size:
+            raw, returned_at = self._idle[0]
+            if now - returned_at < self.max_idle:
+                break
+            self._idle.pop(0)
+            self._discard(raw)
+            self._stats["reaped"] += 1
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        self._count("closed")
+
+    def _count(self, key):
+        # Counters are bumped from inside and outside the (reentrant) pool lock alike
+        with self._cond:
+            self._stats[key] += 1
+
+    def closeall(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for raw, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, idle=len(self._idle), in_use=self._in_use,
+                        min_size=self.min_size, max_size=self.max_size)
+
+
+# -------------------------
+# Process-wide pool
+# -------------------------
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the shared pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+    return _pool
+
+
+def get_connection():
+    """
+    Returns a pooled connection to the PostgreSQL database using .env credentials.
+    Calling close() on it returns it to the pool; it can also be used as a context manager.
+    """
+    return get_pool().connection()
+
+
+def pool_stats():
+    """Counters and sizes of the shared pool, for monitoring."""
+    return get_pool().stats()
+
+
+STREAM_ITERSIZE = int(os.getenv("DB_STREAM_ITERSIZE", "5000"))
+
+
+def stream_rows(conn, sql, params=None, itersize=STREAM_ITERSIZE):
+    """
+    Yield the rows of `sql` through a server-side (named) cursor, fetching `itersize`
+    at a time, so large results are never materialized client-side in one piece.
+    Must run inside a transaction, i.e. on a normal (non-autocommit) connection.
+    """
+    with conn.cursor(name=f"stream_{uuid.uuid4().hex[:12]}") as cur:
+        cur.itersize = itersize
+        cur.execute(sql, params)
+        yield from cur
+
+
+# -------------------------
+# Short write transactions
+# -------------------------
+TX_RETRIES = int(os.getenv("DB_TX_RETRIES", "5"))
+TX_RETRY_BACKOFF = float(os.getenv("DB_TX_RETRY_BACKOFF", "0.005"))   # seconds, doubled per attempt
+RETRYABLE_ERRORS = (psycopg2.errors.SerializationFailure, psycopg2.errors.DeadlockDetected)   # 40001, 40P01
+
+_tx_stats = {"transactions": 0, "retries": 0, "gave_up": 0}
+_tx_lock = threading.Lock()
+
+
+def _count_tx(key):
+    with _tx_lock:
+        _tx_stats[key] += 1
+
+
+def run_transaction(work, retries=TX_RETRIES, backoff=TX_RETRY_BACKOFF):
+    """
+    Run `work(cur)` in a transaction of its own and return its result. Serialization
+    failures and deadlocks roll back and re-run `work` after a jittered exponential
+    backoff (so `work` must not have side effects outside the database); any other
+    error rolls back and propagates.
+    """
+    for attempt in range(retries + 1):
+        try:
+            with get_connection() as conn, conn.cursor() as cur:
+                result = work(cur)
+            _count_tx("transactions")
+            return result
+        except RETRYABLE_ERRORS:
+            if attempt == retries:
+                _count_tx("gave_up")
+                raise
+            _count_tx("retries")
+        time.sleep(backoff * (2 ** attempt) * random.random())
+
+
+def transaction_stats():
+    with _tx_lock:
+        return dict(_tx_stats)
+
+
+# -------------------------
+# Tracing (installed only when TRACING_ENABLED=1, so the default path is untouched)
+# -------------------------
+class TracedCursor(psycopg2.extensions.cursor):
+    """Records each execute() as a db.execute span with the statement and its row count."""
+
+    def execute(self, query, vars=None):
+        with span("db.execute", sql=" ".join(str(query).split())[:120]) as s:
+            result = super().execute(query, vars)
+            s.set("rows", max(self.rowcount, 0))
+        return result
+
+
+class TracedPooledConnection(PooledConnection):
+    """Pooled connection whose checkout-to-return lifetime is a db.connection span."""
+
+    def __init__(self, pool, raw, checkout_span):
+        super().__init__(pool, raw)
+        self._span = checkout_span
+
+    def cursor(self, *args, **kwargs):
+        kwargs.setdefault("cursor_factory", TracedCursor)
+        return self._raw.cursor(*args, **kwargs)
+
+    def close(self):
+        super().close()
+        self._span.end()
+
+
+def _traced_connection(self):
+    checkout = start_span("db.connection")
+    try:
+        raw = self.getconn()
+    except Exception as e:
+        checkout.end(e)
+        raise
+    checkout.set("checkout_ms", round((time.perf_counter() - checkout.start) * 1000, 3))
+    return TracedPooledConnection(self, raw, checkout)
+
+
+if TRACING_ENABLED:
+    ConnectionPool.connection = _traced_connection
+    metrics.register("db_pool", pool_stats)
+    metrics.register("db_tx", transaction_stats)
@@ -0,0 +1,160 @@
+# database/geo_index.py
+#
+# In-process spatial index for nearest-hotel search. Points are stored as unit
+# vectors on the sphere, so straight-line (chord) distance orders points exactly
+# like great-circle distance does, with no special cases at the poles or the
+# antimeridian. A KD-tree over those vectors answers radius and k-nearest queries
+# in O(log n + results); an optional boolean mask (stars, price) is applied inside
+# the search, so k-nearest returns k hotels that pass the filters.
+
+import os
+import heapq
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+GEO_LEAF_SIZE = int(os.getenv("GEO_LEAF_SIZE", "16"))
+
+
+def unit_vectors(lats, lons) -> np.ndarray:
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def km_to_chord(km: float) -> float:
+    return 2.0 * np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2.0)
+
+
+def chord_to_km(chord):
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2.0, 1.0))
+
+
+class KDTree:
+    """Balanced KD-tree with per-node bounding boxes over an (n, d) array of points."""
+
+    def __init__(self, points: np.ndarray, leaf_size=GEO_LEAF_SIZE):
+        self.leaf_size = max(1, leaf_size)
+        self.order = np.arange(len(points))
+        self._source = points
+        self._lo, self._hi, self._left, self._right, self._mins, self._maxs = [], [], [], [], [], []
+        if len(points):
+            self._build(0, len(points))
+        self.points = points[self.order]          # leaf ranges are contiguous slices
+        self._mins = np.array(self._mins)
+        self._maxs = np.array(self._maxs)
+        del self._source
+
+    def _build(self, lo, hi):
+        node = len(self._lo)
+        pts = self._source[self.order[lo:hi]]
+        mins, maxs = pts.min(axis=0), pts.max(axis=0)
+        self._lo.append(lo)
+        self._hi.append(hi)
+        self._mins.append(mins)
+        self._maxs.append(maxs)
+        self._left.append(-1)
+        self._right.append(-1)
+        if hi - lo > self.leaf_size:
+            axis = int(np.argmax(maxs - mins))
+            mid = (lo + hi) // 2
+            part = np.argpartition(pts[:, axis], mid - lo)
+            self.order[lo:hi] = self.order[lo:hi][part]
+            self._left[node] = self._build(lo, mid)
+            self._right[node] = self._build(mid, hi)
+        return node
+
+    def __len__(self):
+        return len(self.order)
+
+    def _box_dist2(self, node, q):
+        d = np.maximum(self._mins[node] - q, 0.0) + np.maximum(q - self._maxs[node], 0.0)
+        return float(d @ d)
+
+    def _leaf(self, node, q, mask):
+        lo, hi = self._lo[node], self._hi[node]
+        idx = self.order[lo:hi]
+        diff = self.points[lo:hi] - q
+        d2 = np.einsum("ij,ij->i", diff, diff)
+        if mask is not None:
+            keep = mask[idx]
+            idx, d2 = idx[keep], d2[keep]
+        return idx, d2
+
+    def within(self, q, r, mask=None):
+        """(indices, distances) of points within r of q, nearest first."""
+        if not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        r2 = r * r
+        found_idx, found_d2 = [], []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._box_dist2(node, q) > r2:
+                continue
+            if self._left[node] < 0:
+                idx, d2 = self._leaf(node, q, mask)
+                hit = d2 <= r2
+                found_idx.append(idx[hit])
+                found_d2.append(d2[hit])
+            else:
+                stack.append(self._left[node])
+                stack.append(self._right[node])
+        if not found_idx:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        idx, d2 = np.concatenate(found_idx), np.concatenate(found_d2)
+        order = np.argsort(d2, kind="stable")
+        return idx[order], np.sqrt(d2[order])
+
+    def nearest(self, q, k, mask=None, max_r=np.inf):
+        """(indices, distances) of the k nearest points (passing `mask`) within max_r of q."""
+        best_idx, best_d2 = np.empty(0, dtype=np.int64), np.empty(0)
+        if not len(self) or k <= 0:
+            return best_idx, best_d2
+        bound = max_r * max_r
+        heap = [(self._box_dist2(0, q), 0)]
+        while heap:
+            box_d2, node = heapq.heappop(heap)
+            if box_d2 > bound:
+                break                      # every remaining node is farther still
+            if self._left[node] < 0:
+                idx, d2 = self._leaf(node, q, mask)
+                keep = d2 <= bound
+                best_idx = np.concatenate((best_idx, idx[keep]))
+                best_d2 = np.concatenate((best_d2, d2[keep]))
+                if len(best_d2) > k:
+                    top = np.argpartition(best_d2, k - 1)[:k]
+                    best_idx, best_d2 = best_idx[top], best_d2[top]
+                if len(best_d2) == k:
+                    bound = min(bound, float(best_d2.max()))
+            else:
+                for child in (self._left[node], self._right[node]):
+                    heapq.heappush(heap, (self._box_dist2(child, q), child))
+        order = np.argsort(best_d2, kind="stable")
+        return best_idx[order], np.sqrt(best_d2[order])
+
+
+class GeoIndex:
+    """Points keyed by id (hotel id); distances in great-circle kilometres."""
+
+    def __init__(self, keys, lats, lons, leaf_size=GEO_LEAF_SIZE):
+        self.keys = np.asarray(keys, dtype=np.int64)
+        self.positions = {int(k): i for i, k in enumerate(self.keys)}
+        self.tree = KDTree(unit_vectors(lats, lons).reshape(-1, 3), leaf_size)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _pairs(self, idx, chord):
+        return list(zip(self.keys[idx].tolist(), chord_to_km(chord).tolist()))
+
+    def within(self, lat, lon, radius_km, mask=None):
+        """[(key, km)] within `radius_km` of (lat, lon), nearest first."""
+        idx, chord = self.tree.within(unit_vectors([lat], [lon])[0], km_to_chord(radius_km), mask)
+        return self._pairs(idx, chord)
+
+    def nearest(self, lat, lon, k, mask=None, max_km=None):
+        """[(key, km)] of the `k` nearest points, optionally no farther than `max_km`."""
+        max_r = np.inf if max_km is None else km_to_chord(max_km)
+        idx, chord = self.tree.nearest(unit_vectors([lat], [lon])[0], k, mask, max_r)
+        return self._pairs(idx, chord)
@@ -0,0 +1,402 @@
+# database/inventory_cache.py
+#
+# Read-through, in-process cache of the `hotels` and `hotel_rooms` tables.
+# Postgres pushes a NOTIFY on `inventory_changed` whenever either table is written
+# (see notify_inventory_change() in hotel_setup.sql); a background LISTEN thread
+# marks the snapshot stale and the next lookup reloads it. A TTL covers missed events.
+# The same events (bookings included) advance data_version(), the stamp the answer
+# cache is keyed on, so reading it never costs a round trip.
+
+import os
+import time
+import uuid
+import asyncio
+import select
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+import numpy as np
+from database.db_connection import get_connection, connect_unpooled, stream_rows
+from monitoring.tracing import metrics
+from database.name_index import TrigramIndex
+from database.geo_index import GeoIndex
+from database.amenities import AmenityVocabulary, matches
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = float(os.getenv("INVENTORY_CACHE_TTL", "3600"))
+CACHE_LISTEN = os.getenv("INVENTORY_CACHE_LISTEN", "1") == "1"
+NOTIFY_CHANNEL = "inventory_changed"
+
+Hotel = namedtuple("Hotel", "id name city address stars phone_number email latitude longitude amenities")
+Room = namedtuple("Room", "id hotel_id room_number capacity price_per_night room_type is_available amenities")
+
+
+class _Snapshot:
+    """Immutable view of the inventory plus its lookup indexes."""
+
+    __slots__ = ("hotels", "by_city", "stars_keys", "stars_ids", "name_index", "rooms_by_hotel",
+                 "price_keys", "price_rooms", "amenities", "hotel_amenities", "room_amenities",
+                 "loaded_at", "_geo", "_geo_stars")
+
+    def __init__(self, hotels, rooms):
+        self.hotels = {h.id: h for h in hotels}
+        self.name_index = TrigramIndex((h.id, h.name) for h in hotels)
+
+        by_city = {}
+        for h in sorted(hotels, key=lambda h: (h.name, h.id)):
+            by_city.setdefault(h.city.strip().lower(), []).append(h.id)
+        self.by_city = {city: tuple(ids) for city, ids in by_city.items()}
+
+        ranked = sorted(hotels, key=lambda h: (h.stars, h.name, h.id))
+        self.stars_keys = [h.stars for h in ranked]
+        self.stars_ids = tuple(h.id for h in ranked)
+
+        by_hotel = {}
+        for r in sorted(rooms, key=lambda r: r.price_per_night):
+            by_hotel.setdefault(r.hotel_id, []).append(r)
+        self.rooms_by_hotel = {hid: tuple(rs) for hid, rs in by_hotel.items()}
+
+        # Amenity bitmasks; room masks are aligned with rooms_by_hotel
+        self.amenities = AmenityVocabulary.of([a for h in hotels for a in h.amenities] +
+                                              [a for r in rooms for a in r.amenities])
+        self.hotel_amenities = {h.id: self.amenities.mask_of(h.amenities) for h in hotels}
+        self.room_amenities = {hid: tuple(self.amenities.mask_of(r.amenities, room=True) for r in rs)
+                               for hid, rs in self.rooms_by_hotel.items()}
+
+        by_price = sorted(rooms, key=lambda r: r.price_per_night)
+        self.price_keys = [r.price_per_night for r in by_price]
+        self.price_rooms = tuple(by_price)
+        self._geo = None
+        self._geo_stars = None
+        self.loaded_at = time.monotonic()
+
+    @property
+    def geo(self):
+        """KD-tree over hotels that have coordinates, built on first geo lookup."""
+        if self._geo is None:
+            located = [h for h in self.hotels.values() if h.latitude is not None and h.longitude is not None]
+            self._geo_stars = np.array([h.stars for h in located], dtype=np.float64)
+            self._geo = GeoIndex([h.id for h in located], [h.latitude for h in located],
+                                 [h.longitude for h in located])
+        return self._geo
+
+    def geo_mask(self, min_stars=None, min_price=None, max_price=None):
+        """Boolean filter over geo points: rating floor and/or a room priced within [min, max]."""
+        geo = self.geo
+        if min_stars is None and min_price is None and max_price is None:
+            return None
+        mask = np.ones(len(geo), dtype=bool)
+        if min_stars is not None:
+            mask &= self._geo_stars >= min_stars
+        if min_price is not None or max_price is not None:
+            lo = bisect_left(self.price_keys, min_price if min_price is not None else float("-inf"))
+            hi = bisect_right(self.price_keys, max_price if max_price is not None else float("inf"))
+            priced = np.zeros(len(geo), dtype=bool)
+            positions = [geo.positions.get(r.hotel_id) for r in self.price_rooms[lo:hi]]
+            priced[[p for p in positions if p is not None]] = True
+            mask &= priced
+        return mask
+
+
+class InventoryCache:
+    def __init__(self, ttl=CACHE_TTL, listen=CACHE_LISTEN):
+        self.ttl = ttl
+        self.listen = listen
+        self._snapshot = None
+        self._stale = True
+        self._lock = threading.Lock()
+        self._listener = None
+        self._epoch = uuid.uuid4().hex[:12]     # keeps versions of other processes / runs apart
+        self._version = 0
+        self._stats = {"hits": 0, "misses": 0, "reloads": 0, "invalidations": 0,
+                       "notifications": 0, "listener_connected": False}
+
+    # -------------------------
+    # Loading
+    # -------------------------
+    def _load(self):
+        # Server-side cursors: rows arrive in batches, so a large inventory is never
+        # held twice (driver result buffer + namedtuples) during a reload
+        with get_connection() as conn:
+            hotels = [Hotel(h[0], h[1], h[2], h[3], h[4], h[5], h[6],
+                            float(h[7]) if h[7] is not None else None,
+                            float(h[8]) if h[8] is not None else None,
+                            tuple(h[9] or ())) for h in stream_rows(conn, """
+                SELECT id, name, city, address, stars, phone_number, email,
+                       latitude, longitude, amenities
+                FROM hotels;
+            """)]
+            rooms = [Room(r[0], r[1], r[2], r[3], float(r[4]), r[5], bool(r[6]),
+                          tuple(r[7] or ())) for r in stream_rows(conn, """
+                SELECT id, hotel_id, room_number, capacity, price_per_night,
+                       room_type, is_available, amenities
+                FROM hotel_rooms;
+            """)]
+        return _Snapshot(hotels, rooms)
+
+    def _needs_reload(self, snap):
+        return snap is None or self._stale or time.monotonic() - snap.loaded_at >= self.ttl
+
+    def snapshot(self):
+        """Current snapshot, reloading it first if it was invalidated or expired."""
+        snap = self._snapshot
+        if not self._needs_reload(snap):
+            self._stats["hits"] += 1
+            return snap
+        with self._lock:
+            snap = self._snapshot
+            if self._needs_reload(snap):
+                self._stats["misses"] += 1
+                # Clear the flag first so an event arriving mid-load forces another reload
+                self._stale = False
+                try:
+                    snap = self._load()
+                except Exception:
+                    self._stale = True
+                    raise
+                self._snapshot = snap
+                self._stats["reloads"] += 1
+            else:
+                self._stats["hits"] += 1
+        if self.listen and self._listener is None:
+            self._start_listener()
+        return snap
+
+    async def aensure_fresh(self):
+        """For async callers: reload in a worker thread if needed, so lookups never block the loop."""
+        if self._needs_reload(self._snapshot):
+            await asyncio.to_thread(self.snapshot)
+
+    def invalidate(self):
+        self._stale = True
+        self._stats["invalidations"] += 1
+
+    # -------------------------
+    # LISTEN / NOTIFY
+    # -------------------------
+    def _start_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen_loop, name="inventory-listener", daemon=True)
+                self._listener.start()
+
+    def _listen_loop(self):
+        reconnecting = False
+        while True:
+            conn = None
+            try:
+                conn = connect_unpooled()
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {NOTIFY_CHANNEL};")
+                self._stats["listener_connected"] = True
+                if reconnecting:
+                    # Anything may have changed while we were not listening
+                    self._version += 1
+                    self.invalidate()
+                while True:
+                    if select.select([conn], [], [], 30)[0]:
+                        conn.poll()
+                        if conn.notifies:
+                            tables = {n.payload for n in conn.notifies}
+                            self._stats["notifications"] += len(conn.notifies)
+                            conn.notifies.clear()
+                            self._version += 1
+                            # Booking events leave hotels / hotel_rooms, and so the snapshot, as they are
+                            if tables - {"bookings"}:
+                                self.invalidate()
+            except Exception as e:
+                logger.warning("Inventory cache listener lost connection: %s", e)
+            finally:
+                self._stats["listener_connected"] = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            reconnecting = True
+            time.sleep(5)
+
+    def data_version(self):
+        """
+        Stamp that moves on every committed write to hotels, hotel_rooms or bookings, or
+        None while the listener is not connected (changes could be missed).
+        """
+        if self.listen and self._listener is None:
+            self._start_listener()
+        if not self._stats["listener_connected"]:
+            return None
+        return f"{self._epoch}:{self._version}"
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def hotel(self, hotel_id):
+        return self.snapshot().hotels.get(hotel_id)
+
+    def hotels_in_city(self, city: str, limit=None, after=None):
+        """
+        Hotels in `city` by name. Paged with `limit` and `after`, the (name, id)
+        key of the last hotel already shown.
+        """
+        snap = self.snapshot()
+        ids = snap.by_city.get(city.strip().lower(), ())
+        start = 0 if after is None else bisect_right(ids, tuple(after), key=lambda i: (snap.hotels[i].name, i))
+        stop = len(ids) if limit is None else start + limit
+        return [snap.hotels[i] for i in ids[start:stop]]
+
+    def hotels_with_min_stars(self, min_stars: float, limit=None, before=None):
+        """
+        Hotels rated at least `min_stars`, best first. Paged with `limit` and `before`,
+        the (stars, name, id) key of the last hotel already shown.
+        """
+        snap = self.snapshot()
+        start = bisect_left(snap.stars_keys, min_stars)
+        stop = len(snap.stars_ids)
+        if before is not None:
+            key = lambda i: (snap.hotels[i].stars, snap.hotels[i].name, i)
+            stop = max(start, bisect_left(snap.stars_ids, tuple(before), key=key))
+        if limit is not None:
+            start = max(start, stop - limit)
+        return [snap.hotels[i] for i in reversed(snap.stars_ids[start:stop])]
+
+    def match_hotels(self, text: str, limit: int = 10):
+        """Fuzzy name search: [(hotel, score)] best match first, tolerant of typos."""
+        snap = self.snapshot()
+        return [(snap.hotels[i], score) for i, score in snap.name_index.search(text, limit)]
+
+    def best_hotel_matches(self, text: str):
+        """Hotels sharing the top match score (usually exactly one)."""
+        matches = self.match_hotels(text)
+        return [h for h, score in matches if score == matches[0][1]]
+
+    def rooms_for_hotel(self, hotel_id):
+        """Rooms of one hotel, cheapest first."""
+        return list(self.snapshot().rooms_by_hotel.get(hotel_id, ()))
+
+    def rooms_in_price_range(self, min_price: float, max_price: float):
+        snap = self.snapshot()
+        lo = bisect_left(snap.price_keys, min_price)
+        hi = bisect_right(snap.price_keys, max_price)
+        return list(snap.price_rooms[lo:hi])
+
+    def hotels_near(self, lat: float, lon: float, radius_km=None, k=None,
+                    min_stars=None, min_price=None, max_price=None):
+        """
+        [(hotel, km)] nearest first: every hotel within `radius_km`, or the `k` nearest
+        (within `radius_km` when both are given). Star and price filters are applied
+        inside the KD-tree search, so k-nearest means k matching hotels.
+        """
+        snap = self.snapshot()
+        mask = snap.geo_mask(min_stars, min_price, max_price)
+        if k is None:
+            pairs = snap.geo.within(lat, lon, radius_km, mask)
+        else:
+            pairs = snap.geo.nearest(lat, lon, k, mask, radius_km)
+        return [(snap.hotels[hid], km) for hid, km in pairs]
+
+    def amenity_mask(self, terms):
+        """(bitmask of the amenities `terms` name, [terms that match no known amenity])."""
+        vocab = self.snapshot().amenities
+        mask, unknown = 0, []
+        for term in terms:
+            bit = vocab.resolve(term)
+            if bit is None:
+                unknown.append(term)
+            else:
+                mask |= 1 << bit
+        return mask, unknown
+
+    def hotels_with_amenities(self, want: int, any_of=False, city=None, min_stars=None):
+        """
+        [(hotel, rooms)] for hotels offering all (or, with any_of, any) amenities in the
+        `want` bitmask, best rated first. Amenities that only rooms list must be met by a
+        single room; `rooms` are those rooms (None when every wanted amenity is hotel-level).
+        """
+        snap = self.snapshot()
+        hotel_want, room_want = snap.amenities.split(want)
+        if city is not None:
+            ids = sorted(snap.by_city.get(city.strip().lower(), ()),
+                         key=lambda i: (-snap.hotels[i].stars, snap.hotels[i].name, i))
+        else:
+            ids = reversed(snap.stars_ids)
+        found = []
+        for hid in ids:
+            hotel = snap.hotels[hid]
+            if min_stars is not None and hotel.stars < min_stars:
+                if city is None:
+                    break           # stars_ids is sorted, nothing further qualifies
+                continue
+            hotel_ok = matches(snap.hotel_amenities[hid], hotel_want, any_of)
+            if not any_of and not hotel_ok:
+                continue
+            rooms = None
+            if room_want:
+                masks = snap.room_amenities.get(hid, ())
+                rooms = [r for r, m in zip(snap.rooms_by_hotel.get(hid, ()), masks) if matches(m, room_want, any_of)]
+            if any_of:
+                if not ((hotel_want and hotel_ok) or rooms):
+                    continue
+            elif room_want and not rooms:
+                continue
+            found.append((hotel, rooms))
+        return found
+
+    def find_rooms(self, city=None, min_stars=None, min_price=None, max_price=None, room_type=None,
+                   guests=None, want=0, any_of=False):
+        """
+        [(hotel, rooms)] of hotels with at least one room passing every filter, `rooms` being
+        those rooms cheapest first. Wanted amenities are checked like hotels_with_amenities:
+        hotel-level ones against the hotel, room-only ones against the room.
+        """
+        snap = self.snapshot()
+        hotel_want, room_want = snap.amenities.split(want)
+        ids = snap.by_city.get(city.strip().lower(), ()) if city is not None else snap.hotels
+        found = []
+        for hid in ids:
+            hotel = snap.hotels[hid]
+            if min_stars is not None and hotel.stars < min_stars:
+                continue
+            hotel_hit = bool(snap.hotel_amenities[hid] & hotel_want)
+            if want and not any_of and not matches(snap.hotel_amenities[hid], hotel_want):
+                continue
+            rooms = [r for r, m in zip(snap.rooms_by_hotel.get(hid, ()), snap.room_amenities.get(hid, ()))
+                     if (min_price is None or r.price_per_night >= min_price)
+                     and (max_price is None or r.price_per_night <= max_price)
+                     and (room_type is None or r.room_type == room_type)
+                     and (guests is None or r.capacity >= guests)
+                     and (hotel_hit or m & room_want if any_of and want else matches(m, room_want))]
+            if rooms:
+                found.append((hotel, rooms))
+        return found
+
+    def amenity_names(self, mask=None):
+        """Display names of the amenities in `mask` (all known amenities when None)."""
+        vocab = self.snapshot().amenities
+        return vocab.names((1 << len(vocab)) - 1 if mask is None else mask)
+
+    def city_center(self, city: str):
+        """Mean (lat, lon) of the located hotels in `city`, or None."""
+        snap = self.snapshot()
+        points = [(h.latitude, h.longitude) for h in (snap.hotels[i] for i in snap.by_city.get(city.strip().lower(), ()))
+                  if h.latitude is not None and h.longitude is not None]
+        if not points:
+            return None
+        return sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points)
+
+    def stats(self):
+        snap = self._snapshot
+        return dict(self._stats,
+                    hotels=len(snap.hotels) if snap else 0,
+                    rooms=len(snap.price_rooms) if snap else 0,
+                    data_version=self._version,
+                    age_seconds=round(time.monotonic() - snap.loaded_at, 1) if snap else None)
+
+
+# -------------------------
+# Process-wide cache
+# -------------------------
+inventory_cache = InventoryCache()
+metrics.register("inventory_cache", inventory_cache.stats)
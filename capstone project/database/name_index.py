@@ -0,0 +1,92 @@
+# database/name_index.py
+#
+# In-process trigram index for fuzzy hotel-name lookup. Trigrams are extracted the
+# same way pg_trgm does (lower-cased words padded with two leading and one trailing
+# blank), and scores follow pg_trgm's word_similarity: the best trigram similarity
+# between the query and any continuous extent of the name. The cached path and the
+# word_similarity() SQL path therefore accept and reject the same names at the threshold.
+
+import os
+import re
+from array import array
+from collections import Counter
+
+NAME_MATCH_THRESHOLD = float(os.getenv("NAME_MATCH_THRESHOLD", "0.5"))
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def trigram_sequence(text: str) -> list:
+    """Trigrams of `text` in order, repeats included (the extents word_similarity scans)."""
+    grams = []
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f"  {word} "
+        grams.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def trigrams(text: str) -> frozenset:
+    return frozenset(trigram_sequence(text))
+
+
+def word_similarity(query: frozenset, sequence) -> float:
+    """
+    pg_trgm word_similarity: greatest similarity |Q ∩ E| / |Q ∪ E| between the query's
+    trigram set Q and the trigram set E of a continuous extent of `sequence`.
+    """
+    best = 0.0
+    for start in range(len(sequence)):
+        seen, common = set(), 0
+        for gram in sequence[start:]:
+            if gram not in seen:
+                seen.add(gram)
+                common += gram in query
+            sim = common / (len(query) + len(seen) - common)
+            if sim > best:
+                best = sim
+    return best
+
+
+class TrigramIndex:
+    """Inverted index trigram -> ids, scored like pg_trgm word_similarity / similarity."""
+
+    def __init__(self, entries):
+        # entries: iterable of (id, name)
+        self._sizes = {}
+        self._names = {}
+        postings = {}
+        for key, name in entries:
+            grams = trigrams(name)
+            self._sizes[key] = len(grams)
+            self._names[key] = name
+            for g in grams:
+                postings.setdefault(g, array("q")).append(key)
+        self._postings = postings
+
+    def search(self, text: str, limit: int = 10, threshold: float = NAME_MATCH_THRESHOLD):
+        """
+        Ranked [(id, score)] for names resembling `text`.
+        score is pg_trgm word_similarity(text, name), ties broken by plain trigram
+        similarity so tighter names rank first.
+        """
+        query = trigrams(text)
+        if not query:
+            return []
+        shared = Counter()
+        for g in query:
+            ids = self._postings.get(g)
+            if ids is not None:
+                shared.update(ids)
+
+        scored = []
+        for key, n in shared.items():
+            # n / |Q| bounds the extent score from above, so most names are rejected unscored
+            if n / len(query) < threshold:
+                continue
+            word_sim = word_similarity(query, trigram_sequence(self._names[key]))
+            if word_sim < threshold:
+                continue
+            sim = n / (len(query) + self._sizes[key] - n)
+            scored.append((word_sim, sim, key))
+        scored.sort(reverse=True)
+        return [(key, round(word_sim, 3)) for word_sim, _, key in scored[:limit]]
@@ -0,0 +1,144 @@
+# database/statements.py
+#
+# Registry of the static SQL the tools run. Each statement is registered once, at
+# import time, under a name; on first use on a pooled connection it is PREPAREd there
+# and from then on runs as EXECUTE <name>(...), so Postgres parses and plans it once
+# per connection instead of on every call. Per-statement call counts and timings are
+# kept for monitoring, and benchmarks/check_plans.py EXPLAINs every registered
+# statement against the benchmark dataset.
+#
+# A Statement is a str (its SQL text), so the asyncpg variants keep passing the same
+# constant to fetch_async() / fetchrow_async(); asyncpg prepares and caches on its own.
+# SQL assembled per call (tools/search_hotels.py) is not registered and runs as-is.
+#
+# Set DB_PREPARE=0 behind a transaction-pooling proxy (e.g. pgbouncer), where
+# session-level prepared statements don't survive between transactions.
+
+import os
+import re
+import time
+import threading
+import weakref
+from monitoring.tracing import TRACING_ENABLED, metrics
+
+PREPARE_ENABLED = os.getenv("DB_PREPARE", "1") == "1"
+
+_NAME_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def _numbered(sql: str):
+    """(SQL with %s -> $1, $2, ... and %% -> %, number of parameters)."""
+    counter = iter(range(1, 10_000))
+    text = re.sub(r"%%|%s", lambda m: "%" if m.group(0) == "%%" else f"${next(counter)}", sql)
+    return text, next(counter) - 1
+
+
+class Statement(str):
+    """SQL text registered under a name; usable wherever a SQL string is."""
+
+    def __new__(cls, name, sql):
+        self = super().__new__(cls, sql)
+        self.name = name
+        self.prepare_sql, self.nparams = _numbered(sql.strip().rstrip(";"))
+        self.prepare_sql = f"PREPARE {name} AS {self.prepare_sql}"
+        placeholders = ", ".join(["%s"] * self.nparams)
+        self.execute_sql = f"EXECUTE {name} ({placeholders})" if self.nparams else f"EXECUTE {name}"
+        return self
+
+
+class StatementRegistry:
+    def __init__(self):
+        self._statements = {}
+        self._prepared = weakref.WeakKeyDictionary()    # raw connection -> {names prepared on it}
+        self._lock = threading.Lock()
+        self._stats = {}                                # name -> [calls, prepares, errors, total_s, max_s]
+
+    def register(self, name: str, sql: str) -> Statement:
+        if not _NAME_RE.match(name):
+            raise ValueError(f"Statement name must be a lower-case SQL identifier: {name!r}")
+        with self._lock:
+            existing = self._statements.get(name)
+            if existing is not None:
+                if str(existing) != sql:
+                    raise ValueError(f"Statement {name!r} is already registered with different SQL")
+                return existing
+            statement = self._statements[name] = Statement(name, sql)
+            self._stats[name] = [0, 0, 0, 0.0, 0.0]
+        return statement
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._statements.values()))
+
+    def __len__(self):
+        return len(self._statements)
+
+    def prepare(self, cur, statement: Statement):
+        """PREPARE `statement` on the cursor's connection unless it already is."""
+        conn = cur.connection
+        with self._lock:
+            names = self._prepared.setdefault(conn, set())
+            if statement.name in names:
+                return
+        cur.execute(statement.prepare_sql)
+        with self._lock:
+            names.add(statement.name)
+            self._stats[statement.name][1] += 1
+
+    def execute(self, cur, statement: Statement, params=()):
+        """Run `statement` by name on `cur`, preparing it first on a new connection."""
+        start = time.perf_counter()
+        try:
+            if PREPARE_ENABLED:
+                self.prepare(cur, statement)
+                cur.execute(statement.execute_sql, tuple(params) or None)
+            else:
+                cur.execute(statement, tuple(params) or None)
+        except Exception:
+            with self._lock:
+                self._stats[statement.name][2] += 1
+            raise
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            s = self._stats[statement.name]
+            s[0] += 1
+            s[3] += elapsed
+            s[4] = max(s[4], elapsed)
+
+    def stats(self):
+        """{name: {calls, prepares, errors, total_ms, mean_ms, max_ms}}"""
+        with self._lock:
+            return {name: {"calls": s[0], "prepares": s[1], "errors": s[2],
+                           "total_ms": round(s[3] * 1000, 3),
+                           "mean_ms": round(s[3] * 1000 / s[0], 3) if s[0] else 0.0,
+                           "max_ms": round(s[4] * 1000, 3)}
+                    for name, s in sorted(self._stats.items())}
+
+
+statements = StatementRegistry()
+
+
+def prepared(name: str, sql: str) -> Statement:
+    """Register `sql` under `name` (module-level, next to the tool that runs it)."""
+    return statements.register(name, sql)
+
+
+def execute(cur, sql, params=()):
+    """cur.execute(), by name for registered statements and as plain SQL otherwise."""
+    if isinstance(sql, Statement):
+        statements.execute(cur, sql, params)
+    else:
+        cur.execute(sql, tuple(params) or None)
+
+
+def statement_stats():
+    return statements.stats()
+
+
+def _flat_stats():
+    # Gauges must be flat numbers: <prefix>_<statement>_<counter>
+    return {f"{name}_{key}": value for name, s in statements.stats().items() for key, value in s.items()}
+
+
+if TRACING_ENABLED:
+    metrics.register("db_statement", _flat_stats)
@@ -146,16 +146,29 @@
 
 # hotel_chatbot_nova.py
 import os
+import re
 import json
+import time
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import boto3
+from botocore.config import Config
 from langchain.agents import initialize_agent, AgentType
-from langchain.memory import ConversationBufferMemory
 from langchain.tools import Tool
 from langchain.llms.base import LLM
+from langchain.callbacks.manager import CallbackManagerForLLMRun, AsyncCallbackManagerForLLMRun
 from langchain.schema import LLMResult
-from typing import Optional, List
+from langchain.schema.output import GenerationChunk
+from typing import Optional, List, Iterator
 from tools.tripadvisor_fallback import tripadvisor_fallback_any_sentence 
+from agents.intent_router import intent_router, WRITE_QUERY_RE
+from agents.response_cache import prompt_cache, answer_cache, normalize_prompt, normalize_query
+from agents.session_memory import BoundedSummaryBufferMemory, SessionStore, MEMORY_MAX_TOKENS
+from agents.circuit_breaker import CircuitOpenError, breaker_from_env
+from database.data_version import data_version
+from monitoring.tracing import traced, span, start_span, current_span, metrics
 
 # -------------------------
 # Load environment variables
@@ -168,25 +181,118 @@ AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 # -------------------------
 # Initialize Amazon Nova client (via Bedrock)
 # -------------------------
+# Per-call deadlines: an unreachable endpoint fails in seconds instead of hanging on the SDK defaults
 client = boto3.client(
     "bedrock-runtime",
     region_name=AWS_REGION,
     aws_access_key_id=AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=AWS_SECRET_ACCESS_KEY
+    aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
+    config=Config(
+        connect_timeout=float(os.getenv("NOVA_CONNECT_TIMEOUT", "3")),
+        read_timeout=float(os.getenv("NOVA_READ_TIMEOUT", "20")),
+        retries={"max_attempts": int(os.getenv("NOVA_MAX_ATTEMPTS", "2")), "mode": "standard"},
+    ),
 )
 
+# Trips after repeated Nova failures so an outage costs no round trips (NOVA_BREAKER_* env vars)
+nova_breaker = breaker_from_env("nova", "NOVA")
+metrics.register("nova_breaker", nova_breaker.stats)
+metrics.register("prompt_cache", prompt_cache.stats)
+metrics.register("answer_cache", answer_cache.stats)
+
+NOVA_MODEL_ID = "amazon.nova-lite-v1:0"
+
 # -------------------------
 # Nova chat function
 # -------------------------
-def nova_chat(input_text: str) -> str:
+def _invoke_nova(input_text: str) -> str:
     """Send input to Nova 2 Lite and get response."""
     response = client.invoke_model(
-        modelId="amazon.nova-lite-v1:0",
+        modelId=NOVA_MODEL_ID,
         body=json.dumps({"inputText": input_text})
     )
     result = json.loads(response["body"])
     return result.get("outputText", "")
 
+@traced("nova.chat")
+def nova_chat(input_text: str) -> str:
+    """
+    Nova call behind an exact-prompt cache (identical agent scaffolding prompts are common)
+    and the circuit breaker: raises CircuitOpenError at once while Nova is failing.
+    """
+    trace = current_span().set("prompt_chars", len(input_text))
+    key = prompt_cache.make_key(normalize_prompt(input_text))
+    cached = prompt_cache.get(key)
+    trace.set("cache_hit", cached is not None)
+    if cached is not None:
+        return cached
+    nova_breaker.before_call()
+    start = time.perf_counter()
+    try:
+        text = _invoke_nova(input_text)
+        trace.set("response_chars", len(text))
+        if not text.strip():
+            raise ValueError("Nova returned an empty response")
+    except Exception as e:
+        nova_breaker.record_failure(e)
+        raise
+    nova_breaker.record_success()
+    prompt_cache.put(key, text, time.perf_counter() - start)
+    return text
+
+def _stream_chunk_text(event) -> str:
+    chunk = event.get("chunk")
+    if not chunk:
+        return ""
+    data = json.loads(chunk["bytes"])
+    # Text-generation style chunks carry outputText; messages-API chunks carry contentBlockDelta
+    return data.get("outputText") or data.get("contentBlockDelta", {}).get("delta", {}).get("text", "")
+
+def nova_chat_stream(input_text: str) -> Iterator[str]:
+    """Yield Nova's response piece by piece from Bedrock's response stream (cached prompts come back whole)."""
+    trace = start_span("nova.stream", prompt_chars=len(input_text))
+    key = prompt_cache.make_key(normalize_prompt(input_text))
+    cached = prompt_cache.get(key)
+    trace.set("cache_hit", cached is not None)
+    if cached is not None:
+        trace.end()
+        yield cached
+        return
+    try:
+        nova_breaker.before_call()
+    except CircuitOpenError as e:
+        trace.end(e)
+        raise
+    start = time.perf_counter()
+    parts = []
+    try:
+        response = client.invoke_model_with_response_stream(
+            modelId=NOVA_MODEL_ID,
+            body=json.dumps({"inputText": input_text})
+        )
+        for event in response["body"]:
+            text = _stream_chunk_text(event)
+            if text:
+                if not parts:
+                    trace.set("ttft_ms", round((time.perf_counter() - start) * 1000, 3))
+                parts.append(text)
+                yield text
+        full = "".join(parts)
+        if not full.strip():
+            raise ValueError("Nova returned an empty response")
+    except GeneratorExit:
+        # Consumer stopped reading: Nova was answering, so release the slot as a success
+        nova_breaker.record_success()
+        trace.set("response_chars", sum(map(len, parts))).end()
+        raise
+    except Exception as e:
+        nova_breaker.record_failure(e)
+        trace.end(e)
+        raise
+    nova_breaker.record_success()
+    trace.set("response_chars", len(full)).end()
+    prompt_cache.put(key, full, time.perf_counter() - start)
+
 # -------------------------
 # Import hotel tools
 # -------------------------
@@ -199,6 +305,14 @@ from tools.get_hotel_details import get_hotel_details
 from tools.get_available_rooms import get_available_rooms
 from tools.get_booking_details import get_booking_details
 from tools.check_room_availability_by_dates import check_room_availability_by_dates
+from tools.get_free_rooms_for_stay import get_free_rooms_for_stay
+from tools.more_results import more_results
+from tools.search_hotels_near import search_hotels_near
+from tools.search_hotels_by_amenities import search_hotels_by_amenities
+from tools.search_hotels import search_hotels
+from tools.create_booking import create_booking
+from tools.cancel_booking import cancel_booking
+from tools.paging import continuations, TOKEN_PATTERN
 
 # -------------------------
 # Safe wrapper for rating
@@ -220,42 +334,184 @@ tools = [
     Tool(name="Search Hotels by Price Range", func=search_hotels_by_price_range, description="Find hotels in a price range."),
     Tool(name="Search Hotel by Name", func=search_hotel_by_name, description="Find a hotel by its name."),
     Tool(name="Get Hotel Details", func=get_hotel_details, description="Retrieve hotel details."),
-    Tool(name="Get Available Rooms", func=get_available_rooms, description="Get available rooms for a hotel."),
+    Tool(name="Get Available Rooms", func=get_available_rooms, description="Get rooms free in a hotel, tonight or between dates, e.g. 'Avari Towers from 2025-03-12 to 2025-03-18'."),
     Tool(name="Get Booking Details", func=get_booking_details, description="Retrieve booking details."),
     Tool(name="Check Room Availability by Dates", func=check_room_availability_by_dates, description="Check room availability by dates."),
+    Tool(name="Get Free Rooms for Stay", func=get_free_rooms_for_stay, description="List rooms free for a whole stay in one or more hotels or cities, e.g. 'Pearl Continental, Avari Towers from 2025-03-12 to 2025-03-18'."),
+    Tool(name="More Results", func=more_results, description="Show the next page of a list answer; input is the continuation token it ended with, e.g. 'more:1a2b3c4d'."),
+    Tool(name="Search Hotels Near", func=search_hotels_near, description="Find hotels near a hotel, city or coordinates by radius or nearest count, with optional star/price filters, e.g. 'within 3 km of Pearl Continental, 4 stars, under 200' or 'closest 10 to 31.52, 74.35'."),
+    Tool(name="Search Hotels by Amenities", func=search_hotels_by_amenities, description="Find hotels with all (or, using 'or', any) of some amenities, optionally in a city and with a star floor, e.g. 'Karachi with pool and spa' or 'Lahore, 4 stars, gym or pool'."),
+    Tool(name="Search Hotels", func=search_hotels, description="Find hotels matching several criteria in one call: city, min stars, price bounds, free dates, room type, guests and amenities, e.g. '4-star hotels in Lahore under 150 with free rooms 10-12 May'. Prefer this over chaining the single-filter searches."),
+    Tool(name="Create Booking", func=create_booking, description="Book a room for a guest, e.g. 'room 12 for Ali Khan, ali@example.com, +92 300 1234567 from 2025-03-12 to 2025-03-18'."),
+    Tool(name="Cancel Booking", func=cancel_booking, description="Cancel a booking by ID and the guest email or phone number it was made with, e.g. 'booking 42, ali@example.com'."),
 ]
 
-# -------------------------
-# Conversation memory
-# -------------------------
-memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-
 # -------------------------
 # LangChain LLM wrapper for Nova
 # -------------------------
+# Bedrock calls are network-bound; batches are fanned out over a small thread pool
+_nova_executor = ThreadPoolExecutor(max_workers=int(os.getenv("NOVA_MAX_CONCURRENCY", "8")),
+                                    thread_name_prefix="nova")
+
 class NovaLLM(LLM):
+    streaming: bool = os.getenv("NOVA_STREAMING", "1") == "1"
+
     @property
     def _llm_type(self) -> str:
         return "nova"
 
-    def _call(self, prompt: str, stop: Optional[List[str]] = None) -> str:
+    def get_num_tokens(self, text: str) -> int:
+        # ~4 characters per token; good enough for memory budgeting without a tokenizer download
+        return max(1, len(text) // 4)
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs) -> Iterator[GenerationChunk]:
+        for text in nova_chat_stream(prompt):
+            chunk = GenerationChunk(text=text)
+            if run_manager:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None,
+              run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs) -> str:
+        # Only pay for the streaming API when someone is listening for tokens
+        if self.streaming and run_manager is not None and run_manager.handlers:
+            return "".join(chunk.text for chunk in self._stream(prompt, stop, run_manager))
         return nova_chat(prompt)
 
-    def _generate(self, prompts: List[str], stop: Optional[List[str]] = None) -> LLMResult:
-        outputs = [nova_chat(p) for p in prompts]
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None,
+                     run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs) -> str:
+        # Executor threads don't inherit contextvars: run under a copy so the Bedrock call
+        # stays a child of the caller's trace span
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        if not (self.streaming and run_manager is not None and run_manager.handlers):
+            return await loop.run_in_executor(_nova_executor, context.run, nova_chat, prompt)
+
+        # Stream on the worker thread, hand each token to the loop for the async callbacks
+        tokens = asyncio.Queue()
+        def produce():
+            try:
+                for text in nova_chat_stream(prompt):
+                    loop.call_soon_threadsafe(tokens.put_nowait, text)
+            finally:
+                loop.call_soon_threadsafe(tokens.put_nowait, None)
+        producer = loop.run_in_executor(_nova_executor, context.run, produce)
+        parts = []
+        while (text := await tokens.get()) is not None:
+            parts.append(text)
+            await run_manager.on_llm_new_token(text, chunk=GenerationChunk(text=text))
+        await producer      # re-raises a failed stream
+        return "".join(parts)
+
+    def _generate(self, prompts: List[str], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs) -> LLMResult:
+        if len(prompts) == 1:
+            outputs = [self._call(prompts[0], stop, run_manager)]
+        else:
+            futures = [_nova_executor.submit(contextvars.copy_context().run, nova_chat, p) for p in prompts]
+            outputs = [f.result() for f in futures]
+        return LLMResult(generations=[[{"text": o}] for o in outputs])
+
+    async def _agenerate(self, prompts: List[str], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs) -> LLMResult:
+        # Like _generate: a single prompt streams to the callbacks, batches don't
+        stream_to = run_manager if len(prompts) == 1 else None
+        outputs = await asyncio.gather(*(self._acall(p, stop, stream_to) for p in prompts))
         return LLMResult(generations=[[{"text": o}] for o in outputs])
 
 # -------------------------
-# Initialize LLM & agent
+# Initialize LLM & per-session memory / agents
 # -------------------------
 llm = NovaLLM()
-agent = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent_type=AgentType.OPENAI_FUNCTIONS,
-    memory=memory,
-    verbose=False
-)
+
+# The conversational ReAct agent's prompt has a {chat_history} slot (a plain-text
+# transcript, hence return_messages=False), so the bounded memory actually reaches Nova;
+# `agent_type=` is not an initialize_agent argument and silently gave a zero-shot agent
+def _make_memory():
+    return BoundedSummaryBufferMemory(llm=llm, max_token_limit=MEMORY_MAX_TOKENS,
+                                      memory_key="chat_history", return_messages=False)
+
+def _make_agent(memory):
+    return initialize_agent(
+        tools=tools,
+        llm=llm,
+        agent=AgentType.CONVERSATIONAL_REACT_DESCRIPTION,
+        memory=memory,
+        verbose=False
+    )
+
+sessions = SessionStore(_make_memory, _make_agent)
+metrics.register("sessions", sessions.stats)
+metrics.register("continuations", continuations.stats)
+
+def get_session_memory(session_id: str):
+    return sessions.memory(session_id)
+
+def get_session_agent(session_id: str):
+    return sessions.agent(session_id)
+
+# -------------------------
+# Query entry point: router first, agent when unsure
+# -------------------------
+def answer_query(query: str, session_id: str = "default", callbacks=None):
+    """
+    Answer from the answer cache, the deterministic intent router when it is confident,
+    or the session's Nova agent. Returns (answer, path): "cache", "router:<tool>" or "agent".
+    `callbacks` are passed to the agent run (token streaming, tool progress).
+    Raises CircuitOpenError without calling Nova when the breaker is open and the
+    router has no answer, so callers can go straight to the fallback.
+    Cached answers are keyed on the normalized query, the session's conversation so far
+    and the DB data version, so one session never gets an answer shaped by another's
+    history and any write to the inventory or bookings makes them unreachable.
+    """
+    with span("query", query_chars=len(query)) as trace:
+        answer, path = _answer_query(query, session_id, callbacks)
+        trace.set("path", path).set("response_chars", len(answer))
+        return answer, path
+
+# Requests that write (WRITE_QUERY_RE: book / cancel) must reach the tools every time, never a cached answer
+
+def _history_stamp(memory):
+    """Hash of what the agent would see from earlier turns ("" for a fresh session)."""
+    messages = memory.chat_memory.messages
+    if not messages and not memory.moving_summary_buffer:
+        return ""
+    return answer_cache.make_key(memory.moving_summary_buffer, *(f"{m.type}:{m.content}" for m in messages))
+
+def _repeats_last_turn(memory, query, answer):
+    last = memory.chat_memory.messages[-2:]
+    return len(last) == 2 and last[0].content == query and last[1].content == answer
+
+def _answer_query(query, session_id, callbacks):
+    memory = get_session_memory(session_id)
+    # No version stamp (change listener down): bypass the answer cache rather than risk a stale answer
+    version = data_version()
+    key = None if version is None or WRITE_QUERY_RE.search(query) else answer_cache.make_key(
+        normalize_query(query), _history_stamp(memory), version)
+    cached = answer_cache.get(key) if key else None
+    if cached is not None:
+        if not _repeats_last_turn(memory, query, cached):
+            memory.save_context({"input": query}, {"output": cached})
+        return cached, "cache"
+
+    start = time.perf_counter()
+    # While Nova's circuit is open, any shape the router recognises beats a failed agent run
+    nova_down = nova_breaker.is_open
+    routed = intent_router.route(query, min_confidence=0.0 if nova_down else None)
+    if routed is None and nova_down:
+        raise CircuitOpenError("Nova circuit is open and the router could not answer")
+    if routed is None:
+        answer, path = get_session_agent(session_id).run(query, callbacks=callbacks), "agent"
+    else:
+        memory.save_context({"input": query}, {"output": routed.answer})
+        answer, path = routed.answer, f"router:{routed.tool}"
+    # Answers ending in a continuation token are not cached: the token outlives neither
+    # MORE_TOKEN_TTL nor the LRU, and a replayed page would point at a dead one
+    if key and answer.strip() and not re.search(TOKEN_PATTERN, answer):
+        answer_cache.put(key, answer, time.perf_counter() - start)
+    return answer, path
+
 def safe_nova_chat(input_text: str) -> str:
     """
     Try Nova LLM. If permission / ValidationException fails, use TripAdvisor API fallback.
@@ -267,6 +523,7 @@ def safe_nova_chat(input_text: str) -> str:
             raise Exception("Empty response")
         return response
     except Exception as e:
+        # CircuitOpenError lands here without a Bedrock round trip
         print(f"⚠️ Nova failed: {e}, using TripAdvisor fallback...")
         
         # Simple fallback: check if query mentions city
@@ -1,8 +1,19 @@
 -- DROP TABLES (Safe for dev resets)
+DROP TABLE IF EXISTS hotel_price_summary CASCADE;
+DROP TABLE IF EXISTS room_nights CASCADE;
 DROP TABLE IF EXISTS bookings CASCADE;
 DROP TABLE IF EXISTS hotel_rooms CASCADE;
 DROP TABLE IF EXISTS hotels CASCADE;
  
+-- EXTENSIONS
+-- btree_gist lets the bookings exclusion constraint mix room_id (=) with date ranges (&&)
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+-- pg_trgm powers fuzzy hotel-name lookup (typo tolerant, no leading-wildcard LIKE scans)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+-- cube + earthdistance give ll_to_earth() points and a GiST index for radius / nearest-hotel search
+CREATE EXTENSION IF NOT EXISTS cube;
+CREATE EXTENSION IF NOT EXISTS earthdistance;
+ 
 -- ENUM for room type
 -- CREATE TYPE room_type_enum AS ENUM ('single', 'double', 'suite', 'deluxe', 'presidential');
  
@@ -60,17 +71,38 @@ CREATE TABLE bookings (
  
     CONSTRAINT valid_dates CHECK (check_out > check_in),
     CONSTRAINT valid_guest_email CHECK (guest_email ~ '^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$'),
-    CONSTRAINT valid_guest_phone CHECK (guest_phone ~ '^\+?[0-9\s\-()]{7,20}$')
+    CONSTRAINT valid_guest_phone CHECK (guest_phone ~ '^\+?[0-9\s\-()]{7,20}$'),
+    -- No two confirmed stays may overlap for the same room. The GiST index backing
+    -- this constraint also serves the availability tools' daterange overlap lookups.
+    CONSTRAINT no_overlapping_confirmed_bookings EXCLUDE USING gist (
+        room_id WITH =,
+        daterange(check_in, check_out) WITH &&
+    ) WHERE (status = 'confirmed')
 );
  
+-- AMENITY KEYS
+-- Canonical amenity keys (lower-cased, non-alphanumerics dropped: 'Wi-Fi' -> 'wifi'), the
+-- same form database/amenities.py uses, so "with pool and spa" is an indexed @> / && test.
+CREATE OR REPLACE FUNCTION amenity_keys(amenities TEXT[])
+RETURNS TEXT[] AS $$
+    SELECT coalesce(array_agg(DISTINCT regexp_replace(lower(a), '[^a-z0-9]+', '', 'g')), '{}')
+    FROM unnest(amenities) AS a
+$$ LANGUAGE sql IMMUTABLE PARALLEL SAFE;
+ 
 -- INDEXES
 CREATE INDEX idx_hotels_city ON hotels(city);
+CREATE INDEX idx_hotels_city_key ON hotels(lower(trim(city)));
 CREATE INDEX idx_hotels_stars ON hotels(stars);
 CREATE INDEX idx_hotels_active ON hotels(is_active);
+CREATE INDEX idx_hotels_name_trgm ON hotels USING gin (lower(name) gin_trgm_ops);
+-- Serves earth_box() radius filters and ORDER BY <-> nearest-neighbour scans (search_hotels_near)
+CREATE INDEX idx_hotels_earth ON hotels USING gist (ll_to_earth(latitude, longitude));
 CREATE INDEX idx_hotel_rooms_hotel_id ON hotel_rooms(hotel_id);
 CREATE INDEX idx_hotel_rooms_available ON hotel_rooms(is_available);
 CREATE INDEX idx_hotel_rooms_price ON hotel_rooms(price_per_night);
 CREATE INDEX idx_hotel_rooms_type ON hotel_rooms(room_type);
+CREATE INDEX idx_hotels_amenities ON hotels USING gin (amenity_keys(amenities));
+CREATE INDEX idx_hotel_rooms_amenities ON hotel_rooms USING gin (amenity_keys(amenities));
 CREATE INDEX idx_bookings_room_id ON bookings(room_id);
 CREATE INDEX idx_bookings_dates ON bookings(check_in, check_out);
 CREATE INDEX idx_bookings_status ON bookings(status);
@@ -94,6 +126,173 @@ CREATE TRIGGER update_hotel_rooms_updated_at BEFORE UPDATE ON hotel_rooms
 CREATE TRIGGER update_bookings_updated_at BEFORE UPDATE ON bookings
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
  
+-- INVENTORY CHANGE EVENTS
+-- Pushed alongside the updated_at triggers so database/inventory_cache.py (LISTEN inventory_changed)
+-- can drop its in-memory copy of hotels / hotel_rooms. Statement-level, so bulk loads send one event.
+-- Every event (bookings too) also moves the in-process data version that keys the answer cache;
+-- nothing is written for it, so concurrent booking transactions share no row.
+CREATE OR REPLACE FUNCTION notify_inventory_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('inventory_changed', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+ 
+CREATE TRIGGER notify_hotels_changed AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON hotels
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_inventory_change();
+ 
+CREATE TRIGGER notify_hotel_rooms_changed AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON hotel_rooms
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_inventory_change();
+ 
+CREATE TRIGGER notify_bookings_changed AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON bookings
+    FOR EACH STATEMENT EXECUTE FUNCTION notify_inventory_change();
+ 
+-- PRICE SUMMARY
+-- One row per (hotel, room type), kept current by the triggers below, so
+-- search_hotels_by_price_range reads a few summary rows per hotel by exact city key
+-- instead of joining every room of every hotel in the city.
+CREATE TABLE hotel_price_summary (
+    hotel_id INTEGER NOT NULL REFERENCES hotels(id) ON DELETE CASCADE,
+    room_type room_type_enum NOT NULL,
+    city_key VARCHAR(100) NOT NULL,                 -- lower(trim(hotels.city))
+    min_price DECIMAL(10,2) NOT NULL,
+    max_price DECIMAL(10,2) NOT NULL,
+    median_price DECIMAL(10,2) NOT NULL,
+    prices DECIMAL(10,2)[] NOT NULL,                -- every room's price, ascending
+    available_prices DECIMAL(10,2)[] NOT NULL,      -- prices of rooms with is_available, ascending
+    room_count INTEGER NOT NULL,
+    available_count INTEGER NOT NULL,
+    PRIMARY KEY (hotel_id, room_type)
+);
+CREATE INDEX idx_price_summary_city ON hotel_price_summary(city_key, min_price);
+ 
+-- Recompute the summary rows of the given hotels (set-based, so bulk loads stay cheap).
+-- Two transactions refreshing the same hotel would both DELETE, then collide on the
+-- primary key in INSERT; a per-hotel transaction advisory lock (keyed on this table's
+-- oid, taken in hotel id order so multi-hotel refreshes can't deadlock) serializes them,
+-- and under READ COMMITTED the statements after it see the other refresh's committed rows.
+CREATE OR REPLACE FUNCTION refresh_hotel_price_summary(hotel_ids INTEGER[])
+RETURNS VOID AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock('hotel_price_summary'::regclass::oid::int, id)
+    FROM (SELECT DISTINCT unnest(hotel_ids) AS id ORDER BY 1) AS ids;
+    DELETE FROM hotel_price_summary WHERE hotel_id = ANY(hotel_ids);
+    INSERT INTO hotel_price_summary
+    SELECT hr.hotel_id, hr.room_type, lower(trim(h.city)),
+           min(hr.price_per_night), max(hr.price_per_night),
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY hr.price_per_night),
+           array_agg(hr.price_per_night ORDER BY hr.price_per_night),
+           coalesce(array_agg(hr.price_per_night ORDER BY hr.price_per_night) FILTER (WHERE hr.is_available), '{}'),
+           count(*), count(*) FILTER (WHERE hr.is_available)
+    FROM hotel_rooms hr
+    JOIN hotels h ON h.id = hr.hotel_id
+    WHERE hr.hotel_id = ANY(hotel_ids)
+    GROUP BY hr.hotel_id, hr.room_type, h.city;
+END;
+$$ LANGUAGE plpgsql;
+ 
+-- Statement-level with transition tables: one refresh per statement, only for the hotels it touched
+CREATE OR REPLACE FUNCTION price_summary_rooms_inserted()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_hotel_price_summary(ARRAY(SELECT DISTINCT hotel_id FROM new_rooms));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+ 
+CREATE OR REPLACE FUNCTION price_summary_rooms_updated()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_hotel_price_summary(ARRAY(
+        SELECT hotel_id FROM old_rooms UNION SELECT hotel_id FROM new_rooms));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+ 
+CREATE OR REPLACE FUNCTION price_summary_rooms_deleted()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_hotel_price_summary(ARRAY(SELECT DISTINCT hotel_id FROM old_rooms));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+ 
+CREATE OR REPLACE FUNCTION price_summary_city_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE hotel_price_summary SET city_key = lower(trim(NEW.city)) WHERE hotel_id = NEW.id;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+ 
+CREATE TRIGGER price_summary_rooms_insert AFTER INSERT ON hotel_rooms
+    REFERENCING NEW TABLE AS new_rooms
+    FOR EACH STATEMENT EXECUTE FUNCTION price_summary_rooms_inserted();
+ 
+CREATE TRIGGER price_summary_rooms_update AFTER UPDATE ON hotel_rooms
+    REFERENCING OLD TABLE AS old_rooms NEW TABLE AS new_rooms
+    FOR EACH STATEMENT EXECUTE FUNCTION price_summary_rooms_updated();
+ 
+CREATE TRIGGER price_summary_rooms_delete AFTER DELETE ON hotel_rooms
+    REFERENCING OLD TABLE AS old_rooms
+    FOR EACH STATEMENT EXECUTE FUNCTION price_summary_rooms_deleted();
+ 
+CREATE TRIGGER price_summary_hotel_city AFTER UPDATE OF city ON hotels
+    FOR EACH ROW WHEN (OLD.city IS DISTINCT FROM NEW.city)
+    EXECUTE FUNCTION price_summary_city_changed();
+ 
+-- ROOM-NIGHT OCCUPANCY
+-- One row per booked night of every confirmed booking, kept current by the triggers
+-- below. "Is room R free from X to Y" becomes a probe of the (room_id, night) primary
+-- key instead of an overlap scan of bookings, so date-aware room lists stay indexed.
+-- Cancelled / completed bookings hold no nights; deleting a booking cascades.
+CREATE TABLE room_nights (
+    room_id INTEGER NOT NULL REFERENCES hotel_rooms(id) ON DELETE CASCADE,
+    night DATE NOT NULL,
+    booking_id INTEGER NOT NULL REFERENCES bookings(id) ON DELETE CASCADE,
+    PRIMARY KEY (room_id, night)
+);
+CREATE INDEX idx_room_nights_booking ON room_nights(booking_id);
+ 
+CREATE OR REPLACE FUNCTION room_nights_bookings_inserted()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO room_nights (room_id, night, booking_id)
+    SELECT b.room_id, n::date, b.id
+    FROM new_bookings b, generate_series(b.check_in, b.check_out - 1, interval '1 day') AS n
+    WHERE b.status = 'confirmed';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+ 
+-- Only rows whose status, room or dates changed are touched (updated_at-only updates are free)
+CREATE OR REPLACE FUNCTION room_nights_bookings_updated()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM room_nights rn
+    USING old_bookings o JOIN new_bookings n ON n.id = o.id
+    WHERE rn.booking_id = o.id
+      AND (o.status, o.room_id, o.check_in, o.check_out) IS DISTINCT FROM (n.status, n.room_id, n.check_in, n.check_out);
+    INSERT INTO room_nights (room_id, night, booking_id)
+    SELECT n.room_id, d::date, n.id
+    FROM new_bookings n
+    JOIN old_bookings o ON o.id = n.id
+    CROSS JOIN generate_series(n.check_in, n.check_out - 1, interval '1 day') AS d
+    WHERE n.status = 'confirmed'
+      AND (o.status, o.room_id, o.check_in, o.check_out) IS DISTINCT FROM (n.status, n.room_id, n.check_in, n.check_out);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+ 
+CREATE TRIGGER room_nights_bookings_insert AFTER INSERT ON bookings
+    REFERENCING NEW TABLE AS new_bookings
+    FOR EACH STATEMENT EXECUTE FUNCTION room_nights_bookings_inserted();
+ 
+CREATE TRIGGER room_nights_bookings_update AFTER UPDATE ON bookings
+    REFERENCING OLD TABLE AS old_bookings NEW TABLE AS new_bookings
+    FOR EACH STATEMENT EXECUTE FUNCTION room_nights_bookings_updated();
+ 
  
  
 INSERT INTO hotels (
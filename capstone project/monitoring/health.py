@@ -0,0 +1,84 @@
+# monitoring/health.py
+#
+# Background health probe for the sidebar. Checks run on a daemon thread every
+# HEALTH_TTL seconds and the UI only reads the last results, so a Streamlit rerun
+# never waits on a database round trip or a Bedrock call.
+
+import os
+import time
+import logging
+import threading
+from database.db_connection import get_connection
+
+logger = logging.getLogger(__name__)
+
+HEALTH_TTL = float(os.getenv("HEALTH_TTL", "15"))
+
+
+class HealthProbe:
+    """
+    checks - {name: callable}; a check returns a short detail string when healthy
+             and raises when not.
+    """
+
+    def __init__(self, checks, ttl=HEALTH_TTL):
+        self.checks = dict(checks)
+        self.ttl = ttl
+        self._results = {name: {"ok": None, "detail": "checking…", "checked_at": None, "latency_ms": None}
+                         for name in self.checks}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="health-probe", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.ttl)
+
+    def run_once(self):
+        for name, check in self.checks.items():
+            start = time.perf_counter()
+            try:
+                result = {"ok": True, "detail": str(check())}
+            except Exception as e:
+                logger.warning("health check %s failed: %s", name, e)
+                result = {"ok": False, "detail": str(e)}
+            result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            result["checked_at"] = time.time()
+            with self._lock:
+                self._results[name] = result
+
+    def status(self):
+        """Last known result per check, with its age in seconds (starts the probe if needed)."""
+        self.start()
+        now = time.time()
+        with self._lock:
+            return {name: dict(r, age_seconds=None if r["checked_at"] is None else round(now - r["checked_at"], 1))
+                    for name, r in self._results.items()}
+
+
+# -------------------------
+# Checks
+# -------------------------
+def check_database():
+    with get_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT version();")
+        return cur.fetchone()[0]
+
+
+def nova_check(bedrock_client, model_id):
+    """Control-plane lookup of the model: verifies credentials and reachability without spending tokens."""
+    def check():
+        details = bedrock_client.get_foundation_model(modelIdentifier=model_id)["modelDetails"]
+        return f"{details.get('modelName', model_id)} ({details.get('modelLifecycle', {}).get('status', 'unknown')})"
+    return check
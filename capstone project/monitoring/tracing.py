@@ -0,0 +1,271 @@
+# monitoring/tracing.py
+#
+# Request tracing and hot-path metrics. Spans nest per request (query -> tool ->
+# db.execute, query -> nova.chat), carry attributes such as rows, prompt/response
+# sizes and cache hits, and on completion are
+#   - folded into Prometheus-style metrics served at http://METRICS_HOST:METRICS_PORT/metrics
+#     (loopback by default; set METRICS_HOST=0.0.0.0 to let a remote scraper in)
+#   - written as one JSON line each to the "trace" logger (TRACE_LOG_FILE or stderr)
+#
+# TRACING_ENABLED=0 (the default) makes traced() / instrument_tool() return the
+# original function and span() / start_span() return a shared no-op span, so
+# instrumented code runs exactly as before.
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+import functools
+import contextvars
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "0") == "1"
+TRACE_LOG = os.getenv("TRACE_LOG", "1") == "1"
+TRACE_LOG_FILE = os.getenv("TRACE_LOG_FILE")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+METRIC_PREFIX = "hotel"
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+trace_logger = logging.getLogger("trace")
+_current = contextvars.ContextVar("current_span", default=None)
+
+
+# -------------------------
+# Spans
+# -------------------------
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attrs", "start", "duration", "error", "_token")
+
+    def __init__(self, name, parent=None, **attrs):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.duration = None
+        self.error = None
+        self._token = None
+
+    def set(self, key, value):
+        self.attrs[key] = value
+        return self
+
+    def add(self, key, amount=1):
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+        return self
+
+    def end(self, error=None):
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self.start
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        metrics.observe(self)
+        if TRACE_LOG:
+            trace_logger.info(json.dumps({
+                "ts": round(time.time(), 3), "span": self.name, "trace_id": self.trace_id,
+                "span_id": self.span_id, "parent_id": self.parent_id,
+                "duration_ms": round(self.duration * 1000, 3), "error": self.error, **self.attrs,
+            }, default=str))
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        self.end(exc)
+        return False
+
+
+class _NoopSpan:
+    """Stand-in when tracing is off (or outside any span): every call does nothing."""
+
+    def set(self, key, value):
+        return self
+
+    def add(self, key, amount=1):
+        return self
+
+    def end(self, error=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def span(name, **attrs):
+    """`with span("name", key=value) as s:`; nested spans inside become its children."""
+    if not TRACING_ENABLED:
+        return NOOP_SPAN
+    return Span(name, _current.get(), **attrs)
+
+
+def start_span(name, **attrs):
+    """Span that is not made current; the caller must end() it (for generators, connections)."""
+    if not TRACING_ENABLED:
+        return NOOP_SPAN
+    return Span(name, _current.get(), **attrs)
+
+
+def current_span():
+    if not TRACING_ENABLED:
+        return NOOP_SPAN
+    return _current.get() or NOOP_SPAN
+
+
+def traced(name=None):
+    """Decorator: run the function (sync or async) inside a span. Identity when tracing is off."""
+    def decorate(fn):
+        if not TRACING_ENABLED:
+            return fn
+        span_name = name or fn.__qualname__
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with Span(span_name, _current.get()):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            parent = _current.get()
+            if parent is not None and parent.name == span_name:
+                return fn(*args, **kwargs)   # async variant delegating to the sync one: one span
+            with Span(span_name, parent):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def instrument_tool(tool):
+    """Trace a langchain tool's sync and async implementations in place as span "tool.<name>"."""
+    if TRACING_ENABLED and not getattr(tool.func, "traced", False):
+        tool.func = traced(f"tool.{tool.name}")(tool.func)
+        tool.func.traced = True
+        if tool.coroutine is not None:
+            tool.coroutine = traced(f"tool.{tool.name}")(tool.coroutine)
+    return tool
+
+
+# -------------------------
+# Metrics
+# -------------------------
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+class Metrics:
+    """Per-span-name duration histograms, error counts and attribute totals, plus registered gauges."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: [0] * (len(buckets) + 1))   # name -> bucket counts (+Inf last)
+        self._sums = defaultdict(float)
+        self._errors = defaultdict(int)
+        self._attrs = defaultdict(float)    # (name, attr) -> total of numeric / true boolean values
+        self._collectors = {}               # prefix -> callable returning {key: number}
+
+    def observe(self, s):
+        with self._lock:
+            counts = self._counts[s.name]
+            for i, bound in enumerate(self.buckets):
+                if s.duration <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[s.name] += s.duration
+            if s.error is not None:
+                self._errors[s.name] += 1
+            for key, value in s.attrs.items():
+                if isinstance(value, (bool, int, float)):
+                    self._attrs[(s.name, key)] += float(value)
+
+    def register(self, prefix, collect):
+        """Expose `collect()` (a dict of numbers, e.g. pool_stats) as gauges named <prefix>_<key>."""
+        self._collectors[prefix] = collect
+
+    def render(self):
+        lines = []
+        with self._lock:
+            counts = {k: list(v) for k, v in self._counts.items()}
+            sums, errors, attrs = dict(self._sums), dict(self._errors), dict(self._attrs)
+        m = f"{METRIC_PREFIX}_span_duration_seconds"
+        lines += [f"# HELP {m} Span durations.", f"# TYPE {m} histogram"]
+        for name in sorted(counts):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts[name]):
+                cumulative += count
+                lines.append(f"{m}_bucket{_labels(span=name, le=bound)} {cumulative}")
+            lines.append(f"{m}_sum{_labels(span=name)} {sums[name]:.6f}")
+            lines.append(f"{m}_count{_labels(span=name)} {cumulative}")
+        m = f"{METRIC_PREFIX}_span_errors_total"
+        lines += [f"# TYPE {m} counter"] + [f"{m}{_labels(span=n)} {errors.get(n, 0)}" for n in sorted(counts)]
+        m = f"{METRIC_PREFIX}_span_attribute_total"
+        lines += [f"# TYPE {m} counter"] + [f"{m}{_labels(span=n, attr=a)} {v:g}" for (n, a), v in sorted(attrs.items())]
+        for prefix, collect in sorted(self._collectors.items()):
+            try:
+                values = collect()
+            except Exception:
+                continue
+            for key, value in sorted(values.items()):
+                if isinstance(value, (bool, int, float)):
+                    lines.append(f"{METRIC_PREFIX}_{prefix}_{key} {float(value):g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    """Serve /metrics on a daemon thread (once per process); returns the server, or None when tracing is off."""
+    global _server
+    if not TRACING_ENABLED:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+    return _server
+
+
+if TRACING_ENABLED and TRACE_LOG and not trace_logger.handlers:
+    _handler = logging.FileHandler(TRACE_LOG_FILE) if TRACE_LOG_FILE else logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    trace_logger.addHandler(_handler)
+    trace_logger.setLevel(logging.INFO)
+    trace_logger.propagate = False
@@ -0,0 +1,147 @@
+# tools/availability_matrix.py
+#
+# Hotel-wide availability engine: loads every room of the requested hotels/cities
+# together with their confirmed bookings in one query, then answers
+# "what is free for the whole stay" with vectorized NumPy operations.
+
+from datetime import date
+from typing import List
+import numpy as np
+from database.db_connection import get_connection
+from database.statements import prepared, execute
+from database.async_db_connection import fetch_async
+
+MAX_NIGHTS = 366
+
+
+class AvailabilityMatrix:
+    """Room × night occupancy bitmap over the stay window [start, end)."""
+
+    def __init__(self, start: date, end: date, rooms: list, bookings: list):
+        # rooms: [(room_id, hotel_name, city, room_number, room_type, price)] sorted by room_id
+        # bookings: [(room_id, check_in, check_out)] overlapping the window
+        self.start = start
+        self.end = end
+        self.nights = (end - start).days
+        self.rooms = rooms
+        self.room_ids = np.array([r[0] for r in rooms], dtype=np.int64)
+        self.prices = np.array([float(r[5]) for r in rooms], dtype=np.float64)
+        self.occupied = self._build(bookings)
+
+    def _build(self, bookings: list) -> np.ndarray:
+        # Difference array: +1 on the first booked night, -1 after the last,
+        # so a cumulative sum along the night axis yields occupancy.
+        diff = np.zeros((len(self.rooms), self.nights + 1), dtype=np.int16)
+        if bookings:
+            rows = np.searchsorted(self.room_ids, np.array([b[0] for b in bookings], dtype=np.int64))
+            origin = np.datetime64(self.start, "D")
+            first = (np.array([b[1] for b in bookings], dtype="datetime64[D]") - origin).astype(np.int64)
+            last = (np.array([b[2] for b in bookings], dtype="datetime64[D]") - origin).astype(np.int64)
+            np.add.at(diff, (rows, np.clip(first, 0, self.nights)), 1)
+            np.add.at(diff, (rows, np.clip(last, 0, self.nights)), -1)
+        return np.cumsum(diff, axis=1)[:, :-1] > 0
+
+    def free_mask(self) -> np.ndarray:
+        """True for rooms with no booked night inside the window."""
+        return ~self.occupied.any(axis=1)
+
+    def free_nights(self) -> np.ndarray:
+        """Number of free nights per room (useful for partial-stay suggestions)."""
+        return self.nights - self.occupied.sum(axis=1)
+
+    def summary_by_hotel(self) -> dict:
+        """
+        {(hotel_name, city): {"total": n, "free": n, "types": {room_type: (free_count, min_price, [room_numbers])}}}
+        Counts and minimum prices are aggregated with bincount / minimum.at over group codes.
+        """
+        if not self.rooms:
+            return {}
+        free = self.free_mask()
+        hotel_keys = {}
+        type_keys = {}
+        hotel_code = np.array([hotel_keys.setdefault((r[1], r[2]), len(hotel_keys)) for r in self.rooms])
+        type_code = np.array([type_keys.setdefault(str(r[4]), len(type_keys)) for r in self.rooms])
+        n_types = len(type_keys)
+        group = hotel_code * n_types + type_code
+        n_groups = len(hotel_keys) * n_types
+
+        totals = np.bincount(hotel_code, minlength=len(hotel_keys))
+        free_per_hotel = np.bincount(hotel_code, weights=free, minlength=len(hotel_keys)).astype(int)
+        free_per_group = np.bincount(group, weights=free, minlength=n_groups).astype(int)
+        min_price = np.full(n_groups, np.inf)
+        np.minimum.at(min_price, group[free], self.prices[free])
+
+        # Free room indices bucketed by group in one stable sort
+        free_idx = np.flatnonzero(free)
+        free_idx = free_idx[np.argsort(group[free_idx], kind="stable")]
+        buckets = np.split(free_idx, np.cumsum(free_per_group)[:-1])
+
+        type_names = list(type_keys)
+        result = {}
+        for key, h in sorted(hotel_keys.items()):
+            types = {}
+            for t in np.flatnonzero(free_per_group[h * n_types:(h + 1) * n_types]):
+                g = h * n_types + t
+                numbers = [self.rooms[i][3] for i in buckets[g]]
+                types[type_names[t]] = (int(free_per_group[g]), float(min_price[g]), numbers)
+            result[key] = {"total": int(totals[h]), "free": int(free_per_hotel[h]), "types": types}
+        return result
+
+
+# Hotels are matched by two indexed probes instead of one OR over the table: city keys
+# through idx_hotels_city_key, and each name term as a substring through the trigram
+# index idx_hotels_name_trgm (one parameterized index scan per term).
+ROOMS_WITH_BOOKINGS_SQL = prepared("rooms_with_bookings", """
+    WITH matched AS (
+        SELECT h.id FROM hotels h
+        WHERE lower(trim(h.city)) = ANY(%s::text[])
+        UNION
+        SELECT h.id FROM unnest(%s::text[]) AS t(term)
+        JOIN hotels h ON lower(h.name) LIKE '%%' || t.term || '%%'
+    )
+    SELECT hr.id, h.name, h.city, hr.room_number, hr.room_type, hr.price_per_night,
+           b.check_in, b.check_out
+    FROM matched m
+    JOIN hotels h ON h.id = m.id
+    JOIN hotel_rooms hr ON hr.hotel_id = h.id
+    LEFT JOIN bookings b
+           ON b.room_id = hr.id AND b.status = 'confirmed'
+          AND daterange(b.check_in, b.check_out) && daterange(%s, %s)
+    ORDER BY hr.id;
+""")
+
+
+def _query_params(terms: List[str], start: date, end: date):
+    if end <= start:
+        raise ValueError("Check-out date must be after check-in date.")
+    if (end - start).days > MAX_NIGHTS:
+        raise ValueError(f"Stay window is limited to {MAX_NIGHTS} nights.")
+    lowered = [" ".join(t.split()).lower() for t in terms if t.strip()]
+    return lowered, lowered, start, end
+
+
+def _matrix_from_rows(rows, start: date, end: date) -> AvailabilityMatrix:
+    rooms, bookings = [], []
+    for r in rows:
+        if not rooms or rooms[-1][0] != r[0]:
+            rooms.append(tuple(r[:6]))
+        if r[6] is not None:
+            bookings.append((r[0], r[6], r[7]))
+    return AvailabilityMatrix(start, end, rooms, bookings)
+
+
+def load_availability(terms: List[str], start: date, end: date) -> AvailabilityMatrix:
+    """
+    Build the matrix for every hotel whose city equals, or whose name contains,
+    one of `terms` — rooms and overlapping confirmed bookings in a single query.
+    """
+    params = _query_params(terms, start, end)
+    with get_connection() as conn, conn.cursor() as cur:
+        execute(cur, ROOMS_WITH_BOOKINGS_SQL, params)
+        rows = cur.fetchall()
+    return _matrix_from_rows(rows, start, end)
+
+
+async def load_availability_async(terms: List[str], start: date, end: date) -> AvailabilityMatrix:
+    rows = await fetch_async(ROOMS_WITH_BOOKINGS_SQL, *_query_params(terms, start, end))
+    return _matrix_from_rows(rows, start, end)
@@ -0,0 +1,86 @@
+from langchain.tools import tool
+from monitoring.tracing import instrument_tool
+from database.db_connection import run_transaction
+from database.statements import prepared, execute
+from tools.create_booking import EMAIL_RE, PHONE_RE
+import asyncio
+import re
+
+# Single conditional UPDATE (row lock on one booking only). Booking IDs are sequential,
+# so every cancel must quote the email or the phone number (digits only compared) on
+# file; a booking with neither can't be cancelled here. Only stays that haven't ended can go.
+CANCEL_SQL = prepared("cancel_booking", """
+    WITH cancelled AS (
+        UPDATE bookings SET status = 'cancelled'
+        WHERE id = %s AND status = 'confirmed' AND check_out > CURRENT_DATE
+          AND (lower(guest_email) = lower(%s) OR regexp_replace(guest_phone, '\\D', '', 'g') = %s)
+        RETURNING id, room_id, check_in, check_out
+    )
+    SELECT c.id, h.name, hr.room_number, c.check_in, c.check_out
+    FROM cancelled c
+    JOIN hotel_rooms hr ON hr.id = c.room_id
+    JOIN hotels h ON h.id = hr.hotel_id;
+""")
+
+# Only run when nothing was cancelled, to explain why
+STATUS_SQL = prepared("booking_status", "SELECT status, check_out <= CURRENT_DATE FROM bookings WHERE id = %s;")
+
+BOOKING_ID_RE = re.compile(r"\b(?:booking|reservation|id)?\s*#?\s*(\d+)\b", re.IGNORECASE)
+# Preferred over a bare number, so a phone number written first isn't read as the ID
+KEYED_ID_RE = re.compile(r"(?:\b(?:booking|reservation|id)\s*(?:no\.?|number)?|#)\s*#?\s*(\d+)\b", re.IGNORECASE)
+
+
+def cancel_booking_by_id(booking_id: int, guest_email=None, guest_phone=None):
+    """
+    Returns (outcome, detail): ("cancelled", booking row), ("not_confirmed", its status),
+    or ("missing" | "ended" | "email", None). "email": neither contact matched the booking.
+    """
+    phone_digits = re.sub(r"\D", "", guest_phone) if guest_phone else None
+
+    def work(cur):
+        execute(cur, CANCEL_SQL, (booking_id, guest_email, phone_digits or None))
+        row = cur.fetchone()
+        if row:
+            return "cancelled", row
+        execute(cur, STATUS_SQL, (booking_id,))
+        status = cur.fetchone()
+        if status is None:
+            return "missing", None
+        if status[0] != "confirmed":
+            return "not_confirmed", status[0]
+        return ("ended" if status[1] else "email"), None
+
+    return run_transaction(work)
+
+@tool("cancel_booking", return_direct=True)
+def cancel_booking(query: str) -> str:
+    """
+    Cancel a confirmed booking by its ID and the guest email or phone number it was made with.
+    Example input: 'booking 42, ali@example.com'
+    """
+    email_m = EMAIL_RE.search(query)
+    rest = EMAIL_RE.sub(" ", query)
+    id_m = KEYED_ID_RE.search(rest) or BOOKING_ID_RE.search(rest)
+    if not id_m:
+        return "⚠️ Please give the booking ID, e.g., 'booking 42, ali@example.com'."
+    booking_id = int(id_m.group(1))
+    phone_m = PHONE_RE.search(rest[:id_m.start()] + " " + rest[id_m.end():])
+    if not email_m and not phone_m:
+        return f"⚠️ Please give the email address or phone number booking #{booking_id} was made with."
+    outcome, detail = cancel_booking_by_id(booking_id, email_m.group(0) if email_m else None,
+                                           phone_m.group(0) if phone_m else None)
+    if outcome == "cancelled":
+        return f"🗑️ Booking #{detail[0]} cancelled — {detail[1]} Room {detail[2]}, {detail[3]} to {detail[4]}."
+    if outcome == "missing":
+        return f"No booking found with ID {booking_id}."
+    if outcome == "not_confirmed":
+        return f"Booking #{booking_id} is already {detail}."
+    if outcome == "ended":
+        return f"Booking #{booking_id} has already ended and can't be cancelled."
+    return f"⚠️ That email address or phone number doesn't match booking #{booking_id}."
+
+async def cancel_booking_async(query: str) -> str:
+    return await asyncio.to_thread(cancel_booking.func, query)
+
+cancel_booking.coroutine = cancel_booking_async
+instrument_tool(cancel_booking)
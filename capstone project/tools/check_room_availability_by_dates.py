@@ -1,26 +1,56 @@
 from langchain.tools import tool
+from monitoring.tracing import instrument_tool
 from database.db_connection import get_connection
+from database.statements import prepared, execute
+from database.async_db_connection import fetchrow_async
 from datetime import datetime
 
 def parse_date(s: str):
     return datetime.strptime(s.strip(), "%Y-%m-%d").date()
 
+# The overlap test runs in Postgres on the GiST index behind the
+# no_overlapping_confirmed_bookings exclusion constraint.
+OVERLAP_SQL = prepared("room_overlap", """
+    SELECT check_in, check_out FROM bookings
+    WHERE room_id = %s AND status = 'confirmed'
+      AND daterange(check_in, check_out) && daterange(%s, %s)
+    ORDER BY check_in
+    LIMIT 1;
+""")
+
+def find_conflicting_booking(room_id: int, ci, co):
+    """Return (check_in, check_out) of the first confirmed booking overlapping [ci, co), or None."""
+    with get_connection() as conn, conn.cursor() as cur:
+        execute(cur, OVERLAP_SQL, (room_id, ci, co))
+        return cur.fetchone()
+
+async def find_conflicting_booking_async(room_id: int, ci, co):
+    return await fetchrow_async(OVERLAP_SQL, int(room_id), ci, co)
+
+def _availability_text(room_id, ci, co, booking) -> str:
+    if booking:
+        return f"❌ Room {room_id} is already booked between {booking[0]} and {booking[1]}."
+    return f"✅ Room {room_id} is available between {ci} and {co}."
+
+def room_availability_message(room_id: int, check_in: str, check_out: str) -> str:
+    """Shared fast path for the date-availability tools."""
+    ci = parse_date(check_in)
+    co = parse_date(check_out)
+    if co <= ci:
+        return "⚠️ Check-out date must be after check-in date."
+    return _availability_text(room_id, ci, co, find_conflicting_booking(room_id, ci, co))
+
+async def room_availability_message_async(room_id: int, check_in: str, check_out: str) -> str:
+    ci = parse_date(check_in)
+    co = parse_date(check_out)
+    if co <= ci:
+        return "⚠️ Check-out date must be after check-in date."
+    return _availability_text(room_id, ci, co, await find_conflicting_booking_async(room_id, ci, co))
+
 @tool("check_room_availability_by_dates", return_direct=True)
 def check_room_availability_by_dates(room_id: int, check_in: str, check_out: str) -> str:
     """Check if a specific room is available between two dates."""
-    ci = parse_date(check_in)
-    co = parse_date(check_out)
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT check_in, check_out FROM bookings
-        WHERE room_id = %s AND status = 'confirmed';
-    """, (room_id,))
-    bookings = cur.fetchall()
-    cur.close()
-    conn.close()
-
-    for b in bookings:
-        if not (co <= b[0] or ci >= b[1]):
-            return f"❌ Room {room_id} is already booked between {b[0]} and {b[1]}."
-    return f"✅ Room {room_id} is available between {ci} and {co}."
+    return room_availability_message(room_id, check_in, check_out)
+
+check_room_availability_by_dates.coroutine = room_availability_message_async
+instrument_tool(check_room_availability_by_dates)
@@ -0,0 +1,110 @@
+from langchain.tools import tool
+from monitoring.tracing import instrument_tool
+from database.db_connection import run_transaction
+from database.statements import prepared, execute
+from tools.check_room_availability_by_dates import parse_date
+from datetime import date
+import asyncio
+import psycopg2
+import re
+
+# One statement, one short transaction. No availability pre-check and no table
+# lock: the no_overlapping_confirmed_bookings exclusion constraint is the only
+# arbiter, so two clients racing for the same room and dates cannot both commit
+# (the second waits on the first's row in the GiST index, then fails with 23P01).
+BOOK_SQL = prepared("create_booking", """
+    WITH room AS (
+        SELECT hr.id, hr.room_number, hr.price_per_night, h.name
+        FROM hotel_rooms hr
+        JOIN hotels h ON h.id = hr.hotel_id
+        WHERE hr.id = %s AND h.is_active
+    ), booked AS (
+        INSERT INTO bookings (room_id, guest_name, guest_email, guest_phone, check_in, check_out, total_amount, status)
+        SELECT room.id, %s, %s, %s, %s::date, %s::date, room.price_per_night * (%s::date - %s::date), 'confirmed'
+        FROM room
+        RETURNING id, total_amount
+    )
+    SELECT booked.id, room.name, room.room_number, booked.total_amount
+    FROM booked CROSS JOIN room;
+""")
+
+ROOM_RE = re.compile(r"\broom\s*(?:id\s*)?(?:#|no\.?\s*)?(\d+)", re.IGNORECASE)
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"\+?\d[\d\s\-()]{5,18}\d")
+NAME_RE = re.compile(
+    r"\b(?:for|guest|name)[:\s]+([A-Za-z][A-Za-z.' -]*?)\s*(?=[,;(]|\bfrom\b|\bwith\b|\bemail\b|\bphone\b|\S+@|\+|\d|$)",
+    re.IGNORECASE,
+)
+
+
+class BookingConflict(Exception):
+    """The room already has a confirmed booking overlapping the requested stay."""
+
+
+def book_room(room_id: int, guest_name: str, guest_email, guest_phone, ci, co):
+    """
+    Reserve `room_id` for [ci, co). Returns (booking_id, hotel, room_number, total) or
+    None when the room does not exist; raises BookingConflict if the dates are taken.
+    """
+    params = (room_id, guest_name, guest_email, guest_phone, ci, co, co, ci)
+
+    def work(cur):
+        execute(cur, BOOK_SQL, params)
+        return cur.fetchone()
+
+    try:
+        return run_transaction(work)
+    except psycopg2.errors.ExclusionViolation as e:
+        raise BookingConflict(f"Room {room_id} is already booked for part of {ci} to {co}") from e
+
+
+def _parse_booking_query(query: str):
+    """Return (room_id, guest_name, email, phone, check_in, check_out) or an error message string."""
+    room_m = ROOM_RE.search(query)
+    dates = DATE_RE.findall(query)
+    name_m = NAME_RE.search(query)
+    if not room_m or len(dates) < 2 or not name_m:
+        return ("⚠️ Please give the room ID, guest name and dates, e.g., "
+                "'room 12 for Ali Khan, ali@example.com, +92 300 1234567 from 2025-03-12 to 2025-03-18'.")
+    email_m = EMAIL_RE.search(query)
+    rest = EMAIL_RE.sub(" ", DATE_RE.sub(" ", ROOM_RE.sub(" ", query)))
+    phone_m = PHONE_RE.search(rest)
+    return (int(room_m.group(1)), name_m.group(1).strip(),
+            email_m.group(0) if email_m else None, phone_m.group(0).strip() if phone_m else None,
+            parse_date(dates[0]), parse_date(dates[1]))
+
+def _nights(ci, co):
+    n = (co - ci).days
+    return f"{n} night{'s' if n != 1 else ''}"
+
+@tool("create_booking", return_direct=True)
+def create_booking(query: str) -> str:
+    """
+    Book a room for a guest between two dates.
+    Example input: 'room 12 for Ali Khan, ali@example.com, +92 300 1234567 from 2025-03-12 to 2025-03-18'
+    """
+    parsed = _parse_booking_query(query)
+    if isinstance(parsed, str):
+        return parsed
+    room_id, guest_name, email, phone, ci, co = parsed
+    if co <= ci:
+        return "⚠️ Check-out date must be after check-in date."
+    if ci < date.today():
+        return "⚠️ Check-in date cannot be in the past."
+    try:
+        booking = book_room(room_id, guest_name, email, phone, ci, co)
+    except BookingConflict:
+        return f"❌ Room {room_id} is already booked for part of {ci} to {co}. Please pick other dates or another room."
+    except psycopg2.errors.CheckViolation:
+        return "⚠️ That email address or phone number doesn't look valid."
+    if booking is None:
+        return f"No bookable room found with ID {room_id}."
+    return (f"✅ Booking #{booking[0]} confirmed — {booking[1]} Room {booking[2]}, "
+            f"{ci} to {co} ({_nights(ci, co)}) for {guest_name} — Total ₹{booking[3]:,.2f}")
+
+async def create_booking_async(query: str) -> str:
+    return await asyncio.to_thread(create_booking.func, query)
+
+create_booking.coroutine = create_booking_async
+instrument_tool(create_booking)
@@ -1,20 +1,116 @@
 from langchain.tools import tool
+from monitoring.tracing import instrument_tool
 from database.db_connection import get_connection
-@tool("get_available_rooms", return_direct=True)
-def get_available_rooms(hotel_name: str) -> str:
-    """Get list of available rooms in a hotel."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT hr.room_number, hr.room_type, hr.price_per_night
-        FROM hotel_rooms hr
-        JOIN hotels h ON hr.hotel_id = h.id
-        WHERE lower(h.name) LIKE lower(%s)
-        AND hr.is_available = TRUE;
-    """, (f"%{hotel_name}%",))
-    rooms = cur.fetchall()
-    cur.close()
-    conn.close()
+from database.statements import prepared, execute
+from database.async_db_connection import get_async_pool, asyncpg_sql
+from database.name_index import NAME_MATCH_THRESHOLD
+from tools.paging import TOOL_PAGE_SIZE, pager, first_page, render_page, fetch_keyset, split_page
+from tools.check_room_availability_by_dates import parse_date
+from datetime import date, timedelta
+from typing import Optional
+import re
+
+# Transaction-local, so pooled connections keep the server default afterwards
+THRESHOLD_SQL = prepared("name_match_threshold",
+                         "SELECT set_config('pg_trgm.word_similarity_threshold', %s, true);")
+
+# %> is pg_trgm word similarity, answered from idx_hotels_name_trgm. A room is free when
+# none of its nights in [check_in, check_out) is in room_nights (a primary-key range probe).
+# Keyset-paged on (hotel name, price, room id): params 5-8 are the last row shown (NULLs on page one).
+AVAILABLE_ROOMS_SQL = prepared("available_rooms", """
+    WITH ranked AS (
+        SELECT id, name, word_similarity(lower(%s), lower(name)) AS score
+        FROM hotels
+        WHERE lower(name) %%> lower(%s)
+    )
+    SELECT hr.room_number, hr.room_type, hr.price_per_night, r.name, hr.id
+    FROM ranked r
+    JOIN hotel_rooms hr ON hr.hotel_id = r.id
+    WHERE r.score = (SELECT max(score) FROM ranked)
+    AND NOT EXISTS (
+        SELECT 1 FROM room_nights rn
+        WHERE rn.room_id = hr.id AND rn.night >= %s::date AND rn.night < %s::date
+    )
+    AND (%s::varchar IS NULL OR (r.name, hr.price_per_night, hr.id) > (%s::varchar, %s::numeric, %s::integer))
+    ORDER BY r.name, hr.price_per_night, hr.id
+    LIMIT %s;
+""")
+
+DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+def _stay(hotel_name: str, check_in, check_out):
+    """
+    (hotel name, check-in, check-out), or an error message string. Dates may also be written
+    into the hotel name ("Avari Towers from 2025-03-12 to 2025-03-18"); with none given the
+    stay is tonight.
+    """
+    dates = DATE_RE.findall(hotel_name)
+    if dates:
+        hotel_name = re.sub(r"\b(from|to|between|and|on)\b", " ", DATE_RE.sub(" ", hotel_name), flags=re.IGNORECASE)
+        hotel_name = " ".join(hotel_name.split()).strip(" ,")
+        check_in = check_in or dates[0]
+        check_out = check_out or (dates[1] if len(dates) > 1 else None)
+    try:
+        ci = parse_date(check_in) if isinstance(check_in, str) else (check_in or date.today())
+        co = parse_date(check_out) if isinstance(check_out, str) else (check_out or ci + timedelta(days=1))
+    except ValueError:
+        return "⚠️ Please give valid dates, e.g., 'Avari Towers from 2025-03-12 to 2025-03-18'."
+    if co <= ci:
+        return "⚠️ Check-out date must be after check-in date."
+    return hotel_name, ci, co
+
+def _no_rooms_text(hotel_name, ci, co):
+    return f"No rooms free in '{hotel_name}' from {ci} to {co}."
+
+def _room_key(r):
+    return (r[3], r[2], r[4])
+
+def _room_lines(rooms, ci, co):
+    if not rooms:
+        return []
+    return [f"🛏️ Free from {ci} to {co}:"] + [f"{r[0]} — {r[1]} — ₹{r[2]} ({r[3]})" for r in rooms]
+
+@pager("get_available_rooms")
+def _available_rooms_page(args, after, limit):
+    hotel_name, ci, co = args
+    after = after or (None, None, None)
+    with get_connection() as conn, conn.cursor() as cur:
+        execute(cur, THRESHOLD_SQL, (str(NAME_MATCH_THRESHOLD),))
+        rooms, next_key = fetch_keyset(cur, AVAILABLE_ROOMS_SQL,
+                                       (hotel_name, hotel_name, ci, co, after[0]) + tuple(after),
+                                       limit, _room_key)
+    return _room_lines(rooms, ci, co), next_key
+
+def _rooms_text(hotel_name, ci, co, rooms, next_key) -> str:
     if not rooms:
-        return f"No available rooms in '{hotel_name}'."
-    return "\n".join([f"{r[0]} — {r[1]} — ₹{r[2]}" for r in rooms])
+        return _no_rooms_text(hotel_name, ci, co)
+    return render_page("get_available_rooms", (hotel_name, ci, co), _room_lines(rooms, ci, co), next_key)
+
+@tool("get_available_rooms", return_direct=True)
+def get_available_rooms(hotel_name: str, check_in: Optional[str] = None, check_out: Optional[str] = None) -> str:
+    """
+    Get list of rooms free in a hotel between two dates (default: tonight).
+    Example input: 'Avari Towers from 2025-03-12 to 2025-03-18'
+    """
+    stay = _stay(hotel_name, check_in, check_out)
+    if isinstance(stay, str):
+        return stay
+    hotel_name, ci, co = stay
+    return first_page("get_available_rooms", hotel_name, ci, co) or _no_rooms_text(hotel_name, ci, co)
+
+async def get_available_rooms_async(hotel_name: str, check_in: Optional[str] = None,
+                                    check_out: Optional[str] = None) -> str:
+    stay = _stay(hotel_name, check_in, check_out)
+    if isinstance(stay, str):
+        return stay
+    hotel_name, ci, co = stay
+    pool = await get_async_pool()
+    async with pool.acquire() as conn, conn.transaction():
+        await conn.execute(asyncpg_sql(THRESHOLD_SQL), str(NAME_MATCH_THRESHOLD))
+        rows = await conn.fetch(asyncpg_sql(AVAILABLE_ROOMS_SQL), hotel_name, hotel_name, ci, co,
+                                None, None, None, None, TOOL_PAGE_SIZE + 1)
+    rooms, next_key = split_page(rows, TOOL_PAGE_SIZE, _room_key)
+    return _rooms_text(hotel_name, ci, co, rooms, next_key)
+
+get_available_rooms.coroutine = get_available_rooms_async
+instrument_tool(get_available_rooms)
@@ -1,21 +1,32 @@
 from langchain.tools import tool
+from monitoring.tracing import instrument_tool
 from database.db_connection import get_connection
+from database.statements import prepared, execute
+from database.async_db_connection import fetchrow_async
 
-@tool("get_booking_details", return_direct=True)
-def get_booking_details(booking_id: int) -> str:
-    """Retrieve booking details by booking ID."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT b.id, h.name, hr.room_number, b.check_in, b.check_out, b.status
-        FROM bookings b
-        JOIN hotel_rooms hr ON b.room_id = hr.id
-        JOIN hotels h ON hr.hotel_id = h.id
-        WHERE b.id = %s;
-    """, (booking_id,))
-    booking = cur.fetchone()
-    cur.close()
-    conn.close()
+BOOKING_SQL = prepared("booking_details", """
+    SELECT b.id, h.name, hr.room_number, b.check_in, b.check_out, b.status
+    FROM bookings b
+    JOIN hotel_rooms hr ON b.room_id = hr.id
+    JOIN hotels h ON hr.hotel_id = h.id
+    WHERE b.id = %s;
+""")
+
+def _booking_text(booking_id, booking) -> str:
     if not booking:
         return f"No booking found with ID {booking_id}."
     return f"Booking #{booking[0]} — {booking[1]} Room {booking[2]}, {booking[3]} to {booking[4]} — Status: {booking[5]}"
+
+@tool("get_booking_details", return_direct=True)
+def get_booking_details(booking_id: int) -> str:
+    """Retrieve booking details by booking ID."""
+    with get_connection() as conn, conn.cursor() as cur:
+        execute(cur, BOOKING_SQL, (booking_id,))
+        booking = cur.fetchone()
+    return _booking_text(booking_id, booking)
+
+async def get_booking_details_async(booking_id: int) -> str:
+    return _booking_text(booking_id, await fetchrow_async(BOOKING_SQL, int(booking_id)))
+
+get_booking_details.coroutine = get_booking_details_async
+instrument_tool(get_booking_details)
@@ -0,0 +1,78 @@
+from langchain.tools import tool
+from monitoring.tracing import instrument_tool
+from tools.availability_matrix import load_availability, load_availability_async
+from tools.check_room_availability_by_dates import parse_date
+from tools.paging import TOOL_PAGE_SIZE, pager, render_page, split_page
+import re
+
+def _parse_stay_query(query: str):
+    """Return (terms, check_in, check_out) or an error message string."""
+    dates = re.findall(r"\d{4}-\d{2}-\d{2}", query)
+    if len(dates) < 2:
+        return "⚠️ Please mention check-in and check-out dates, e.g., 'Lahore from 2025-03-12 to 2025-03-18'."
+
+    # Whatever is left after removing dates/filler words is a list of hotels or cities
+    text = re.sub(r"\d{4}-\d{2}-\d{2}", " ", query)
+    text = re.sub(r"\b(from|to|between|and|in|at)\b", ",", text, flags=re.IGNORECASE)
+    terms = [t.strip() for t in re.split(r"[,;|]", text) if t.strip()]
+    if not terms:
+        return "⚠️ Please mention at least one hotel name or city."
+    try:
+        return terms, parse_date(dates[0]), parse_date(dates[1])
+    except ValueError:
+        return "⚠️ Please give valid dates, e.g., 'Lahore from 2025-03-12 to 2025-03-18'."
+
+def _hotel_blocks(summary, ci, co, after, limit):
+    """Lines of up to `limit` hotels whose (name, city) key sorts after `after`; (lines, next key)."""
+    keys = [key for key in summary if after is None or key > tuple(after)]   # summary is in key order
+    page, next_key = split_page(keys, limit, lambda key: key)
+    lines = []
+    for name, city in page:
+        info = summary[(name, city)]
+        lines.append(f"🏨 {name} ({city}) — {info['free']} of {info['total']} rooms free {ci} to {co}")
+        for room_type, (count, min_price, numbers) in info["types"].items():
+            lines.append(f"   • {room_type} ×{count} from ₹{min_price:,.2f} — rooms {', '.join(numbers)}")
+    return lines, next_key
+
+# A page is TOOL_PAGE_SIZE hotels (each with its room-type lines), keyed by (name, city)
+@pager("get_free_rooms_for_stay")
+def _free_rooms_page(args, after, limit):
+    terms, ci, co = args
+    return _hotel_blocks(load_availability(list(terms), ci, co).summary_by_hotel(), ci, co, after, limit)
+
+def _free_rooms_text(terms, ci, co, matrix) -> str:
+    summary = matrix.summary_by_hotel()
+    if not summary:
+        return f"No hotels found matching {', '.join(terms)}."
+    lines, next_key = _hotel_blocks(summary, ci, co, None, TOOL_PAGE_SIZE)
+    return render_page("get_free_rooms_for_stay", (tuple(terms), ci, co), lines, next_key)
+
+@tool("get_free_rooms_for_stay", return_direct=True)
+def get_free_rooms_for_stay(query: str) -> str:
+    """
+    List rooms free for a whole stay in one or more hotels or cities.
+    Example input: 'Pearl Continental, Avari Towers from 2025-03-12 to 2025-03-18'
+    """
+    parsed = _parse_stay_query(query)
+    if isinstance(parsed, str):
+        return parsed
+    terms, ci, co = parsed
+    try:
+        matrix = load_availability(terms, ci, co)
+    except ValueError as e:
+        return f"⚠️ {e}"
+    return _free_rooms_text(terms, ci, co, matrix)
+
+async def get_free_rooms_for_stay_async(query: str) -> str:
+    parsed = _parse_stay_query(query)
+    if isinstance(parsed, str):
+        return parsed
+    terms, ci, co = parsed
+    try:
+        matrix = await load_availability_async(terms, ci, co)
+    except ValueError as e:
+        return f"⚠️ {e}"
+    return _free_rooms_text(terms, ci, co, matrix)
+
+get_free_rooms_for_stay.coroutine = get_free_rooms_for_stay_async
+instrument_tool(get_free_rooms_for_stay)
@@ -1,15 +1,19 @@
 from langchain.tools import tool
-from database.db_connection import get_connection
+from monitoring.tracing import instrument_tool
+from database.inventory_cache import inventory_cache
 
 @tool("get_hotel_details", return_direct=True)
 def get_hotel_details(hotel_name: str) -> str:
     """Get details of a hotel."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT name, city, rating, address, contact FROM hotels WHERE lower(name) LIKE lower(%s);", (f"%{hotel_name}%",))
-    h = cur.fetchone()
-    cur.close()
-    conn.close()
-    if not h:
+    matches = inventory_cache.match_hotels(hotel_name, limit=1)
+    if not matches:
         return f"No details found for '{hotel_name}'."
-    return f"{h[0]} ({h[1]})\n⭐ Rating: {h[2]}\n📍 Address: {h[3]}\n📞 Contact: {h[4]}"
+    h = matches[0][0]
+    return f"{h.name} ({h.city})\n⭐ Rating: {h.stars}\n📍 Address: {h.address}\n📞 Contact: {h.phone_number}"
+
+async def get_hotel_details_async(hotel_name: str) -> str:
+    await inventory_cache.aensure_fresh()
+    return get_hotel_details.func(hotel_name)
+
+get_hotel_details.coroutine = get_hotel_details_async
+instrument_tool(get_hotel_details)
@@ -1,20 +1,25 @@
 from langchain.tools import tool
-from database.db_connection import get_connection
+from monitoring.tracing import instrument_tool
+from database.inventory_cache import inventory_cache
+from tools.paging import pager, first_page, offset_page
+
+@pager("get_room_types_and_prices")
+def _room_types_page(args, offset, limit):
+    (hotel_name,) = args
+    # A hotel has tens of rooms, so offsets into the cached list are fine here
+    data = [r for h in inventory_cache.best_hotel_matches(hotel_name)
+            for r in inventory_cache.rooms_for_hotel(h.id)]
+    rooms, next_offset = offset_page(data, offset, limit)
+    return [f"{r.room_type} — ₹{r.price_per_night:.2f}" for r in rooms], next_offset
 
 @tool("get_room_types_and_prices", return_direct=True)
 def get_room_types_and_prices(hotel_name: str) -> str:
     """List room types and prices for a hotel."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT room_type, price_per_night
-        FROM hotel_rooms hr
-        JOIN hotels h ON hr.hotel_id = h.id
-        WHERE lower(h.name) LIKE lower(%s);
-    """, (f"%{hotel_name}%",))
-    data = cur.fetchall()
-    cur.close()
-    conn.close()
-    if not data:
-        return f"No rooms found for '{hotel_name}'."
-    return "\n".join([f"{r[0]} — ₹{r[1]}" for r in data])
+    return first_page("get_room_types_and_prices", hotel_name) or f"No rooms found for '{hotel_name}'."
+
+async def get_room_types_and_prices_async(hotel_name: str) -> str:
+    await inventory_cache.aensure_fresh()
+    return get_room_types_and_prices.func(hotel_name)
+
+get_room_types_and_prices.coroutine = get_room_types_and_prices_async
+instrument_tool(get_room_types_and_prices)
@@ -0,0 +1,25 @@
+from langchain.tools import tool
+from monitoring.tracing import instrument_tool
+from tools.paging import TOKEN_PATTERN, next_page
+import asyncio
+import re
+
+@tool("more_results", return_direct=True)
+def more_results(token: str) -> str:
+    """
+    Show the next page of a previous list answer.
+    Example input: 'more:1a2b3c4d' (the token printed under the previous page)
+    """
+    match = re.search(TOKEN_PATTERN, token)
+    if not match:
+        return "⚠️ Please pass the continuation token shown with the results, e.g., 'more:1a2b3c4d'."
+    page = next_page(match.group(0))
+    if page is None:
+        return "⚠️ That continuation token has expired. Please run the search again."
+    return page
+
+async def more_results_async(token: str) -> str:
+    return await asyncio.to_thread(more_results.func, token)
+
+more_results.coroutine = more_results_async
+instrument_tool(more_results)
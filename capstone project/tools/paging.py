@@ -0,0 +1,126 @@
+# tools/paging.py
+#
+# Bounded output for list tools. A tool returns at most TOOL_PAGE_SIZE lines; when
+# more remain, the answer ends with a short continuation token ("more:1a2b3c4d")
+# that the More Results tool (tools/more_results.py) turns into the next page.
+#
+# Each list tool registers a pager under its tool name:
+#     pager(args, cursor, limit) -> (lines, next_cursor)
+# cursor is None for the first page; next_cursor is None on the last page. Cursors
+# are keyset keys (sort key of the last row shown) or plain offsets for short lists;
+# keyset keys survive inserts/deletes between pages, offsets do not.
+# Tokens map to (tool, args, cursor) in a bounded LRU with a TTL, so nothing large is
+# ever held per conversation and the prompt never carries more than one page.
+
+import os
+import time
+import secrets
+import threading
+from collections import OrderedDict
+from database.statements import execute
+
+TOOL_PAGE_SIZE = int(os.getenv("TOOL_PAGE_SIZE", "10"))
+MORE_TOKEN_TTL = float(os.getenv("MORE_TOKEN_TTL", "1800"))
+MORE_TOKEN_MAX = int(os.getenv("MORE_TOKEN_MAX", "1000"))
+TOKEN_PATTERN = r"\bmore:[0-9a-f]{8}\b"
+
+_pagers = {}
+
+
+def pager(name):
+    """Decorator registering `fn(args, cursor, limit)` as the pager of tool `name`."""
+    def register(fn):
+        _pagers[name] = fn
+        return fn
+    return register
+
+
+class ContinuationStore:
+    """LRU + TTL of token -> (tool name, args, cursor)."""
+
+    def __init__(self, max_entries=MORE_TOKEN_MAX, ttl=MORE_TOKEN_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # token -> (name, args, cursor, created_at)
+        self._lock = threading.Lock()
+
+    def put(self, name, args, cursor):
+        token = f"more:{secrets.token_hex(4)}"
+        with self._lock:
+            self._entries[token] = (name, args, cursor, time.monotonic())
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return token
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[3] >= self.ttl:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return entry[:3]
+
+    def stats(self):
+        with self._lock:
+            return {"tokens": len(self._entries), "max_tokens": self.max_entries}
+
+
+continuations = ContinuationStore()
+
+
+# -------------------------
+# Pages
+# -------------------------
+def render_page(name, args, lines, next_cursor):
+    """Join a page's lines and, if more remain, append the continuation token."""
+    text = "\n".join(lines)
+    if next_cursor is not None:
+        token = continuations.put(name, args, next_cursor)
+        text += f"\n\n➡️ More results available — say '{token}' to see them."
+    return text
+
+
+def first_page(name, *args, page_size=None):
+    """First page of tool `name` for `args`; "" when there are no results at all."""
+    lines, next_cursor = _pagers[name](args, None, page_size or TOOL_PAGE_SIZE)
+    return render_page(name, args, lines, next_cursor) if lines else ""
+
+
+def next_page(token, page_size=None):
+    """Page following `token`, or None if the token is unknown or expired."""
+    entry = continuations.get(token.strip())
+    if entry is None:
+        return None
+    name, args, cursor = entry
+    lines, next_cursor = _pagers[name](args, cursor, page_size or TOOL_PAGE_SIZE)
+    return render_page(name, args, lines, next_cursor) if lines else "No more results."
+
+
+# -------------------------
+# Cursor helpers
+# -------------------------
+def split_page(rows, limit, key):
+    """`rows` fetched with limit + 1: (the page, key of its last row if another page exists)."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, key(rows[-1])
+    return rows, None
+
+
+def offset_page(items, offset, limit):
+    """(page, next_offset) for short lists where offsets are good enough."""
+    offset = offset or 0
+    page = items[offset:offset + limit]
+    return page, (offset + limit if offset + limit < len(items) else None)
+
+
+def fetch_keyset(cur, sql, params, limit, key):
+    """
+    Run `sql` (which must end in LIMIT %s) asking for one row more than `limit`, so the
+    extra row tells whether another page exists. Returns (rows, next_key).
+    """
+    execute(cur, sql, tuple(params) + (limit + 1,))
+    return split_page(cur.fetchall(), limit, key)
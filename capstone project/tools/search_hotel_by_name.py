@@ -1,15 +1,18 @@
 from langchain.tools import tool
-from database.db_connection import get_connection
+from monitoring.tracing import instrument_tool
+from database.inventory_cache import inventory_cache
 
 @tool("search_hotel_by_name", return_direct=True)
 def search_hotel_by_name(hotel_name: str) -> str:
-    """Search a hotel by partial or full name."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT name, city, rating FROM hotels WHERE lower(name) LIKE lower(%s);", (f"%{hotel_name}%",))
-    hotels = cur.fetchall()
-    cur.close()
-    conn.close()
-    if not hotels:
+    """Search a hotel by partial or full name (typos tolerated)."""
+    matches = inventory_cache.match_hotels(hotel_name)
+    if not matches:
         return f"No hotels found matching '{hotel_name}'."
-    return "\n".join([f"{h[0]} ({h[1]}) — ⭐{h[2]}" for h in hotels])
+    return "\n".join([f"{h.name} ({h.city}) — ⭐{h.stars} — match {score:.0%}" for h, score in matches])
+
+async def search_hotel_by_name_async(hotel_name: str) -> str:
+    await inventory_cache.aensure_fresh()
+    return search_hotel_by_name.func(hotel_name)
+
+search_hotel_by_name.coroutine = search_hotel_by_name_async
+instrument_tool(search_hotel_by_name)
@@ -0,0 +1,310 @@
+from langchain.tools import tool
+from monitoring.tracing import instrument_tool
+from database.db_connection import get_connection
+from database.inventory_cache import inventory_cache
+from tools.paging import pager, first_page, offset_page, fetch_keyset
+from tools.check_room_availability_by_dates import parse_date
+from tools.search_hotels_near import PRICE, BETWEEN_RE, UNDER_RE
+from tools.search_hotels_by_amenities import STARS_RE, ANY_OF_RE, city_in, amenity_terms
+from collections import namedtuple
+from datetime import date, timedelta
+from typing import Optional
+import asyncio
+import os
+import re
+
+# auto: stays (dates given) run as one SQL query, everything else is planned over the
+#       cached inventory (database/inventory_cache.py), which knows no bookings
+# db:   always SQL
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+
+Criteria = namedtuple("Criteria", "city min_stars min_price max_price check_in check_out room_type guests "
+                                  "amenities any_of")
+NO_CRITERIA = Criteria(None, None, None, None, None, None, None, None, (), False)
+
+# One row per hotel with a room passing every filter, best rated then cheapest first.
+# Keyset-paged on (-stars, lowest price, name, id). {where} is joined from the fixed
+# fragments below only, so each search is planned against just the indexes it needs.
+SEARCH_SQL = """
+    SELECT h.id, h.name, h.city, h.stars, count(*) AS rooms,
+           min(hr.price_per_night) AS lowest,
+           string_agg(DISTINCT hr.room_type::text, ', ') AS room_types
+    FROM hotels h
+    JOIN hotel_rooms hr ON hr.hotel_id = h.id
+    WHERE {where}
+    GROUP BY h.id
+    HAVING %s::integer IS NULL
+        OR (-h.stars, min(hr.price_per_night), h.name, h.id) > (%s::integer, %s::numeric, %s::varchar, %s::integer)
+    ORDER BY -h.stars, lowest, h.name, h.id
+    LIMIT %s;
+"""
+CITY_CLAUSE = "lower(trim(h.city)) = %s"                     # idx_hotels_city_key
+STARS_CLAUSE = "h.stars >= %s"
+MIN_PRICE_CLAUSE = "hr.price_per_night >= %s"                # idx_hotel_rooms_price
+MAX_PRICE_CLAUSE = "hr.price_per_night <= %s"
+ROOM_TYPE_CLAUSE = "hr.room_type = %s::room_type_enum"
+GUESTS_CLAUSE = "hr.capacity >= %s"
+HOTEL_AMENITIES_CLAUSE = "amenity_keys(h.amenities) @> %s::text[]"      # GIN, idx_hotels_amenities
+ROOM_AMENITIES_CLAUSE = "amenity_keys(hr.amenities) @> %s::text[]"      # GIN, idx_hotel_rooms_amenities
+ANY_AMENITY_CLAUSE = "(amenity_keys(h.amenities) && %s::text[] OR amenity_keys(hr.amenities) && %s::text[])"
+FREE_CLAUSE = """NOT EXISTS (
+        SELECT 1 FROM room_nights rn
+        WHERE rn.room_id = hr.id AND rn.night >= %s::date AND rn.night < %s::date)"""
+
+MONTH = r"(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?"
+DAY = r"(\d{1,2})(?:st|nd|rd|th)?(?!\d)"
+DASH = r"\s*(?:-|–|—|to|until|till)\s*"
+ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+NIGHTS_RE = re.compile(r"\bfor\s+(\d{1,2})\s+nights?\b", re.IGNORECASE)
+# "10-12 May", "30 May to 2 June 2026"
+DAY_FIRST_RE = re.compile(rf"\b{DAY}(?:\s+{MONTH})?{DASH}{DAY}\s+{MONTH}(?:,?\s+(\d{{4}}))?", re.IGNORECASE)
+# "May 10-12", "May 30 - June 2, 2026"
+MONTH_FIRST_RE = re.compile(rf"\b{MONTH}\s+{DAY}{DASH}(?:{MONTH}\s+)?{DAY}(?:,?\s+(\d{{4}}))?", re.IGNORECASE)
+OVER_RE = re.compile(rf"\b(?:over|above|more\s+than|at\s+least|min(?:imum)?|from)\s*{PRICE}", re.IGNORECASE)
+GUESTS_RE = re.compile(r"\b(\d{1,2})\s+(?:guests?|people|persons?|adults?|pax)\b"
+                       r"|\b(?:sleeps?|capacity(?:\s+of)?)\s+(\d{1,2})\b", re.IGNORECASE)
+STAY_WORDS_RE = re.compile(r"\b(?:free|available|vacant|rooms?)\b", re.IGNORECASE)
+ROOM_TYPE_RE = re.compile(r"\b(single|double|suite|family|deluxe)s?\b", re.IGNORECASE)
+MONTHS = {m: i for i, m in enumerate(("jan", "feb", "mar", "apr", "may", "jun",
+                                      "jul", "aug", "sep", "oct", "nov", "dec"), 1)}
+
+def _calendar_date(day, month, year):
+    """date from text parts; without a year, the next such date from today."""
+    month = MONTHS[month.lower()[:3]]
+    if year:
+        return date(int(year), month, int(day))
+    today = date.today()
+    d = date(today.year, month, int(day))
+    return d if d >= today else date(today.year + 1, month, int(day))
+
+def _stay_in(text: str):
+    """(check_in, check_out, text without them); dates are None when no stay is named."""
+    isos = ISO_DATE_RE.findall(text)
+    if isos:
+        text = ISO_DATE_RE.sub(" ", text)
+        ci = parse_date(isos[0])
+        nights = NIGHTS_RE.search(text)
+        if len(isos) > 1:
+            co = parse_date(isos[1])
+        else:
+            co = ci + timedelta(days=int(nights.group(1)) if nights else 1)
+        return ci, co, NIGHTS_RE.sub(" ", text)
+    m = DAY_FIRST_RE.search(text)
+    if m:
+        d1, m1, d2, m2, year = m.groups()
+        parts = (d1, m1 or m2, d2, m2, year)
+    else:
+        m = MONTH_FIRST_RE.search(text)
+        if not m:
+            return None, None, text
+        m1, d1, m2, d2, year = m.groups()
+        parts = (d1, m1, d2, m2 or m1, year)
+    d1, m1, d2, m2, year = parts
+    ci = _calendar_date(d1, m1, year)
+    co = _calendar_date(d2, m2, year or ci.year)
+    if co <= ci and not year:
+        co = co.replace(year=co.year + 1)                # "30 Dec - 2 Jan"
+    return ci, co, text.replace(m.group(0), " ")
+
+INVALID_DATES = "⚠️ Please give valid dates, e.g., '2025-05-10 to 2025-05-12' or '10-12 May'."
+
+def parse_search_criteria(query: str):
+    """Criteria named in free text ("4-star hotels in Lahore under 150 with free rooms 10-12 May")."""
+    try:
+        ci, co, text = _stay_in(query)
+    except ValueError:
+        return INVALID_DATES
+    found = {"check_in": ci, "check_out": co}
+    m = STARS_RE.search(text)
+    if m:
+        found["min_stars"] = float(m.group(1))
+        text = text.replace(m.group(0), " ")
+    m = GUESTS_RE.search(text)
+    if m:
+        found["guests"] = int(m.group(1) or m.group(2))
+        text = text.replace(m.group(0), " ")
+    m = BETWEEN_RE.search(text)
+    if m:
+        found["min_price"], found["max_price"] = sorted((float(m.group(1)), float(m.group(2))))
+        text = text.replace(m.group(0), " ")
+    for regex, key in ((UNDER_RE, "max_price"), (OVER_RE, "min_price")):
+        m = regex.search(text)
+        if m and key not in found:
+            found[key] = float(m.group(1))
+            text = text.replace(m.group(0), " ")
+    m = ROOM_TYPE_RE.search(text)
+    if m:
+        found["room_type"] = m.group(1).lower()
+        text = text.replace(m.group(0), " ")
+    city, text = city_in(text)
+    found["city"] = city
+    # Only what follows "with ..." names amenities ("with free rooms" names none)
+    m = re.search(r"\b(?:with|having|offering)\b(.*)$", text, re.IGNORECASE)
+    if m:
+        wanted = STAY_WORDS_RE.sub(" ", m.group(1))
+        found["amenities"] = tuple(amenity_terms(wanted))
+        found["any_of"] = bool(ANY_OF_RE.search(wanted))
+    return NO_CRITERIA._replace(**found)
+
+def criteria_count(c: Criteria) -> int:
+    """How many separate filters `c` applies (a price range or a stay counts once)."""
+    return sum((c.city is not None, c.min_stars is not None,
+                c.min_price is not None or c.max_price is not None, c.check_in is not None,
+                c.room_type is not None, c.guests is not None, bool(c.amenities)))
+
+def _amenity_keys(c: Criteria):
+    """(hotel-level keys, room-only keys, mask, unknown terms) of the wanted amenities."""
+    want, unknown = inventory_cache.amenity_mask(c.amenities)
+    vocab = inventory_cache.snapshot().amenities
+    hotel_want, room_want = vocab.split(want)
+    keys = lambda mask: [vocab.key(bit) for bit in range(len(vocab)) if mask >> bit & 1]
+    return keys(hotel_want), keys(room_want), want, unknown
+
+def compile_search(c: Criteria):
+    """(SQL, params) for `c`, with only the clauses it needs; the keyset and LIMIT params follow."""
+    clauses, params = [], []
+    def add(clause, *values):
+        clauses.append(clause)
+        params.extend(values)
+
+    if c.city is not None:
+        add(CITY_CLAUSE, c.city.strip().lower())
+    if c.min_stars is not None:
+        add(STARS_CLAUSE, c.min_stars)
+    if c.min_price is not None:
+        add(MIN_PRICE_CLAUSE, c.min_price)
+    if c.max_price is not None:
+        add(MAX_PRICE_CLAUSE, c.max_price)
+    if c.room_type is not None:
+        add(ROOM_TYPE_CLAUSE, c.room_type)
+    if c.guests is not None:
+        add(GUESTS_CLAUSE, c.guests)
+    if c.amenities:
+        hotel_keys, room_keys, _, _ = _amenity_keys(c)
+        if c.any_of:
+            add(ANY_AMENITY_CLAUSE, hotel_keys, room_keys)
+        else:
+            if hotel_keys:
+                add(HOTEL_AMENITIES_CLAUSE, hotel_keys)
+            if room_keys:
+                add(ROOM_AMENITIES_CLAUSE, room_keys)
+    if c.check_in is not None:
+        add(FREE_CLAUSE, c.check_in, c.check_out)
+    return SEARCH_SQL.format(where="\n      AND ".join(clauses) or "TRUE"), params
+
+def _use_db(c: Criteria) -> bool:
+    return SEARCH_BACKEND == "db" or c.check_in is not None
+
+def _search_memory(c: Criteria):
+    """Rows shaped like SEARCH_SQL's, from the cached inventory."""
+    _, _, want, _ = _amenity_keys(c)
+    rows = []
+    for hotel, rooms in inventory_cache.find_rooms(c.city, c.min_stars, c.min_price, c.max_price,
+                                                   c.room_type, c.guests, want, c.any_of):
+        room_types = ", ".join(sorted({r.room_type for r in rooms}))
+        rows.append((hotel.id, hotel.name, hotel.city, hotel.stars, len(rooms), rooms[0].price_per_night, room_types))
+    rows.sort(key=_rank_key)
+    return rows
+
+def _rank_key(r):
+    return (-r[3], r[5], r[1], r[0])
+
+def _hotel_line(r, c: Criteria):
+    free = " free" if c.check_in is not None else ""
+    return f"🏨 {r[1]} ({r[2]}) ⭐{r[3]} — {r[4]} room(s){free} from ₹{float(r[5]):,.2f} ({r[6]})"
+
+@pager("search_hotels")
+def _search_page(args, cursor, limit):
+    (c,) = args
+    if not _use_db(c):
+        page, next_offset = offset_page(_search_memory(c), cursor, limit)
+        return [_hotel_line(r, c) for r in page], next_offset
+    sql, params = compile_search(c)
+    after = cursor or (None, None, None, None)
+    with get_connection() as conn, conn.cursor() as cur:
+        rows, next_key = fetch_keyset(cur, sql, params + [after[0]] + list(after), limit, _rank_key)
+    return [_hotel_line(r, c) for r in rows], next_key
+
+def describe(c: Criteria) -> str:
+    parts = []
+    if c.city is not None:
+        parts.append(f"in {c.city.title()}")
+    if c.min_stars is not None:
+        parts.append(f"{c.min_stars:g}+⭐")
+    if c.min_price is not None and c.max_price is not None:
+        parts.append(f"₹{c.min_price:g}–₹{c.max_price:g}")
+    elif c.max_price is not None:
+        parts.append(f"under ₹{c.max_price:g}")
+    elif c.min_price is not None:
+        parts.append(f"from ₹{c.min_price:g}")
+    if c.check_in is not None:
+        parts.append(f"free {c.check_in} to {c.check_out}")
+    if c.room_type is not None:
+        parts.append(c.room_type)
+    if c.guests is not None:
+        parts.append(f"{c.guests}+ guests")
+    if c.amenities:
+        names = inventory_cache.amenity_names(_amenity_keys(c)[2])
+        parts.append("with " + (" or " if c.any_of else " and ").join(names))
+    return " · ".join(parts)
+
+def _criteria(query, city, min_stars, min_price, max_price, check_in, check_out, room_type, guests, amenities):
+    """Criteria from the free-text query, overridden by any structured arguments given."""
+    c = parse_search_criteria(query) if query else NO_CRITERIA
+    if isinstance(c, str):
+        return c
+    given = {"city": city, "min_stars": min_stars, "min_price": min_price, "max_price": max_price,
+             "room_type": room_type.lower() if room_type else None, "guests": guests}
+    c = c._replace(**{k: v for k, v in given.items() if v is not None})
+    if amenities:
+        c = c._replace(amenities=tuple(amenity_terms(amenities)), any_of=bool(ANY_OF_RE.search(amenities)))
+    if check_in:
+        try:
+            ci = parse_date(check_in)
+            co = parse_date(check_out) if check_out else ci + timedelta(days=1)
+        except ValueError:
+            return INVALID_DATES
+        c = c._replace(check_in=ci, check_out=co)
+    if c.check_in is not None and c.check_out <= c.check_in:
+        return "⚠️ Check-out date must be after check-in date."
+    if c.min_price is not None and c.max_price is not None and c.min_price > c.max_price:
+        c = c._replace(min_price=c.max_price, max_price=c.min_price)
+    unknown = _amenity_keys(c)[3] if c.amenities else []
+    if unknown:
+        known = ", ".join(inventory_cache.amenity_names()[:20])
+        return f"⚠️ I don't know the amenity {', '.join(repr(t) for t in unknown)}. Known amenities include: {known}."
+    if not criteria_count(c):
+        return ("⚠️ Please say what you are looking for, e.g., "
+                "'4-star hotels in Lahore under 150 with free rooms 10-12 May'.")
+    return c
+
+@tool("search_hotels", return_direct=True)
+def search_hotels(query: str = "", city: Optional[str] = None, min_stars: Optional[float] = None,
+                  min_price: Optional[float] = None, max_price: Optional[float] = None,
+                  check_in: Optional[str] = None, check_out: Optional[str] = None,
+                  room_type: Optional[str] = None, guests: Optional[int] = None,
+                  amenities: Optional[str] = None) -> str:
+    """
+    Find hotels matching several criteria at once: city, minimum stars, room price bounds,
+    free for a stay, room type, number of guests and amenities. Criteria can be written
+    in `query` or passed as arguments (arguments win). Dates are YYYY-MM-DD.
+    Example input: '4-star hotels in Lahore under 150 with free rooms 10-12 May'
+    """
+    c = _criteria(query, city, min_stars, min_price, max_price, check_in, check_out, room_type, guests, amenities)
+    if isinstance(c, str):
+        return c
+    page = first_page("search_hotels", c)
+    if not page:
+        return f"❌ No hotels found: {describe(c)}."
+    return f"✅ Hotels {describe(c)}:\n\n{page}"
+
+async def search_hotels_async(query: str = "", city: Optional[str] = None, min_stars: Optional[float] = None,
+                              min_price: Optional[float] = None, max_price: Optional[float] = None,
+                              check_in: Optional[str] = None, check_out: Optional[str] = None,
+                              room_type: Optional[str] = None, guests: Optional[int] = None,
+                              amenities: Optional[str] = None) -> str:
+    return await asyncio.to_thread(search_hotels.func, query, city, min_stars, min_price, max_price,
+                                   check_in, check_out, room_type, guests, amenities)
+
+search_hotels.coroutine = search_hotels_async
+instrument_tool(search_hotels)
@@ -0,0 +1,114 @@
+from langchain.tools import tool
+from monitoring.tracing import instrument_tool
+from database.inventory_cache import inventory_cache
+from tools.paging import pager, first_page, offset_page
+import re
+
+STARS_RE = re.compile(r"(\d(?:\.\d)?)\s*\+?\s*[- ]?(?:stars?|⭐)", re.IGNORECASE)
+SEPARATOR_RE = re.compile(r",|;|&|/|\+|\band\b|\bor\b", re.IGNORECASE)
+ANY_OF_RE = re.compile(r"\bor\b|\bany\s+of\b|\beither\b", re.IGNORECASE)
+FILLER = {
+    "show", "me", "find", "list", "search", "get", "give", "any", "all", "the", "a", "an", "of",
+    "hotel", "hotels", "in", "at", "with", "having", "has", "have", "that", "which", "offering",
+    "offer", "offers", "providing", "include", "including", "both", "either", "please", "some",
+    "where", "there", "is", "are", "i", "want", "need", "looking", "for", "rated", "least",
+}
+MAX_ROOM_NUMBERS = 5
+
+def city_in(text: str):
+    """(city, text without it) for the longest known city named in `text`."""
+    lowered = text.lower()
+    for city in sorted(inventory_cache.snapshot().by_city, key=len, reverse=True):
+        if city in lowered:
+            m = re.search(rf"\b{re.escape(city)}\b", lowered)
+            if m:
+                return city, text[:m.start()] + " " + text[m.end():]
+    return None, text
+
+def amenity_terms(text: str):
+    """Resolve each separated chunk to its longest trailing run of words naming an amenity."""
+    terms = []
+    for chunk in SEPARATOR_RE.split(text):
+        words = re.findall(r"[\w'-]+", chunk.lower())
+        if not words:
+            continue
+        for i in range(len(words)):
+            term = " ".join(words[i:])
+            if inventory_cache.amenity_mask([term])[0]:
+                terms.append(term)
+                break
+        else:
+            leftover = " ".join(w for w in words if w not in FILLER)
+            if leftover:
+                terms.append(leftover)
+    return terms
+
+def parse_amenity_query(query: str):
+    """Return (amenity terms, any_of, city or None, min_stars or None), or an error message string."""
+    text = query
+    city, text = city_in(text)
+    m = STARS_RE.search(text)
+    min_stars = float(m.group(1)) if m else None
+    if m:
+        text = text.replace(m.group(0), " ")
+    terms = amenity_terms(text)
+    if not terms:
+        return "⚠️ Please name one or more amenities, e.g., 'hotels in Karachi with pool and spa'."
+    return terms, bool(ANY_OF_RE.search(text)), city, min_stars
+
+def _hotel_line(hotel, rooms, want):
+    snap = inventory_cache.snapshot()
+    hotel_want, room_want = snap.amenities.split(want)
+    line = f"🏨 {hotel.name} ({hotel.city}) ⭐{hotel.stars}"
+    offered = snap.amenities.names(snap.hotel_amenities[hotel.id] & hotel_want)
+    if offered:
+        line += f" — {', '.join(offered)}"
+    if rooms:
+        numbers = ", ".join(r.room_number for r in rooms[:MAX_ROOM_NUMBERS])
+        more = f" +{len(rooms) - MAX_ROOM_NUMBERS}" if len(rooms) > MAX_ROOM_NUMBERS else ""
+        line += f" · {len(rooms)} room(s) with {', '.join(snap.amenities.names(room_want))}: {numbers}{more}"
+    return line
+
+# Pager args carry the amenity terms, not a bitmask: bit positions belong to one
+# inventory snapshot, and a "more:" token may be followed after a reload
+@pager("search_hotels_by_amenities")
+def _amenities_page(args, offset, limit):
+    terms, any_of, city, min_stars = args
+    want, unknown = inventory_cache.amenity_mask(terms)
+    if unknown:
+        return [], None     # amenity gone since the first page: nothing left to match
+    found = inventory_cache.hotels_with_amenities(want, any_of, city, min_stars)
+    page, next_offset = offset_page(found, offset, limit)
+    return [_hotel_line(h, rooms, want) for h, rooms in page], next_offset
+
+@tool("search_hotels_by_amenities", return_direct=True)
+def search_hotels_by_amenities(query: str) -> str:
+    """
+    Find hotels offering all (or, with 'or', any) of the named amenities, optionally in a city
+    and with a minimum star rating.
+    Example input: 'hotels in Karachi with pool and spa' or 'Lahore, 4 stars, gym or pool'
+    """
+    parsed = parse_amenity_query(query)
+    if isinstance(parsed, str):
+        return parsed
+    terms, any_of, city, min_stars = parsed
+    want, unknown = inventory_cache.amenity_mask(terms)
+    if unknown:
+        known = ", ".join(inventory_cache.amenity_names()[:20])
+        return f"⚠️ I don't know the amenity {', '.join(repr(t) for t in unknown)}. Known amenities include: {known}."
+
+    joiner = " or " if any_of else " and "
+    header = (f"✅ Hotels{f' in {city.title()}' if city else ''} with "
+              f"{joiner.join(inventory_cache.amenity_names(want))}"
+              f"{f' ({min_stars:g}+⭐)' if min_stars is not None else ''}:")
+    page = first_page("search_hotels_by_amenities", tuple(terms), any_of, city, min_stars)
+    if not page:
+        return f"❌ No matches for: {header[2:-1]}."
+    return f"{header}\n\n{page}"
+
+async def search_hotels_by_amenities_async(query: str) -> str:
+    await inventory_cache.aensure_fresh()
+    return search_hotels_by_amenities.func(query)
+
+search_hotels_by_amenities.coroutine = search_hotels_by_amenities_async
+instrument_tool(search_hotels_by_amenities)
@@ -1,15 +1,23 @@
 from langchain.tools import tool
-from database.db_connection import get_connection
+from monitoring.tracing import instrument_tool
+from database.inventory_cache import inventory_cache
+from tools.paging import pager, first_page, split_page
+
+@pager("search_hotels_by_city")
+def _city_page(args, after, limit):
+    (city,) = args
+    hotels, next_key = split_page(inventory_cache.hotels_in_city(city, limit + 1, after), limit,
+                                  key=lambda h: (h.name, h.id))
+    return [f"{h.name} — ⭐{h.stars}" for h in hotels], next_key
 
 @tool("search_hotels_by_city", return_direct=True)
 def search_hotels_by_city(city: str) -> str:
     """Search hotels by city name."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT id, name, rating FROM hotels WHERE lower(city) = lower(%s);", (city,))
-    hotels = cur.fetchall()
-    cur.close()
-    conn.close()
-    if not hotels:
-        return f"No hotels found in {city}."
-    return "\n".join([f"{h[1]} — ⭐{h[2]}" for h in hotels])
+    return first_page("search_hotels_by_city", city) or f"No hotels found in {city}."
+
+async def search_hotels_by_city_async(city: str) -> str:
+    await inventory_cache.aensure_fresh()
+    return search_hotels_by_city.func(city)
+
+search_hotels_by_city.coroutine = search_hotels_by_city_async
+instrument_tool(search_hotels_by_city)
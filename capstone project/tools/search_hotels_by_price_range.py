@@ -1,39 +1,88 @@
 from langchain.tools import tool
+from monitoring.tracing import instrument_tool
 from database.db_connection import get_connection
+from database.statements import prepared, execute
+from database.async_db_connection import fetch_async
 import re
 
-@tool("search_hotels_by_price_range", return_direct=True)
-def search_hotels_by_price_range(query: str) -> str:
-    """
-    Search hotels in a city within the mentioned price range.
-    Example input: 'Lahore between 20 and 100'
-    """
+MAX_HOTELS = 20
+
+# Reads hotel_price_summary (trigger-maintained, see hotel_setup.sql) by exact city key;
+# one row per hotel, cheapest in-range room first.
+PRICE_RANGE_SQL = prepared("price_range", """
+    WITH args AS (
+        SELECT %s::varchar AS city, %s::numeric AS lo, %s::numeric AS hi
+    ), matching AS (
+        SELECT s.hotel_id, s.room_type,
+               ARRAY(SELECT p FROM unnest(s.prices) p WHERE p BETWEEN a.lo AND a.hi) AS in_range,
+               (SELECT count(*) FROM unnest(s.available_prices) p WHERE p BETWEEN a.lo AND a.hi) AS free
+        FROM args a
+        JOIN hotel_price_summary s
+          ON s.city_key = a.city AND s.min_price <= a.hi AND s.max_price >= a.lo
+    )
+    SELECT h.name, h.city, h.stars,
+           min(m.in_range[1]) AS lowest,
+           max(m.in_range[cardinality(m.in_range)]) AS highest,
+           sum(cardinality(m.in_range)) AS rooms,
+           sum(m.free) AS free,
+           string_agg(m.room_type::text, ', ' ORDER BY m.room_type) AS room_types
+    FROM matching m
+    JOIN hotels h ON h.id = m.hotel_id
+    WHERE cardinality(m.in_range) > 0
+    GROUP BY h.id, h.name, h.city, h.stars
+    ORDER BY lowest, h.stars DESC, h.name
+    LIMIT %s;
+""")
+
+def city_key(city: str) -> str:
+    return " ".join(city.split()).lower()
+
+def _parse_price_query(query: str):
+    """Return (city_name, min_price, max_price), or None without two numbers."""
     # Extract numeric price values from text
     prices = re.findall(r'\d+', query)
     if len(prices) < 2:
-        return "⚠️ Please mention a valid price range, e.g., 'Lahore between 200 and 1000'."
-    
+        return None
+
     # Extract and clean city name
     city_name = re.sub(r'\d+', '', query).replace('between', '').replace('and', '').strip()
     min_price, max_price = map(float, prices[:2])
+    return city_name, min_price, max_price
 
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT DISTINCT h.name, h.city, hr.price_per_night
-        FROM hotels h
-        JOIN hotel_rooms hr ON h.id = hr.hotel_id
-        WHERE h.city ILIKE %s AND hr.price_per_night BETWEEN %s AND %s;
-    """, (f"%{city_name}%", min_price, max_price))
-    hotels = cur.fetchall()
-    cur.close()
-    conn.close()
-
-    # Return results
+def _price_range_text(city_name, min_price, max_price, hotels) -> str:
     if not hotels:
         return f"❌ No hotels found in {city_name} with price between ₹{min_price}–₹{max_price}."
 
     formatted_results = "\n".join([
-        f"🏨 {h[0]} ({h[1]}) — 💰 ₹{h[2]:,.2f}" for h in hotels
+        f"🏨 {h[0]} ({h[1]}) ⭐{h[2]} — 💰 ₹{h[3]:,.2f}" + (f"–₹{h[4]:,.2f}" if h[4] != h[3] else "")
+        + f" · {h[5]} room(s), {h[6]} free ({h[7]})"
+        for h in hotels
     ])
     return f"✅ Hotels in {city_name} (₹{min_price}–₹{max_price}):\n\n{formatted_results}"
+
+@tool("search_hotels_by_price_range", return_direct=True)
+def search_hotels_by_price_range(query: str) -> str:
+    """
+    Search hotels in a city within the mentioned price range.
+    Example input: 'Lahore between 20 and 100'
+    """
+    parsed = _parse_price_query(query)
+    if parsed is None:
+        return "⚠️ Please mention a valid price range, e.g., 'Lahore between 200 and 1000'."
+    city_name, min_price, max_price = parsed
+
+    with get_connection() as conn, conn.cursor() as cur:
+        execute(cur, PRICE_RANGE_SQL, (city_key(city_name), min_price, max_price, MAX_HOTELS))
+        hotels = cur.fetchall()
+    return _price_range_text(city_name, min_price, max_price, hotels)
+
+async def search_hotels_by_price_range_async(query: str) -> str:
+    parsed = _parse_price_query(query)
+    if parsed is None:
+        return "⚠️ Please mention a valid price range, e.g., 'Lahore between 200 and 1000'."
+    city_name, min_price, max_price = parsed
+    hotels = await fetch_async(PRICE_RANGE_SQL, city_key(city_name), min_price, max_price, MAX_HOTELS)
+    return _price_range_text(city_name, min_price, max_price, hotels)
+
+search_hotels_by_price_range.coroutine = search_hotels_by_price_range_async
+instrument_tool(search_hotels_by_price_range)
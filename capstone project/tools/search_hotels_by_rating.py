@@ -1,15 +1,23 @@
 from langchain.tools import tool
-from database.db_connection import get_connection
+from monitoring.tracing import instrument_tool
+from database.inventory_cache import inventory_cache
+from tools.paging import pager, first_page, split_page
+
+@pager("search_hotels_by_rating")
+def _rating_page(args, before, limit):
+    (min_rating,) = args
+    hotels, next_key = split_page(inventory_cache.hotels_with_min_stars(min_rating, limit + 1, before), limit,
+                                  key=lambda h: (h.stars, h.name, h.id))
+    return [f"{h.name} ({h.city}) — ⭐{h.stars}" for h in hotels], next_key
 
 @tool("search_hotels_by_rating", return_direct=True)
 def search_hotels_by_rating(min_rating: float) -> str:
     """Find hotels with rating above given value."""
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT name, city, rating FROM hotels WHERE rating >= %s;", (min_rating,))
-    hotels = cur.fetchall()
-    cur.close()
-    conn.close()
-    if not hotels:
-        return f"No hotels found with rating ≥ {min_rating}."
-    return "\n".join([f"{h[0]} ({h[1]}) — ⭐{h[2]}" for h in hotels])
+    return first_page("search_hotels_by_rating", min_rating) or f"No hotels found with rating ≥ {min_rating}."
+
+async def search_hotels_by_rating_async(min_rating: float) -> str:
+    await inventory_cache.aensure_fresh()
+    return search_hotels_by_rating.func(min_rating)
+
+search_hotels_by_rating.coroutine = search_hotels_by_rating_async
+instrument_tool(search_hotels_by_rating)
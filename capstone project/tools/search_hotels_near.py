@@ -0,0 +1,177 @@
+from langchain.tools import tool
+from monitoring.tracing import instrument_tool
+from database.db_connection import get_connection
+from database.statements import prepared, execute
+from database.inventory_cache import inventory_cache
+from tools.paging import pager, first_page, offset_page
+import asyncio
+import os
+import re
+
+# memory: KD-tree over the cached inventory (database/geo_index.py)
+# db:     earthdistance query on idx_hotels_earth, for deployments that don't cache the inventory
+GEO_BACKEND = os.getenv("GEO_BACKEND", "memory")
+DEFAULT_NEAREST = 10
+MAX_NEAR_RESULTS = 200
+
+# Ordered by <-> on the GiST index (nearest-neighbour scan); earth_box() is the indexed
+# radius pre-filter, the exact great-circle cut is applied to the rows it returns.
+NEAR_SQL = prepared("hotels_near", """
+    SELECT h.id, h.name, h.city, h.stars,
+           earth_distance(ll_to_earth(%s, %s), ll_to_earth(h.latitude, h.longitude)) / 1000.0 AS km
+    FROM hotels h
+    WHERE h.latitude IS NOT NULL AND h.longitude IS NOT NULL
+      AND h.stars >= %s::numeric
+      AND (NOT %s::boolean OR EXISTS (
+            SELECT 1 FROM hotel_rooms hr
+            WHERE hr.hotel_id = h.id AND hr.price_per_night BETWEEN %s::numeric AND %s::numeric))
+      AND (%s::float8 IS NULL OR earth_box(ll_to_earth(%s, %s), %s::float8) @> ll_to_earth(h.latitude, h.longitude))
+    ORDER BY ll_to_earth(h.latitude, h.longitude) <-> ll_to_earth(%s, %s)
+    LIMIT %s;
+""")
+
+PRICE = r"(?:₹|rs\.?|pkr)?\s*(\d+(?:\.\d+)?)"
+COORDS_RE = re.compile(r"(-?\d{1,2}\.\d+)\s*°?\s*[,\s]\s*(-?\d{1,3}\.\d+)\s*°?")
+RADIUS_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(km|kms|kilomet(?:er|re)s?|m|meters?|metres?|mi|miles?)\b", re.IGNORECASE)
+COUNT_RE = re.compile(r"\b(?:closest|nearest|top|first)\s+(\d+)\b|\b(\d+)\s+(?:closest|nearest)\b", re.IGNORECASE)
+STARS_RE = re.compile(r"(\d(?:\.\d)?)\s*\+?\s*[- ]?(?:stars?|⭐)", re.IGNORECASE)
+BETWEEN_RE = re.compile(rf"\b(?:between|from)\s*{PRICE}\s*(?:and|to|-)\s*{PRICE}", re.IGNORECASE)
+UNDER_RE = re.compile(rf"\b(?:under|below|less\s+than|cheaper\s+than|up\s*to|max(?:imum)?)\s*{PRICE}", re.IGNORECASE)
+ANCHOR_RE = re.compile(r"\b(?:of|near|nearby|around|to|from|close\s+to)\s+(.+)$", re.IGNORECASE)
+ANCHOR_END_RE = re.compile(r"\b(?:with|and|that|which|having|rated|priced|costing)\b|[,;(]", re.IGNORECASE)
+KM_PER_UNIT = {"m": 0.001, "mi": 1.609344}
+
+def _radius_km(value, unit):
+    unit = unit.lower()
+    if unit.startswith("mi"):
+        return float(value) * KM_PER_UNIT["mi"]
+    if unit == "m" or unit.startswith("met"):
+        return float(value) * KM_PER_UNIT["m"]
+    return float(value)
+
+def parse_near_query(query: str):
+    """
+    Return {"lat", "lon", "anchor", "exclude", "radius_km", "k", "min_stars", "min_price",
+    "max_price"}, or an error message string when no place or coordinates are given.
+    """
+    text = query
+    found = {"radius_km": None, "k": None, "min_stars": None, "min_price": None, "max_price": None}
+
+    coords = COORDS_RE.search(text)
+    text = COORDS_RE.sub(" ", text) if coords else text
+    m = RADIUS_RE.search(text)
+    if m:
+        found["radius_km"] = _radius_km(m.group(1), m.group(2))
+        text = text.replace(m.group(0), " ")
+    m = COUNT_RE.search(text)
+    if m:
+        found["k"] = min(int(m.group(1) or m.group(2)), MAX_NEAR_RESULTS)
+        text = text.replace(m.group(0), " ")
+    m = STARS_RE.search(text)
+    if m:
+        found["min_stars"] = float(m.group(1))
+        text = text.replace(m.group(0), " ")
+    m = BETWEEN_RE.search(text)
+    if m:
+        found["min_price"], found["max_price"] = sorted((float(m.group(1)), float(m.group(2))))
+        text = text.replace(m.group(0), " ")
+    else:
+        m = UNDER_RE.search(text)
+        if m:
+            found["max_price"] = float(m.group(1))
+            text = text.replace(m.group(0), " ")
+    if found["radius_km"] is None and found["k"] is None:
+        found["k"] = DEFAULT_NEAREST
+
+    if coords:
+        lat, lon = float(coords.group(1)), float(coords.group(2))
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            return "⚠️ Coordinates must be latitude (-90..90), longitude (-180..180)."
+        return dict(found, lat=lat, lon=lon, anchor=f"{lat:.4f}, {lon:.4f}", exclude=None)
+
+    m = ANCHOR_RE.search(" ".join(text.split()))
+    anchor = ANCHOR_END_RE.split(m.group(1))[0].strip(" .?!") if m else ""
+    if not anchor:
+        return ("⚠️ Please name a place or give coordinates, e.g., 'hotels within 3 km of Pearl Continental' "
+                "or 'closest 10 to 31.52, 74.35'.")
+    center = inventory_cache.city_center(anchor)
+    if center is not None:
+        return dict(found, lat=center[0], lon=center[1], anchor=anchor.title(), exclude=None)
+    matches = inventory_cache.match_hotels(anchor, limit=1)
+    if not matches or matches[0][0].latitude is None or matches[0][0].longitude is None:
+        return f"⚠️ I couldn't find a city or hotel called '{anchor}' with a known location."
+    hotel = matches[0][0]
+    return dict(found, lat=hotel.latitude, lon=hotel.longitude, anchor=hotel.name, exclude=hotel.id)
+
+def _nearby_memory(lat, lon, radius_km, k, min_stars, min_price, max_price):
+    pairs = inventory_cache.hotels_near(lat, lon, radius_km, k or MAX_NEAR_RESULTS,
+                                        min_stars, min_price, max_price)
+    return [(h.id, h.name, h.city, h.stars, km) for h, km in pairs]
+
+def _nearby_db(lat, lon, radius_km, k, min_stars, min_price, max_price):
+    priced = min_price is not None or max_price is not None
+    lo = min_price if min_price is not None else 0
+    hi = max_price if max_price is not None else 10 ** 12
+    radius_m = radius_km * 1000 if radius_km is not None else None
+    params = (lat, lon, min_stars or 0, priced, lo, hi, radius_m, lat, lon, radius_m, lat, lon,
+              k or MAX_NEAR_RESULTS)
+    with get_connection() as conn, conn.cursor() as cur:
+        execute(cur, NEAR_SQL, params)
+        rows = cur.fetchall()
+    return [tuple(r[:4]) + (float(r[4]),) for r in rows if radius_km is None or r[4] <= radius_km]
+
+def find_hotels_near(lat, lon, radius_km=None, k=None, min_stars=None, min_price=None, max_price=None,
+                     exclude=None):
+    """[(id, name, city, stars, km)] nearest first, on the configured GEO_BACKEND."""
+    nearby = _nearby_db if GEO_BACKEND == "db" else _nearby_memory
+    # One extra when the anchor hotel itself will be dropped from its own neighbourhood
+    extra = 1 if exclude is not None and k is not None else 0
+    rows = nearby(lat, lon, radius_km, k + extra if k else k, min_stars, min_price, max_price)
+    rows = [r for r in rows if r[0] != exclude]
+    return rows[:k] if k else rows
+
+def _distance(km):
+    return f"{km * 1000:.0f} m" if km < 1 else f"{km:.1f} km"
+
+@pager("search_hotels_near")
+def _near_page(args, offset, limit):
+    page, next_offset = offset_page(find_hotels_near(*args), offset, limit)
+    return [f"🏨 {r[1]} ({r[2]}) ⭐{r[3]} — {_distance(r[4])}" for r in page], next_offset
+
+def _header(p):
+    if p["radius_km"] is not None and p["k"] is not None:
+        head = f"📍 {p['k']} nearest hotels within {_distance(p['radius_km'])} of {p['anchor']}"
+    elif p["radius_km"] is not None:
+        head = f"📍 Hotels within {_distance(p['radius_km'])} of {p['anchor']}"
+    else:
+        head = f"📍 {p['k']} nearest hotels to {p['anchor']}"
+    filters = []
+    if p["min_stars"] is not None:
+        filters.append(f"{p['min_stars']:g}+⭐")
+    if p["min_price"] is not None:
+        filters.append(f"₹{p['min_price']:g}–₹{p['max_price']:g}")
+    elif p["max_price"] is not None:
+        filters.append(f"under ₹{p['max_price']:g}")
+    return head + (f" ({', '.join(filters)})" if filters else "") + ":"
+
+@tool("search_hotels_near", return_direct=True)
+def search_hotels_near(query: str) -> str:
+    """
+    Find hotels near a hotel, a city or coordinates, by radius or nearest count,
+    optionally with a minimum star rating and a room price range.
+    Example input: 'hotels within 3 km of Pearl Continental, 4 stars, under 200' or 'closest 10 to 31.52, 74.35'
+    """
+    p = parse_near_query(query)
+    if isinstance(p, str):
+        return p
+    page = first_page("search_hotels_near", p["lat"], p["lon"], p["radius_km"], p["k"],
+                      p["min_stars"], p["min_price"], p["max_price"], p["exclude"])
+    if not page:
+        return f"❌ No matches for: {_header(p)[2:-1]}."
+    return f"{_header(p)}\n{page}"
+
+async def search_hotels_near_async(query: str) -> str:
+    return await asyncio.to_thread(search_hotels_near.func, query)
+
+search_hotels_near.coroutine = search_hotels_near_async
+instrument_tool(search_hotels_near)
@@ -1,9 +1,22 @@
 import os
+import re
+import time
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
+from monitoring.tracing import traced, current_span
 
 load_dotenv()
 RAPIDAPI_KEY = os.getenv("RAPIDAPI_KEY")
+# Point at a local stub server for testing, e.g. http://localhost:8000
+TRIPADVISOR_BASE_URL = os.getenv("TRIPADVISOR_BASE_URL", "https://tripadvisor16.p.rapidapi.com").rstrip("/")
+TRIPADVISOR_TIMEOUT = float(os.getenv("TRIPADVISOR_TIMEOUT", "10"))
+TRIPADVISOR_RETRIES = int(os.getenv("TRIPADVISOR_RETRIES", "2"))
+# Fresh for CACHE_TTL seconds; then served stale for up to STALE_TTL more while a refresh runs
+TRIPADVISOR_CACHE_TTL = float(os.getenv("TRIPADVISOR_CACHE_TTL", "3600"))
+TRIPADVISOR_STALE_TTL = float(os.getenv("TRIPADVISOR_STALE_TTL", "86400"))
 
 HEADERS = {
     "X-RapidAPI-Key": RAPIDAPI_KEY,
@@ -18,37 +31,122 @@ CITY_MAP = {
     "faisalabad": 304557,
     "multan": 304558
 }
+CITY_RE = re.compile(r"\b(" + "|".join(map(re.escape, CITY_MAP)) + r")\b")
 
+# -------------------------
+# Shared keep-alive session
+# -------------------------
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """One pooled session for all fallback calls, retrying 429/5xx with backoff."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(total=TRIPADVISOR_RETRIES, backoff_factor=0.3,
+                              status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",))
+                session = requests.Session()
+                session.headers.update(HEADERS)
+                session.mount("http://", HTTPAdapter(max_retries=retry))
+                session.mount("https://", HTTPAdapter(max_retries=retry))
+                _session = session
+    return _session
+
+
+@traced("tripadvisor.fetch")
+def fetch_hotels(location_id: int, limit: int = 5):
+    """Call TripAdvisor and return [{name, rating, address}]; raises on HTTP errors."""
+    response = get_session().get(f"{TRIPADVISOR_BASE_URL}/api/v1/hotels/searchHotels",
+                                 params={"locationId": location_id, "limit": limit},
+                                 timeout=TRIPADVISOR_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    hotels = []
+    for item in data.get("data", []):
+        name = item.get("name", "N/A")
+        rating = item.get("rating", "N/A")
+        address = item.get("address", "N/A")
+        hotels.append({"name": name, "rating": rating, "address": address})
+    current_span().set("http_status", str(response.status_code)).set("rows", len(hotels))
+    return hotels
+
+
+# -------------------------
+# Per-location TTL cache (stale-while-revalidate)
+# -------------------------
+_cache = {}          # (location_id, limit) -> (hotels, fetched_at)
+_refreshing = set()  # keys with a background refresh in flight
+_cache_lock = threading.Lock()
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+
+
+def _refresh(key):
+    try:
+        hotels = fetch_hotels(*key)
+        with _cache_lock:
+            _cache[key] = (hotels, time.monotonic())
+            _stats["refreshes"] += 1
+    except Exception:
+        with _cache_lock:
+            _stats["errors"] += 1
+    finally:
+        with _cache_lock:
+            _refreshing.discard(key)
+
+
+def cached_hotels(location_id: int, limit: int = 5):
+    key = (location_id, limit)
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+        age = None if entry is None else now - entry[1]
+        fresh = age is not None and age < TRIPADVISOR_CACHE_TTL
+        stale = not fresh and age is not None and age < TRIPADVISOR_CACHE_TTL + TRIPADVISOR_STALE_TTL
+        current_span().set("cache_hit", fresh or stale).set("stale", stale)
+        if fresh:
+            _stats["hits"] += 1
+            return entry[0]
+        if stale:
+            _stats["stale_hits"] += 1
+            if key not in _refreshing:
+                _refreshing.add(key)
+                threading.Thread(target=_refresh, args=(key,), name="tripadvisor-refresh", daemon=True).start()
+            return entry[0]
+        _stats["misses"] += 1
+    try:
+        hotels = fetch_hotels(location_id, limit)
+    except Exception:
+        with _cache_lock:
+            _stats["errors"] += 1
+        if entry is not None:
+            return entry[0]  # expired, but better than an error during an outage
+        raise
+    with _cache_lock:
+        _cache[key] = (hotels, time.monotonic())
+    return hotels
+
+
+def fallback_cache_stats():
+    with _cache_lock:
+        return dict(_stats, entries=len(_cache), refreshing=len(_refreshing))
+
+
+@traced("fallback.tripadvisor")
 def tripadvisor_fallback_any_sentence(user_input: str, limit: int = 5):
     """
     Take any user sentence, detect city, fallback to TripAdvisor hotels.
     """
-    import re
-
-    # Detect city from user input
-    city_found = None
-    for city in CITY_MAP.keys():
-        if re.search(rf"\b{city}\b", user_input.lower()):
-            city_found = city
-            break
-    if not city_found:
-        # Default city if none found
-        city_found = "lahore"
+    # Detect city from user input (default city if none found)
+    match = CITY_RE.search(user_input.lower())
+    city_found = match.group(1) if match else "lahore"
 
     location_id = CITY_MAP[city_found]
 
     try:
-        # Call TripAdvisor API
-        url = f"https://tripadvisor16.p.rapidapi.com/api/v1/hotels/searchHotels?locationId={location_id}&limit={limit}"
-        response = requests.get(url, headers=HEADERS, timeout=10)
-        data = response.json()
-        hotels = []
-
-        for item in data.get("data", []):
-            name = item.get("name", "N/A")
-            rating = item.get("rating", "N/A")
-            address = item.get("address", "N/A")
-            hotels.append({"name": name, "rating": rating, "address": address})
+        hotels = cached_hotels(location_id, limit)
 
         if hotels:
             text = "\n".join([f"{h['name']} - Rating: {h['rating']}, Address: {h['address']}" 
@@ -58,4 +156,4 @@ def tripadvisor_fallback_any_sentence(user_input: str, limit: int = 5):
             return f"No hotels found in {city_found.title()}."
 
     except Exception as e:
-        return f"TripAdvisor API error: {e}"
\ No newline at end of file
+        return f"TripAdvisor API error: {e}"
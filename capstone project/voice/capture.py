@@ -0,0 +1,76 @@
+# voice/capture.py
+#
+# Audio sources for the voice pipeline. A source is a context manager with a
+# sample_rate and read() -> bytes of 16-bit mono PCM (b"" once it is exhausted),
+# so the pipeline can't tell a microphone from a WAV file and the whole path can be
+# exercised without audio hardware.
+
+import os
+import time
+import wave
+import numpy as np
+
+VOICE_SAMPLE_RATE = int(os.getenv("VOICE_SAMPLE_RATE", "16000"))
+VOICE_CHUNK_MS = int(os.getenv("VOICE_CHUNK_MS", "200"))
+
+
+class MicrophoneSource:
+    """Default input device through SpeechRecognition / PyAudio."""
+
+    def __init__(self, sample_rate=VOICE_SAMPLE_RATE, chunk_ms=VOICE_CHUNK_MS, device_index=None):
+        self.sample_rate = sample_rate
+        self.chunk_frames = sample_rate * chunk_ms // 1000
+        self.device_index = device_index
+        self._mic = None
+
+    def __enter__(self):
+        import speech_recognition as sr
+        self._mic = sr.Microphone(device_index=self.device_index, sample_rate=self.sample_rate,
+                                  chunk_size=self.chunk_frames)
+        self._mic.__enter__()
+        return self
+
+    def read(self) -> bytes:
+        return self._mic.stream.read(self.chunk_frames)
+
+    def __exit__(self, exc_type, exc, tb):
+        self._mic.__exit__(exc_type, exc, tb)
+        self._mic = None
+
+
+class WavFileSource:
+    """
+    16-bit PCM WAV file, mixed down to mono. With realtime=True chunks are paced like
+    a live microphone (for watching partial transcripts); otherwise they come at once.
+    """
+
+    def __init__(self, path, chunk_ms=VOICE_CHUNK_MS, realtime=False):
+        self.path = path
+        self.chunk_ms = chunk_ms
+        self.realtime = realtime
+        self._wav = None
+
+    def __enter__(self):
+        self._wav = wave.open(str(self.path), "rb")
+        if self._wav.getsampwidth() != 2:
+            self._wav.close()
+            raise ValueError(f"{self.path}: expected 16-bit PCM, got {8 * self._wav.getsampwidth()}-bit")
+        self.sample_rate = self._wav.getframerate()
+        self.channels = self._wav.getnchannels()
+        self.chunk_frames = max(1, self.sample_rate * self.chunk_ms // 1000)
+        self._next_at = time.monotonic()
+        return self
+
+    def read(self) -> bytes:
+        data = self._wav.readframes(self.chunk_frames)
+        if self.channels > 1 and data:
+            frames = np.frombuffer(data, dtype="<i2").reshape(-1, self.channels)
+            data = frames.mean(axis=1).astype("<i2").tobytes()
+        if self.realtime and data:
+            self._next_at += self.chunk_ms / 1000
+            time.sleep(max(0.0, self._next_at - time.monotonic()))
+        return data
+
+    def __exit__(self, exc_type, exc, tb):
+        self._wav.close()
+        self._wav = None
@@ -0,0 +1,156 @@
+# voice/pipeline.py
+#
+# Voice input off the UI thread. A VoiceSession opens an audio source on a background
+# thread, feeds it chunk by chunk to the streaming transcriber and publishes the text
+# heard so far; the caller (the Streamlit page) only polls snapshot() and picks up the
+# final text when the session is done. Capture stops at the first pause after speech,
+# after VOICE_MAX_SECONDS of audio, when stop() is called, or with state "timeout"
+# when nothing is heard within VOICE_START_TIMEOUT.
+#
+# Offline check of the whole path, no microphone needed:
+#   python -m voice.pipeline question.wav --realtime
+
+import os
+import sys
+import time
+import argparse
+import threading
+from voice.capture import WavFileSource
+from voice.transcriber import StreamingTranscriber
+
+VOICE_MAX_SECONDS = float(os.getenv("VOICE_MAX_SECONDS", "15"))
+VOICE_START_TIMEOUT = float(os.getenv("VOICE_START_TIMEOUT", "5"))
+
+_stats = {"sessions": 0, "done": 0, "timeouts": 0, "errors": 0, "audio_s": 0.0, "transcribe_s": 0.0}
+_stats_lock = threading.Lock()
+
+
+def _count(**amounts):
+    with _stats_lock:
+        for key, amount in amounts.items():
+            _stats[key] += amount
+
+
+def voice_stats():
+    """Session outcomes plus audio vs CPU seconds (real_time_factor < 1 keeps up with speech)."""
+    with _stats_lock:
+        s = dict(_stats)
+    s["real_time_factor"] = round(s["transcribe_s"] / s["audio_s"], 3) if s["audio_s"] else 0.0
+    s["audio_s"], s["transcribe_s"] = round(s["audio_s"], 2), round(s["transcribe_s"], 2)
+    return s
+
+
+class VoiceSession:
+    """One capture + transcription on a background thread."""
+
+    def __init__(self, source, max_seconds=VOICE_MAX_SECONDS, start_timeout=VOICE_START_TIMEOUT,
+                 end_on_pause=True, on_partial=None, transcriber=StreamingTranscriber):
+        self._source = source
+        self.max_seconds = max_seconds
+        self.start_timeout = start_timeout
+        self.end_on_pause = end_on_pause
+        self._on_partial = on_partial
+        self._make_transcriber = transcriber
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._state = "starting"        # -> listening -> done | stopped | timeout | error
+        self._text = ""
+        self._error = None
+        self._seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name="voice-session", daemon=True)
+
+    def start(self):
+        _count(sessions=1)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """End capture early; whatever was heard becomes the final text."""
+        self._stop.set()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+        return self.snapshot()
+
+    @property
+    def done(self):
+        with self._lock:
+            return self._state not in ("starting", "listening")
+
+    def snapshot(self):
+        """{"state", "text", "error", "seconds"}; text is partial until the state is final."""
+        with self._lock:
+            return {"state": self._state, "text": self._text, "error": self._error,
+                    "seconds": round(self._seconds, 1)}
+
+    def _publish(self, **fields):
+        with self._lock:
+            for key, value in fields.items():
+                setattr(self, f"_{key}", value)
+
+    def _run(self):
+        busy = 0.0
+        try:
+            with self._source as source:
+                transcriber = self._make_transcriber(source.sample_rate)
+                self._publish(state="listening")
+                bytes_per_second = 2 * source.sample_rate
+                heard, shown = 0.0, ""
+                while not self._stop.is_set():
+                    chunk = source.read()
+                    if not chunk:
+                        break
+                    heard += len(chunk) / bytes_per_second
+                    started = time.perf_counter()
+                    paused = transcriber.feed(chunk)
+                    busy += time.perf_counter() - started
+                    text = transcriber.text
+                    self._publish(text=text, seconds=heard)
+                    if text != shown and self._on_partial:
+                        self._on_partial(text)
+                    shown = text
+                    if paused and self.end_on_pause and transcriber.segments:
+                        break
+                    if heard >= self.max_seconds:
+                        break
+                    if heard >= self.start_timeout and not text:
+                        _count(timeouts=1, audio_s=heard, transcribe_s=busy)
+                        self._publish(state="timeout")
+                        return
+                started = time.perf_counter()
+                text = transcriber.finish()
+                busy += time.perf_counter() - started
+            _count(done=1, audio_s=heard, transcribe_s=busy)
+            self._publish(text=text, state="stopped" if self._stop.is_set() else "done")
+        except Exception as e:
+            _count(errors=1)
+            self._publish(state="error", error=f"{type(e).__name__}: {e}")
+
+
+def transcribe_file(path, realtime=False, on_partial=None):
+    """Final transcript of a whole WAV file (every segment, not just the first)."""
+    session = VoiceSession(WavFileSource(path, realtime=realtime), max_seconds=float("inf"),
+                           start_timeout=float("inf"), end_on_pause=False, on_partial=on_partial)
+    result = session.start().join()
+    if result["state"] == "error":
+        raise RuntimeError(result["error"])
+    return result["text"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcribe a WAV file through the voice pipeline.")
+    parser.add_argument("wav", nargs="+", help="16-bit PCM WAV file(s)")
+    parser.add_argument("--realtime", action="store_true", help="pace the audio like a live microphone")
+    parser.add_argument("--partials", action="store_true", help="print partial transcripts as they change")
+    args = parser.parse_args()
+
+    for path in args.wav:
+        on_partial = (lambda text: print(f"  … {text}", file=sys.stderr)) if args.partials else None
+        started = time.perf_counter()
+        text = transcribe_file(path, realtime=args.realtime, on_partial=on_partial)
+        print(f"{path}: {text!r} ({time.perf_counter() - started:.2f}s)")
+    print(voice_stats(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# voice/transcriber.py
+#
+# Offline, CPU-only speech-to-text with Vosk (Kaldi). Audio is fed in small PCM
+# chunks as it is captured; Vosk returns a partial hypothesis after each chunk and a
+# final segment at every pause, so text shows up while the user is still speaking
+# and nothing leaves the machine.
+#
+# The model is loaded once per process: VOSK_MODEL_PATH points at an unpacked model
+# (e.g. vosk-model-small-en-us-0.15, ~40 MB); without it Vosk fetches the small model
+# for VOSK_MODEL_LANG into ~/.cache/vosk on first use.
+
+import os
+import json
+import threading
+
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH")
+VOSK_MODEL_LANG = os.getenv("VOSK_MODEL_LANG", "en-us")
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def load_model():
+    """The shared Vosk model (vosk is imported here so the app starts without it)."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from vosk import Model, SetLogLevel
+                SetLogLevel(-1)
+                _model = Model(model_path=VOSK_MODEL_PATH) if VOSK_MODEL_PATH else Model(lang=VOSK_MODEL_LANG)
+    return _model
+
+
+class StreamingTranscriber:
+    """One utterance stream: feed() 16-bit mono PCM chunks, then finish() for the full text."""
+
+    def __init__(self, sample_rate: int, model=None):
+        from vosk import KaldiRecognizer
+        self.sample_rate = sample_rate
+        self._recognizer = KaldiRecognizer(model or load_model(), sample_rate)
+        self.segments = []      # finalized text, one entry per pause-delimited segment
+        self.partial = ""       # hypothesis for the segment still being spoken
+
+    def feed(self, pcm: bytes) -> bool:
+        """Add a chunk; True when it closed a segment (the speaker paused)."""
+        if self._recognizer.AcceptWaveform(pcm):
+            text = json.loads(self._recognizer.Result()).get("text", "")
+            if text:
+                self.segments.append(text)
+            self.partial = ""
+            return True
+        self.partial = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        return False
+
+    @property
+    def text(self) -> str:
+        """Everything heard so far, the open segment's partial included."""
+        return " ".join(self.segments + ([self.partial] if self.partial else []))
+
+    def finish(self) -> str:
+        """Flush the open segment and return the final transcript."""
+        text = json.loads(self._recognizer.FinalResult()).get("text", "")
+        if text:
+            self.segments.append(text)
+        self.partial = ""
+        return " ".join(self.segments)